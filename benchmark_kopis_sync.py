@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+KOPIS 동기화 벤치마크
+로컬 대역 서버(fake_kopis_server.py)를 띄우고 임시 데이터베이스에 KOPISDataImporter를 실행해
+처리량(records/sec), 공연 1건당 DB 문장 수, 최대 메모리를 측정합니다.
+첫 실행(모두 신규 추가)과 두 번째 실행(모두 갱신)을 따로 보고하며, 기준을 주면 미달 시 종료 코드 1을 반환합니다.
+
+사용법:
+    python benchmark_kopis_sync.py                                    # 공연 5000개, 지연 20ms
+    python benchmark_kopis_sync.py --performances 20000 --workers 8 --latency 50
+    python benchmark_kopis_sync.py --min-records-per-sec 200 --max-statements-per-record 0.1 --json result.json
+    python benchmark_kopis_sync.py --database-url postgresql://localhost/kopis_bench
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import shutil
+import argparse
+import resource
+import tempfile
+import tracemalloc
+import subprocess
+from datetime import date, timedelta
+
+PROJECT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+def start_fake_server(args):
+    """대역 서버를 별도 프로세스로 시작 (측정 대상 프로세스의 CPU/메모리와 분리) - (프로세스, 주소)"""
+    command = [
+        sys.executable, os.path.join(PROJECT_DIR, 'fake_kopis_server.py'),
+        '--port', '0',
+        '--performances', str(args.performances),
+        '--start', args.start,
+        '--days', str(args.days),
+        '--latency', str(args.latency),
+        '--error-rate', str(args.error_rate),
+    ]
+    process = subprocess.Popen(command, stdout=subprocess.PIPE, text=True)
+    line = process.stdout.readline()
+    match = re.search(r'(http://\S+)', line)
+    if not match:
+        process.kill()
+        raise RuntimeError(f"대역 서버 시작 실패: {line!r}")
+    return process, match.group(1)
+
+def peak_rss_mb():
+    """프로세스 최대 RSS (MB, Linux는 KB 단위, macOS는 바이트 단위로 보고됨)"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+def run_phase(name, importer_factory, statement_counter, transport, options, trace_memory):
+    """동기화 1회 실행 후 측정값 반환"""
+    calls_before = sum(stat['calls'] for stat in transport.get_stats().values())
+    statement_counter['count'] = 0
+    if trace_memory:
+        tracemalloc.start()
+    rss_before = peak_rss_mb()
+    started = time.perf_counter()
+
+    importer = importer_factory()
+    importer.import_performances(**options)
+
+    elapsed = time.perf_counter() - started
+    stats = importer.last_import_stats
+    records = stats['received']
+    result = {
+        'phase': name,
+        'seconds': round(elapsed, 2),
+        'records': records,
+        'inserted': stats['inserted'],
+        'updated': stats['updated'],
+        'failed_batches': stats['failed_batches'],
+        'records_per_sec': round(records / elapsed, 1) if elapsed else 0,
+        'db_statements': statement_counter['count'],
+        'statements_per_record': round(statement_counter['count'] / records, 3) if records else None,
+        'http_calls': sum(stat['calls'] for stat in transport.get_stats().values()) - calls_before,
+        'peak_rss_mb': peak_rss_mb(),
+        'rss_growth_mb': round(peak_rss_mb() - rss_before, 1),
+    }
+    if trace_memory:
+        result['python_peak_mb'] = round(tracemalloc.get_traced_memory()[1] / (1024 * 1024), 1)
+        tracemalloc.stop()
+    return result
+
+def main():
+    """메인 실행 함수"""
+    default_start = date(date.today().year, 1, 1)
+    parser = argparse.ArgumentParser(description='KOPIS 동기화 벤치마크')
+    parser.add_argument('--performances', type=int, default=5000, help='대역 서버의 합성 공연 수')
+    parser.add_argument('--start', default=default_start.strftime('%Y%m%d'), help='동기화 시작일 (YYYYMMDD)')
+    parser.add_argument('--days', type=int, default=365, help='동기화 기간(일)')
+    parser.add_argument('--latency', type=float, default=20, help='대역 서버 평균 응답 지연(ms)')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='대역 서버 503 응답 비율 (0~1)')
+    parser.add_argument('--workers', type=int, default=4, help='동시 조회 스레드 수')
+    parser.add_argument('--batch-size', type=int, default=500, help='커밋 배치 크기')
+    parser.add_argument('--incremental', action='store_true',
+                        help='증분 동기화로 실행 (두 번째 실행은 변경분 조회 비용을 측정)')
+    parser.add_argument('--database-url', help='측정에 쓸 데이터베이스 (기본: 임시 SQLite 파일)')
+    parser.add_argument('--trace-memory', action='store_true',
+                        help='tracemalloc으로 Python 힙 최대치도 측정 (처리량이 느려짐)')
+    parser.add_argument('--json', help='결과를 JSON 파일로 저장')
+    parser.add_argument('--min-records-per-sec', type=float, help='첫 실행 처리량 하한')
+    parser.add_argument('--max-statements-per-record', type=float, help='첫 실행 공연당 DB 문장 수 상한')
+    parser.add_argument('--max-peak-rss-mb', type=float, help='최대 RSS 상한(MB)')
+    args = parser.parse_args()
+
+    end_date = (date(int(args.start[:4]), int(args.start[4:6]), int(args.start[6:8]))
+                + timedelta(days=args.days - 1)).strftime('%Y%m%d')
+    temp_dir = tempfile.mkdtemp(prefix='kopis-bench-')
+    server, base_url = start_fake_server(args)
+
+    try:
+        # main 모듈이 설정을 읽기 전에 대역 서버/임시 DB/캐시 끄기 지정
+        os.environ['KOPIS_BASE_URL'] = base_url
+        os.environ['KOPIS_CACHE_MODE'] = 'off'
+        os.environ.setdefault('KOPIS_API_KEY', 'benchmark')
+        database_url = args.database_url or f"sqlite:///{os.path.join(temp_dir, 'benchmark.db')}"
+        # main은 postgres:// 형식만 PostgreSQL로 인식 (postgresql://은 로컬에서 SQLite로 대체됨)
+        os.environ['DATABASE_URL'] = re.sub(r'^postgresql://', 'postgres://', database_url)
+        sys.path.insert(0, PROJECT_DIR)
+
+        from sqlalchemy import event
+        from main import app, db
+        from kopis_api_integration import KOPISDataImporter
+        from kopis_transport import kopis_transport
+
+        options = {
+            'start_date': args.start,
+            'end_date': end_date,
+            'fetch_details': False,
+            'batch_size': args.batch_size,
+            'full_sync': True,
+            'max_workers': args.workers,
+            'incremental': args.incremental,
+        }
+
+        results = []
+        with app.app_context():
+            db.create_all()
+            statement_counter = {'count': 0}
+
+            @event.listens_for(db.engine, 'before_cursor_execute')
+            def count_statement(conn, cursor, statement, parameters, context, executemany):
+                statement_counter['count'] += 1
+
+            for phase in ('initial', 'resync'):
+                results.append(run_phase(phase, lambda: KOPISDataImporter(db.session), statement_counter,
+                                         kopis_transport, options, args.trace_memory))
+            # 임시 DB를 지우기 전에 호출 수 저장 (종료 시 flush가 없는 DB를 열지 않도록)
+            kopis_transport.quota.flush()
+
+        print(f"🎭 대역 서버: {base_url} (공연 {args.performances}개, 지연 {args.latency}ms, 오류율 {args.error_rate})")
+        print(f"🗄️  데이터베이스: {os.environ['DATABASE_URL']}")
+        header = f"{'phase':<8} {'records':>8} {'sec':>8} {'rec/s':>8} {'stmts':>7} {'stmt/rec':>9} {'http':>6} {'rss MB':>7}"
+        print(header)
+        print('-' * len(header))
+        for result in results:
+            print(f"{result['phase']:<8} {result['records']:>8} {result['seconds']:>8} {result['records_per_sec']:>8} "
+                  f"{result['db_statements']:>7} {str(result['statements_per_record']):>9} {result['http_calls']:>6} "
+                  f"{result['peak_rss_mb']:>7}")
+
+        if args.json:
+            with open(args.json, 'w', encoding='utf-8') as f:
+                json.dump({'options': vars(args), 'results': results}, f, ensure_ascii=False, indent=2)
+
+        # 기준 미달 확인 (첫 실행 기준)
+        initial = results[0]
+        failures = []
+        if initial['failed_batches']:
+            failures.append(f"실패한 배치 {initial['failed_batches']}개")
+        if args.min_records_per_sec is not None and initial['records_per_sec'] < args.min_records_per_sec:
+            failures.append(f"처리량 {initial['records_per_sec']} < {args.min_records_per_sec} rec/s")
+        if (args.max_statements_per_record is not None and initial['statements_per_record'] is not None
+                and initial['statements_per_record'] > args.max_statements_per_record):
+            failures.append(f"공연당 DB 문장 {initial['statements_per_record']} > {args.max_statements_per_record}")
+        if args.max_peak_rss_mb is not None and initial['peak_rss_mb'] > args.max_peak_rss_mb:
+            failures.append(f"최대 RSS {initial['peak_rss_mb']}MB > {args.max_peak_rss_mb}MB")
+        if failures:
+            print(f"❌ 기준 미달: {', '.join(failures)}")
+            sys.exit(1)
+        print("✅ 벤치마크 완료")
+    finally:
+        server.terminate()
+        server.wait(timeout=10)
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+if __name__ == '__main__':
+    main()
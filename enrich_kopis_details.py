@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+KOPIS 상세 정보 보강 스크립트
+목록 동기화로 들어온 공연의 상세/예매처 정보를 호출 속도 제한을 지키며 채웁니다.
+처리 결과는 배치마다 저장되므로 중단 후 다시 실행하면 남은 공연부터 이어서 처리합니다.
+
+사용법:
+    python enrich_kopis_details.py                      # 대기 공연 최대 500개 보강
+    python enrich_kopis_details.py --limit 5000 --rate 3
+    python enrich_kopis_details.py --interval 600       # 10분마다 반복 실행
+"""
+
+import os
+import sys
+import time
+import argparse
+import logging
+
+# 프로젝트 루트 디렉토리를 Python 경로에 추가
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from main import app, db, invalidate_home_cache
+from kopis_api_integration import KOPISDetailEnricher
+
+logger = logging.getLogger(__name__)
+
+def run_enrichment(limit, workers, rate):
+    """보강 작업 1회 실행"""
+    with app.app_context():
+        enricher = KOPISDetailEnricher(db.session, max_workers=workers, rate_per_second=rate)
+        result = enricher.enrich_pending(limit=limit)
+        if result['enriched']:
+            invalidate_home_cache('kopis_detail_enrichment')
+        print(f"🔎 KOPIS 상세 정보: {result}")
+        return result
+
+def main():
+    """메인 실행 함수"""
+    parser = argparse.ArgumentParser(description='KOPIS 상세 정보 보강')
+    parser.add_argument('--limit', type=int, default=500,
+                        help='1회 실행에서 보강할 최대 공연 수')
+    parser.add_argument('--workers', type=int, default=int(os.environ.get('KOPIS_DETAIL_WORKERS', 4)),
+                        help='동시 조회 스레드 수')
+    parser.add_argument('--rate', type=float, default=float(os.environ.get('KOPIS_DETAIL_RATE', 5)),
+                        help='초당 최대 KOPIS 호출 수 (상세 1건 = 호출 2회)')
+    parser.add_argument('--interval', type=int, default=0,
+                        help='반복 실행 간격(초). 0이면 1회만 실행')
+    args = parser.parse_args()
+    if args.rate <= 0:
+        parser.error('--rate는 0보다 커야 합니다')
+    
+    while True:
+        try:
+            run_enrichment(args.limit, args.workers, args.rate)
+        except Exception as e:
+            logger.error(f"상세 정보 보강 실패: {e}")
+            if not args.interval:
+                sys.exit(1)
+        
+        if not args.interval:
+            break
+        time.sleep(args.interval)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,293 @@
+#!/usr/bin/env python3
+"""
+KOPIS Open API 로컬 대역 서버
+kopis.or.kr 대신 합성 공연/공연장 데이터를 KOPIS와 같은 XML 형식으로 돌려줍니다.
+데이터 크기, 응답 지연, 오류 비율을 조절할 수 있어 동기화 성능 측정과 장애 재현에 사용합니다.
+
+지원 엔드포인트 (/openApi/restful 아래):
+    /pblprfr            공연 목록 (stdate, eddate, cpage, rows, catecode, area, afterdate)
+    /pblprfr/<mt20id>   공연 상세
+    /prfplc             공연장 목록 (cpage, rows, signgucode)
+    /prfplc/<mt10id>    공연장 상세 (주소, 좌표 - 일부는 좌표 없음)
+
+사용법:
+    python fake_kopis_server.py                                       # 127.0.0.1:8765, 공연 5000개
+    python fake_kopis_server.py --performances 20000 --latency 80 --error-rate 0.02
+    KOPIS_BASE_URL=http://127.0.0.1:8765/openApi/restful python sync_kopis.py --no-incremental
+"""
+
+import os
+import sys
+import time
+import random
+import argparse
+import threading
+from collections import defaultdict
+from datetime import date, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+from xml.sax.saxutils import escape
+
+# 프로젝트 루트 디렉토리를 Python 경로에 추가
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from kopis_api_integration import KOPISAPIClient
+
+API_PREFIX = '/openApi/restful'
+
+class FakeKOPISDataset:
+    """시드로 재현 가능한 합성 공연/공연장 데이터"""
+
+    def __init__(self, performances=5000, venues=300, start_date=None, days=365, seed=42):
+        rng = random.Random(seed)
+        start_date = start_date or date(date.today().year, 1, 1)
+        areas = list(KOPISAPIClient.AREA_CODES.items())
+        genres = list(KOPISAPIClient.CATEGORY_CODES.items())
+
+        self.venues = []
+        for i in range(venues):
+            area_name, area_code = rng.choice(areas)
+            has_coordinates = rng.random() < 0.9
+            self.venues.append({
+                'mt10id': f'FC{i + 1:06d}',
+                'fcltynm': f'{area_name} 공연장 {i + 1}',
+                'mt13cnt': str(rng.randint(1, 5)),
+                'fcltychartr': rng.choice(['공공(문예회관)', '민간(대학로 외)', '민간(대학로)', '기타(공공)']),
+                'sidonm': area_name,
+                'gugunnm': f'{area_name} {rng.randint(1, 9)}구',
+                'opende': str(rng.randint(1970, 2024)),
+                'seatscale': str(rng.randint(50, 3000)),
+                'telno': f'02-{rng.randint(100, 9999)}-{rng.randint(1000, 9999)}',
+                'relateurl': f'http://venue{i + 1}.example.com',
+                'adres': f'{area_name} {area_name} {rng.randint(1, 9)}구 공연로 {rng.randint(1, 300)}',
+                'la': f'{rng.uniform(33.2, 38.5):.6f}' if has_coordinates else '',
+                'lo': f'{rng.uniform(126.0, 129.5):.6f}' if has_coordinates else '',
+                'area_code': area_code,
+            })
+
+        self.performances = []
+        for i in range(performances):
+            venue = rng.choice(self.venues)
+            genre_name, genre_code = rng.choice(genres)
+            begin = start_date + timedelta(days=rng.randrange(days))
+            end = begin + timedelta(days=rng.choice([0, 0, 1, 2, 6, 13, 29, 59]))
+            self.performances.append({
+                'mt20id': f'PF{i + 1:06d}',
+                'prfnm': f'{genre_name} 공연 {i + 1}',
+                'prfpdfrom': begin,
+                'prfpdto': end,
+                'fcltynm': f"{venue['fcltynm']} ({rng.choice(['대극장', '소극장', '1관'])})",
+                'mt10id': venue['mt10id'],
+                'poster': f'http://www.kopis.or.kr/upload/pfmPoster/PF_{i + 1:06d}.gif',
+                'area': venue['sidonm'],
+                'area_code': venue['area_code'],
+                'genrenm': genre_name,
+                'genre_code': genre_code,
+                'openrun': rng.choice(['N', 'N', 'N', 'Y']),
+                'entrpsnm': f'극단 {rng.randint(1, 500)}',
+                'pcseguidance': f'전석 {rng.choice([10, 20, 30, 50, 70]) * 1000:,}원',
+                'dtguidance': rng.choice(['화요일 ~ 금요일(19:30)', '토요일 ~ 일요일(15:00,18:00)', '매일(20:00)']),
+                'sty': f'{genre_name} 공연 {i + 1}의 줄거리입니다. ' * rng.randint(1, 5),
+                'prfcast': ', '.join(f'배우{rng.randint(1, 2000)}' for _ in range(rng.randint(1, 4))),
+                'prfruntime': f'{rng.choice([60, 90, 100, 120, 150])}분',
+                'prfage': rng.choice(['전체 관람가', '만 7세 이상', '만 13세 이상']),
+                'styurls': [f'http://www.kopis.or.kr/upload/pfmIntroImage/PF_{i + 1:06d}_{n}.jpg'
+                            for n in range(rng.randint(0, 2))],
+                # afterdate 필터용 최종 수정일 (공연 시작 전 임의 시점)
+                'updated': begin - timedelta(days=rng.randint(1, 90)),
+            })
+        self._by_id = {perf['mt20id']: perf for perf in self.performances}
+        self._venues_by_id = {venue['mt10id']: venue for venue in self.venues}
+
+    def find_performances(self, stdate, eddate, genre_code=None, area_code=None, after=None):
+        """기간이 겹치는 공연 (KOPIS 목록 조건과 같은 의미)"""
+        return [
+            perf for perf in self.performances
+            if perf['prfpdfrom'] <= eddate and perf['prfpdto'] >= stdate
+            and (not genre_code or perf['genre_code'] == genre_code)
+            and (not area_code or perf['area_code'] == area_code)
+            and (not after or perf['updated'] >= after)
+        ]
+
+    def get_performance(self, mt20id):
+        return self._by_id.get(mt20id)
+
+    def get_venue(self, mt10id):
+        return self._venues_by_id.get(mt10id)
+
+    def find_venues(self, area_code=None):
+        return [venue for venue in self.venues if not area_code or venue['area_code'] == area_code]
+
+def _xml_fields(record, fields):
+    parts = []
+    for field in fields:
+        value = record.get(field, '')
+        if isinstance(value, date):
+            value = value.strftime('%Y.%m.%d')
+        parts.append(f'<{field}>{escape(str(value))}</{field}>')
+    return ''.join(parts)
+
+LIST_FIELDS = ('mt20id', 'prfnm', 'prfpdfrom', 'prfpdto', 'fcltynm', 'poster', 'area', 'genrenm', 'openrun', 'prfstate')
+DETAIL_FIELDS = LIST_FIELDS + ('mt10id', 'entrpsnm', 'pcseguidance', 'dtguidance', 'sty', 'prfcast', 'prfruntime', 'prfage')
+VENUE_FIELDS = ('mt10id', 'fcltynm', 'mt13cnt', 'fcltychartr', 'sidonm', 'gugunnm', 'opende')
+VENUE_DETAIL_FIELDS = VENUE_FIELDS + ('seatscale', 'telno', 'relateurl', 'adres', 'la', 'lo')
+
+class FakeKOPISHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        server = self.server
+        url = urlparse(self.path)
+        params = {name: values[0] for name, values in parse_qs(url.query).items()}
+        path = url.path[len(API_PREFIX):] if url.path.startswith(API_PREFIX) else None
+        endpoint = self._endpoint_name(path)
+        server.record(endpoint)
+
+        if server.latency:
+            time.sleep(server.latency * random.uniform(0.5, 1.5))
+        if server.error_rate and random.random() < server.error_rate:
+            server.record(endpoint, error=True)
+            return self._send(503, '<error>temporarily unavailable</error>')
+        if not params.get('service'):
+            return self._send(401, '<error>service key required</error>')
+
+        if path == '/pblprfr':
+            return self._send(200, self._performance_list(params))
+        if path and path.startswith('/pblprfr/') and path.count('/') == 2:
+            perf = server.dataset.get_performance(path.rsplit('/', 1)[1])
+            if perf is None:
+                return self._send(200, '<dbs></dbs>')
+            styurls = ''.join(f'<styurl>{escape(url)}</styurl>' for url in perf['styurls'])
+            return self._send(200, f'<dbs><db>{_xml_fields(self._with_state(perf), DETAIL_FIELDS)}'
+                                   f'<styurls>{styurls}</styurls></db></dbs>')
+        if path and path.startswith('/prfplc/') and path.count('/') == 2:
+            venue = server.dataset.get_venue(path.rsplit('/', 1)[1])
+            if venue is None:
+                return self._send(200, '<dbs></dbs>')
+            return self._send(200, f'<dbs><db>{_xml_fields(venue, VENUE_DETAIL_FIELDS)}</db></dbs>')
+        if path == '/prfplc':
+            venues = server.dataset.find_venues(params.get('signgucode'))
+            page = self._page(venues, params)
+            return self._send(200, '<dbs>' + ''.join(f'<db>{_xml_fields(v, VENUE_FIELDS)}</db>' for v in page) + '</dbs>')
+
+        self._send(404, '<error>not found</error>')
+
+    def _performance_list(self, params):
+        try:
+            stdate = self._parse_date(params['stdate'])
+            eddate = self._parse_date(params['eddate'])
+            after = self._parse_date(params['afterdate']) if params.get('afterdate') else None
+        except (KeyError, ValueError):
+            return '<dbs></dbs>'
+        found = self.server.dataset.find_performances(stdate, eddate, params.get('catecode'), params.get('area'), after)
+        page = self._page(found, params)
+        return '<dbs>' + ''.join(f'<db>{_xml_fields(self._with_state(p), LIST_FIELDS)}</db>' for p in page) + '</dbs>'
+
+    @staticmethod
+    def _with_state(perf):
+        today = date.today()
+        if perf['prfpdto'] < today:
+            state = '공연완료'
+        elif perf['prfpdfrom'] > today:
+            state = '공연예정'
+        else:
+            state = '공연중'
+        return dict(perf, prfstate=state)
+
+    @staticmethod
+    def _page(items, params):
+        rows = max(1, int(params.get('rows') or 10))
+        page = max(1, int(params.get('cpage') or 1))
+        return items[(page - 1) * rows:page * rows]
+
+    @staticmethod
+    def _parse_date(value):
+        return date(int(value[:4]), int(value[4:6]), int(value[6:8]))
+
+    @staticmethod
+    def _endpoint_name(path):
+        if not path:
+            return 'unknown'
+        parts = [part for part in path.split('/') if part]
+        return parts[0] if len(parts) == 1 else f'{parts[0]}/detail'
+
+    def _send(self, status, body):
+        payload = ('<?xml version="1.0" encoding="UTF-8"?>' + body).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'text/xml;charset=UTF-8')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+class FakeKOPISServer(ThreadingHTTPServer):
+    """KOPIS 대역 HTTP 서버 (latency는 초, error_rate는 503 응답 비율)"""
+
+    daemon_threads = True
+
+    def __init__(self, dataset, host='127.0.0.1', port=8765, latency=0.0, error_rate=0.0, verbose=False):
+        super().__init__((host, port), FakeKOPISHandler)
+        self.dataset = dataset
+        self.latency = latency
+        self.error_rate = error_rate
+        self.verbose = verbose
+        self._lock = threading.Lock()
+        self._stats = defaultdict(lambda: {'requests': 0, 'errors': 0})
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self.server_address[:2]
+        return f'http://{host}:{port}{API_PREFIX}'
+
+    def record(self, endpoint, error=False):
+        with self._lock:
+            self._stats[endpoint]['errors' if error else 'requests'] += 1
+
+    def get_stats(self):
+        with self._lock:
+            return {endpoint: dict(stat) for endpoint, stat in self._stats.items()}
+
+    def start(self):
+        """백그라운드 스레드에서 실행 (같은 프로세스에서 시험할 때)"""
+        self._thread = threading.Thread(target=self.serve_forever, name='fake-kopis-server', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+def main():
+    """메인 실행 함수"""
+    parser = argparse.ArgumentParser(description='KOPIS Open API 로컬 대역 서버')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765, help='0이면 빈 포트 자동 선택')
+    parser.add_argument('--performances', type=int, default=5000, help='합성 공연 수')
+    parser.add_argument('--venues', type=int, default=300, help='합성 공연장 수')
+    parser.add_argument('--start', default=None, help='공연 기간 시작일 (YYYYMMDD, 기본: 올해 1월 1일)')
+    parser.add_argument('--days', type=int, default=365, help='공연 시작일이 분포할 기간(일)')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--latency', type=float, default=20, help='평균 응답 지연(ms, ±50%% 변동)')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='503 응답 비율 (0~1)')
+    parser.add_argument('--verbose', action='store_true', help='요청 로그 출력')
+    args = parser.parse_args()
+
+    start_date = FakeKOPISHandler._parse_date(args.start) if args.start else None
+    dataset = FakeKOPISDataset(args.performances, args.venues, start_date, args.days, args.seed)
+    server = FakeKOPISServer(dataset, args.host, args.port, args.latency / 1000, args.error_rate, args.verbose)
+    # 벤치마크 스크립트가 주소를 읽을 수 있도록 첫 줄에 출력
+    print(f"🎭 KOPIS 대역 서버: {server.base_url} (공연 {args.performances}개, 공연장 {args.venues}개)", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        print(f"📊 요청 통계: {server.get_stats()}")
+        server.server_close()
+
+if __name__ == '__main__':
+    main()
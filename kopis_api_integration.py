@@ -4,24 +4,79 @@ KOPIS API 연동 시스템
 공연예술통합전산망(KOPIS) 데이터를 활용한 공연시장 분석 및 발전 도구
 """
 
-import requests
+import re
 import json
+import hashlib
 import pandas as pd
 from datetime import datetime, timedelta
 import logging
 from typing import Dict, List, Optional
 import os
+import queue
+import threading
 from dotenv import load_dotenv
 import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor
+from sqlalchemy import func
+from kopis_transport import kopis_transport, TokenBucket, iterparse_records, KOPISBudgetExceeded, KOPIS_BASE_URL
 
 load_dotenv()
 
+def venue_name_keys(name: str) -> List[str]:
+    """공연 장소명으로 찾을 공연장 이름 후보
+    
+    KOPIS 공연 목록의 장소는 '공연시설명 (공연장명)' 형식이므로 전체 이름과 끝의 괄호를 뗀 이름을 차례로 쓴다.
+    """
+    name = ' '.join((name or '').split())
+    if not name:
+        return []
+    stripped = re.sub(r'\s*\([^()]*\)$', '', name)
+    return [name, stripped] if stripped and stripped != name else [name]
+
 class KOPISAPIClient:
     """KOPIS API 클라이언트"""
     
-    def __init__(self, api_key: str = None):
+    # 장르 코드 (catecode)
+    CATEGORY_CODES = {
+        '연극': 'AAAA',
+        '뮤지컬': 'GGGA',
+        '서양음악(클래식)': 'CCCA',
+        '한국음악(국악)': 'CCCC',
+        '대중음악': 'CCCD',
+        '무용(서양/한국무용)': 'BBBC',
+        '대중무용': 'BBBE',
+        '서커스/마술': 'EEEB',
+        '복합': 'EEEA'
+    }
+    
+    # 지역 코드 (area)
+    AREA_CODES = {
+        '서울': '11',
+        '부산': '21',
+        '대구': '22',
+        '인천': '23',
+        '광주': '24',
+        '대전': '25',
+        '울산': '26',
+        '세종': '29',
+        '경기': '31',
+        '강원': '32',
+        '충북': '33',
+        '충남': '34',
+        '전북': '35',
+        '전남': '36',
+        '경북': '37',
+        '경남': '38',
+        '제주': '39'
+    }
+    
+    # 목록 API 한 번에 조회 가능한 최대 기간 (일)
+    MAX_WINDOW_DAYS = 31
+    
+    def __init__(self, api_key: str = None, transport=None):
         self.api_key = api_key or os.getenv('KOPIS_API_KEY')
-        self.base_url = "http://www.kopis.or.kr/openApi/restful"
+        self.base_url = KOPIS_BASE_URL
+        self.transport = transport or kopis_transport
         self.logger = logging.getLogger(__name__)
         
         if not self.api_key:
@@ -32,10 +87,25 @@ class KOPISAPIClient:
                            end_date: str = None,
                            category: str = None,
                            location: str = None,
-                           limit: int = 100) -> List[Dict]:
-        """공연 목록 조회"""
-        if not self.api_key:
+                           limit: int = 100,
+                           page: int = 1) -> List[Dict]:
+        """공연 목록 조회 (한 페이지)"""
+        try:
+            return list(self.iter_performance_list(start_date, end_date, category, location, limit, page))
+        except Exception as e:
+            self.logger.error(f"KOPIS API 호출 실패: {e}")
             return []
+    
+    def iter_performance_list(self, 
+                              start_date: str = None, 
+                              end_date: str = None,
+                              category: str = None,
+                              location: str = None,
+                              limit: int = 100,
+                              page: int = 1):
+        """공연 목록 한 페이지를 응답을 받는 대로 한 건씩 반환 (실패 시 예외 발생)"""
+        if not self.api_key:
+            return
         
         # 기본 날짜 설정 (최근 1개월)
         if not start_date:
@@ -48,7 +118,7 @@ class KOPISAPIClient:
             'stdate': start_date,
             'eddate': end_date,
             'rows': limit,
-            'cpage': 1
+            'cpage': page
         }
         
         if category:
@@ -56,20 +126,205 @@ class KOPISAPIClient:
         if location:
             params['area'] = self._get_area_code(location)
         
+        for perf_data in self._iter_performance_page(params):
+            # 필수 필드가 있는 경우만 반환
+            if perf_data['title'] and perf_data['kopis_id']:
+                yield perf_data
+    
+    def _iter_performance_page(self, params: Dict):
+        """공연 목록 한 페이지를 스트리밍 파싱 (필수 필드 확인 전 모든 항목, 실패 시 예외 발생)"""
+        with self.transport.open_stream(f"{self.base_url}/pblprfr", params=params) as stream:
+            for db in iterparse_records(stream, 'db'):
+                yield self._performance_from_element(db)
+    
+    def _fetch_performance_page(self, params: Dict) -> List[Dict]:
+        """공연 목록 한 페이지 조회 (실패 시 예외 발생)"""
+        return list(self._iter_performance_page(params))
+    
+    def get_all_pages(self, start_date: str, end_date: str,
+                      category: str = None, location: str = None,
+                      rows: int = 100, max_pages: int = 1000,
+                      after_date: str = None) -> List[Dict]:
+        """한 조건(기간/장르/지역)의 모든 페이지 조회 (iter_all_pages 결과 목록)"""
+        return list(self.iter_all_pages(start_date, end_date, category, location, rows, max_pages, after_date))
+    
+    def iter_all_pages(self, start_date: str, end_date: str,
+                       category: str = None, location: str = None,
+                       rows: int = 100, max_pages: int = 1000,
+                       after_date: str = None):
+        """한 조건(기간/장르/지역)의 모든 페이지를 응답을 받는 대로 한 건씩 반환 (실패 시 예외 발생)
+        
+        마지막 페이지(rows 미만)까지 이어서 요청한다.
+        after_date(YYYYMMDD)를 주면 그 날짜 이후 등록/수정된 공연만 조회한다 (KOPIS afterdate).
+        """
+        if not self.api_key:
+            return
+        
+        params = {
+            'service': self.api_key,
+            'stdate': start_date,
+            'eddate': end_date,
+            'rows': rows
+        }
+        if category:
+            params['catecode'] = self._get_category_code(category)
+        if location:
+            params['area'] = self._get_area_code(location)
+        if after_date:
+            params['afterdate'] = after_date
+        
+        for page in range(1, max_pages + 1):
+            count = 0
+            for item in self._iter_performance_page(dict(params, cpage=page)):
+                count += 1
+                if item['title'] and item['kopis_id']:
+                    yield item
+            if count < rows:
+                break
+        else:
+            self.logger.warning(f"최대 페이지 수({max_pages}) 도달: {start_date}~{end_date} {category or ''} {location or ''}")
+    
+    def build_sync_partitions(self, start_date: str, end_date: str,
+                              window_days: int = MAX_WINDOW_DAYS,
+                              by_area: bool = True, by_genre: bool = True,
+                              monthly: bool = False) -> List[Dict]:
+        """동기화 작업 분할 목록 (기간 구간 × 지역 × 장르)
+        
+        monthly=True이면 기간을 달력 월 단위(시작/끝 월 전체 포함)로 나눠 실행마다 같은 구간이 나오게 한다.
+        지역/장르 분할은 AREA_CODES/CATEGORY_CODES가 KOPIS 코드 전체를 덮는다고 가정한다.
+        """
+        start = datetime.strptime(start_date, '%Y%m%d').date()
+        end = datetime.strptime(end_date, '%Y%m%d').date()
+        window_days = max(1, min(window_days, self.MAX_WINDOW_DAYS))
+        
+        windows = []
+        window_start = start.replace(day=1) if monthly else start
+        while window_start <= end:
+            if monthly:
+                next_month = (window_start.replace(day=28) + timedelta(days=4)).replace(day=1)
+                window_end = next_month - timedelta(days=1)
+            else:
+                window_end = min(window_start + timedelta(days=window_days - 1), end)
+            windows.append((window_start.strftime('%Y%m%d'), window_end.strftime('%Y%m%d')))
+            window_start = window_end + timedelta(days=1)
+        
+        locations = list(self.AREA_CODES) if by_area else [None]
+        categories = list(self.CATEGORY_CODES) if by_genre else [None]
+        
+        return [{'start_date': stdate, 'end_date': eddate, 'location': location, 'category': category}
+                for stdate, eddate in windows
+                for location in locations
+                for category in categories]
+    
+    @staticmethod
+    def partition_key(partition: Dict) -> str:
+        """분할 작업 식별 키 (예: '20260101-20260131|서울|연극', 전체는 '*')"""
+        return (f"{partition['start_date']}-{partition['end_date']}"
+                f"|{partition.get('location') or '*'}|{partition.get('category') or '*'}")
+    
+    def get_all_performances(self, start_date: str = None, end_date: str = None,
+                             rows: int = 100, window_days: int = MAX_WINDOW_DAYS,
+                             by_area: bool = True, by_genre: bool = True,
+                             max_workers: int = 4, partitions: List[Dict] = None) -> List[Dict]:
+        """전체 기간의 모든 공연 조회 (iter_all_performances 결과 목록)"""
+        return list(self.iter_all_performances(start_date, end_date, rows, window_days,
+                                               by_area, by_genre, max_workers, partitions))
+    
+    def iter_all_performances(self, start_date: str = None, end_date: str = None,
+                              rows: int = 100, window_days: int = MAX_WINDOW_DAYS,
+                              by_area: bool = True, by_genre: bool = True,
+                              max_workers: int = 4, partitions: List[Dict] = None,
+                              queue_size: int = 1000):
+        """전체 기간의 모든 공연을 응답을 받는 대로 한 건씩 반환
+        
+        기간 구간 × 지역 × 장르로 작업을 나눠 제한된 수의 스레드로 동시에 모든 페이지를 조회하고,
+        여러 구간에 걸친 공연은 kopis_id 기준으로 한 번만 반환한다. 스레드는 파싱한 공연을 크기
+        queue_size의 큐로 넘기므로, 소비 측이 느리면 조회도 기다려 메모리 사용량이 일정하다.
+        partitions를 직접 주면 그 목록을 조회하며, 각 항목의 after_date가 있으면 변경분만 조회한다.
+        실패한 분할 수 등 실행 통계는 self.last_sync_stats에, 성공한 분할별 결과
+        ({키: {'count', 'max_id'}})는 self.last_partition_results에 남긴다.
+        """
+        if not self.api_key:
+            return
+        
+        if not start_date:
+            start_date = (datetime.now() - timedelta(days=30)).strftime('%Y%m%d')
+        if not end_date:
+            end_date = (datetime.now() + timedelta(days=30)).strftime('%Y%m%d')
+        
+        if partitions is None:
+            partitions = self.build_sync_partitions(start_date, end_date, window_days, by_area, by_genre)
+        seen_ids = set()
+        failed = []
+        self.last_partition_results = {}
+        
+        records = queue.Queue(maxsize=max(1, queue_size))
+        stop = threading.Event()
+        
+        def put(item) -> bool:
+            # 소비 측이 중단하면(제너레이터 종료) 대기 중인 스레드도 빠져나오도록 주기적으로 확인
+            while not stop.is_set():
+                try:
+                    records.put(item, timeout=0.5)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+        
+        def fetch_partition(index: int):
+            # (분할 번호, 공연) ... (분할 번호, None: 완료 | 예외: 실패) 순서로 큐에 넣음
+            partition = partitions[index]
+            try:
+                for perf_data in self.iter_all_pages(partition['start_date'], partition['end_date'],
+                                                     partition.get('category'), partition.get('location'), rows,
+                                                     after_date=partition.get('after_date')):
+                    if not put((index, perf_data)):
+                        return
+            except Exception as e:
+                put((index, e))
+                return
+            put((index, None))
+        
+        executor = ThreadPoolExecutor(max_workers=max(1, max_workers))
         try:
-            response = requests.get(f"{self.base_url}/pblprfr", params=params)
-            response.raise_for_status()
-            
-            # XML 응답을 파싱 (간단한 파싱)
-            data = self._parse_xml_response(response.text)
-            return data
+            for index in range(len(partitions)):
+                executor.submit(fetch_partition, index)
             
-        except Exception as e:
-            self.logger.error(f"KOPIS API 호출 실패: {e}")
-            return []
+            progress = {}  # 분할 번호 -> [받은 수, 가장 큰 kopis_id]
+            pending = len(partitions)
+            while pending:
+                index, item = records.get()
+                partition = partitions[index]
+                if isinstance(item, Exception):
+                    self.logger.error(f"KOPIS 분할 조회 실패 ({partition}): {item}")
+                    failed.append(partition)
+                    pending -= 1
+                    continue
+                count, max_id = progress.setdefault(index, [0, None])
+                if item is None:
+                    self.last_partition_results[self.partition_key(partition)] = {'count': count, 'max_id': max_id}
+                    pending -= 1
+                    continue
+                
+                kopis_id = item['kopis_id']
+                progress[index] = [count + 1, max(max_id, kopis_id) if max_id else kopis_id]
+                if kopis_id not in seen_ids:
+                    seen_ids.add(kopis_id)
+                    yield item
+        finally:
+            stop.set()
+            executor.shutdown(wait=True, cancel_futures=True)
+        
+        self.last_sync_stats = {
+            'partitions': len(partitions),
+            'failed_partitions': len(failed),
+            'performances': len(seen_ids)
+        }
+        self.logger.info(f"KOPIS 전체 조회 완료: {self.last_sync_stats}")
     
-    def get_performance_detail(self, performance_id: str) -> Optional[Dict]:
-        """공연 상세 정보 조회"""
+    def get_performance_detail(self, performance_id: str, with_booking: bool = True,
+                               fresh: bool = False) -> Optional[Dict]:
+        """공연 상세 정보 조회 (with_booking=False이면 예매처 조회 생략, fresh=True이면 응답 캐시 무시)"""
         if not self.api_key:
             return None
         
@@ -79,24 +334,28 @@ class KOPISAPIClient:
         }
         
         try:
-            response = requests.get(f"{self.base_url}/pblprfr/{performance_id}", params=params)
+            response = self.transport.get(f"{self.base_url}/pblprfr/{performance_id}", params=params, fresh=fresh)
             response.raise_for_status()
             
             # 상세 정보 전용 파싱 메서드 사용
             data = self._parse_detail_xml_response(response.text)
             
             # 예매처 정보 추가 조회
-            booking_info = self.get_booking_info(performance_id)
-            if booking_info:
-                data.update(booking_info)
+            booking_info = self.get_booking_info(performance_id, fresh=fresh) if with_booking else None
+            if data and booking_info:
+                # 예매처 조회 실패 시의 빈 기본값이 상세 정보를 덮어쓰지 않도록 값이 있는 항목만 반영
+                data.update({key: value for key, value in booking_info.items() if value})
             
             return data
             
+        except KOPISBudgetExceeded:
+            # 실패로 세지 않고 호출한 쪽에서 다음 실행으로 미루도록 그대로 올림
+            raise
         except Exception as e:
             self.logger.error(f"공연 상세 정보 조회 실패: {e}")
             return None
     
-    def get_booking_info(self, performance_id: str) -> Optional[Dict]:
+    def get_booking_info(self, performance_id: str, fresh: bool = False) -> Optional[Dict]:
         """공연 예매처 정보 조회"""
         if not self.api_key:
             return None
@@ -108,7 +367,8 @@ class KOPISAPIClient:
         
         try:
             # 예매처 정보 API (실제 엔드포인트는 KOPIS 문서 확인 필요)
-            response = requests.get(f"{self.base_url}/pblprfr/{performance_id}/booking", params=params)
+            response = self.transport.get(f"{self.base_url}/pblprfr/{performance_id}/booking", params=params,
+                                          fresh=fresh)
             response.raise_for_status()
             
             # 예매처 정보 파싱
@@ -149,67 +409,101 @@ class KOPISAPIClient:
             }
     
     def get_venue_list(self, location: str = None) -> List[Dict]:
-        """공연장 목록 조회"""
-        if not self.api_key:
+        """공연장(공연시설) 목록 전체 조회"""
+        try:
+            return list(self.iter_venue_list(location))
+        except Exception as e:
+            self.logger.error(f"공연장 목록 조회 실패: {e}")
             return []
+    
+    def iter_venue_list(self, location: str = None, rows: int = 100, max_pages: int = 1000):
+        """공연장 목록을 마지막 페이지까지 스트리밍으로 한 건씩 반환 (실패 시 예외 발생)"""
+        if not self.api_key:
+            return
         
         params = {
             'service': self.api_key,
-            'rows': 100,
-            'cpage': 1
+            'rows': rows
         }
-        
         if location:
-            params['area'] = self._get_area_code(location)
+            params['signgucode'] = self._get_area_code(location)
+        
+        for page in range(1, max_pages + 1):
+            count = 0
+            with self.transport.open_stream(f"{self.base_url}/prfplc", params=dict(params, cpage=page)) as stream:
+                for db in iterparse_records(stream, 'db'):
+                    count += 1
+                    venue = self._venue_from_element(db)
+                    if venue['kopis_venue_id'] and venue['name']:
+                        yield venue
+            if count < rows:
+                break
+        else:
+            self.logger.warning(f"공연장 목록 최대 페이지 수({max_pages}) 도달")
+    
+    def get_venue_detail(self, venue_id: str) -> Optional[Dict]:
+        """공연장 상세 정보 조회 (주소, 좌표, 객석 수, 연락처)"""
+        if not self.api_key:
+            return None
         
         try:
-            response = requests.get(f"{self.base_url}/prfplc", params=params)
+            response = self.transport.get(f"{self.base_url}/prfplc/{venue_id}", params={'service': self.api_key})
             response.raise_for_status()
+            db = ET.fromstring(response.content).find('.//db')
+            if db is None:
+                return None
             
-            data = self._parse_xml_response(response.text)
-            return data
+            detail = self._venue_from_element(db)
+            detail.update(
+                address=self._get_text(db, 'adres') or '',
+                phone=self._get_text(db, 'telno') or '',
+                website=self._get_text(db, 'relateurl') or '',
+                seat_count=self._to_int(self._get_text(db, 'seatscale')),
+                latitude=self._to_float(self._get_text(db, 'la')),
+                longitude=self._to_float(self._get_text(db, 'lo'))
+            )
+            return detail
             
+        except KOPISBudgetExceeded:
+            raise
         except Exception as e:
-            self.logger.error(f"공연장 목록 조회 실패: {e}")
-            return []
+            self.logger.error(f"공연장 상세 정보 조회 실패 ({venue_id}): {e}")
+            return None
+    
+    def _venue_from_element(self, db) -> Dict:
+        """공연장 목록/상세 <db> 요소를 Venue 컬럼 값으로 변환"""
+        return {
+            'kopis_venue_id': self._get_text(db, 'mt10id') or '',
+            'name': self._get_text(db, 'fcltynm') or '',
+            'area': self._get_text(db, 'sidonm') or '',
+            'district': self._get_text(db, 'gugunnm') or '',
+            'facility_type': self._get_text(db, 'fcltychartr') or '',
+            'hall_count': self._to_int(self._get_text(db, 'mt13cnt')),
+            'opened_year': self._get_text(db, 'opende') or ''
+        }
+    
+    @staticmethod
+    def _to_int(value) -> Optional[int]:
+        try:
+            return int(str(value).replace(',', ''))
+        except (TypeError, ValueError):
+            return None
+    
+    @staticmethod
+    def _to_float(value) -> Optional[float]:
+        try:
+            number = float(value)
+        except (TypeError, ValueError):
+            return None
+        return number or None  # KOPIS는 좌표가 없으면 0을 주기도 함
     
     def _get_category_code(self, category: str) -> str:
         """카테고리 코드 매핑"""
-        category_mapping = {
-            '연극': 'AAAA',
-            '뮤지컬': 'AAAB',
-            '서양음악(클래식)': 'CCCA',
-            '한국음악(국악)': 'CCCB',
-            '대중음악': 'CCCC',
-            '무용(서양/한국무용)': 'BBBA',
-            '대중무용': 'BBBB',
-            '서커스/마술': 'EEEA',
-            '복합': 'EEEE'
-        }
-        return category_mapping.get(category, '')
+        return self.CATEGORY_CODES.get(category, '')
     
     def _get_area_code(self, location: str) -> str:
         """지역 코드 매핑"""
-        area_mapping = {
-            '서울': '11',
-            '부산': '21',
-            '대구': '22',
-            '인천': '23',
-            '광주': '24',
-            '대전': '25',
-            '울산': '26',
-            '세종': '29',
-            '경기': '31',
-            '강원': '32',
-            '충북': '33',
-            '충남': '34',
-            '전북': '35',
-            '전남': '36',
-            '경북': '37',
-            '경남': '38',
-            '제주': '39'
-        }
-        return area_mapping.get(location, '')
+        return self.AREA_CODES.get(location, '')
     
     def _parse_xml_response(self, xml_text: str) -> List[Dict]:
         """XML 응답을 파싱하여 딕셔너리 리스트로 변환"""
@@ -219,27 +513,7 @@ class KOPISAPIClient:
             
             # 공연 목록 파싱
             for db in root.findall('.//db'):
-                perf_data = {}
-                
-                # 기본 정보 추출
-                perf_data['kopis_id'] = self._get_text(db, 'mt20id')
-                perf_data['title'] = self._get_text(db, 'prfnm')
-                perf_data['group_name'] = self._get_text(db, 'entrpsnm')  # 수정: prfpdfrom -> entrpsnm
-                perf_data['date'] = self._get_text(db, 'prfpdfrom')
-                perf_data['end_date'] = self._get_text(db, 'prfpdto')
-                perf_data['location'] = self._get_text(db, 'fcltynm')
-                perf_data['address'] = self._get_text(db, 'adres')
-                perf_data['category'] = self._get_text(db, 'genrenm')
-                perf_data['price'] = self._get_text(db, 'pcseguidance')
-                perf_data['image_url'] = self._get_text(db, 'poster')
-                perf_data['description'] = self._get_text(db, 'sty')
-                perf_data['time'] = self._get_text(db, 'dtguidance')
-                
-                # 예매처 정보 추출 (KOPIS API 실제 필드명)
-                perf_data['ticket_url'] = self._get_text(db, 'ticket_url')  # 예매 URL
-                perf_data['booking_phone'] = self._get_text(db, 'telno')  # 예매 전화번호
-                perf_data['booking_website'] = self._get_text(db, 'relateurl')  # 관련 URL
-                perf_data['contact_email'] = self._get_text(db, 'email')  # 연락처 이메일
+                perf_data = self._performance_from_element(db)
                 
                 # 필수 필드가 있는 경우만 추가
                 if perf_data['title'] and perf_data['kopis_id']:
@@ -252,6 +526,33 @@ class KOPISAPIClient:
             self.logger.error(f"XML 파싱 실패: {e}")
             return []
     
+    def _performance_from_element(self, db) -> Dict:
+        """목록 XML의 db 요소 하나를 딕셔너리로 변환"""
+        perf_data = {}
+        
+        # 기본 정보 추출
+        perf_data['kopis_id'] = self._get_text(db, 'mt20id')
+        perf_data['title'] = self._get_text(db, 'prfnm')
+        perf_data['group_name'] = self._get_text(db, 'entrpsnm')  # 수정: prfpdfrom -> entrpsnm
+        perf_data['date'] = self._get_text(db, 'prfpdfrom')
+        perf_data['end_date'] = self._get_text(db, 'prfpdto')
+        perf_data['location'] = self._get_text(db, 'fcltynm')
+        perf_data['address'] = self._get_text(db, 'adres')
+        perf_data['category'] = self._get_text(db, 'genrenm')
+        perf_data['price'] = self._get_text(db, 'pcseguidance')
+        perf_data['image_url'] = self._get_text(db, 'poster')
+        perf_data['description'] = self._get_text(db, 'sty')
+        perf_data['time'] = self._get_text(db, 'dtguidance')
+        perf_data['state'] = self._get_text(db, 'prfstate')  # 공연예정/공연중/공연완료
+        
+        # 예매처 정보 추출 (KOPIS API 실제 필드명)
+        perf_data['ticket_url'] = self._get_text(db, 'ticket_url')  # 예매 URL
+        perf_data['booking_phone'] = self._get_text(db, 'telno')  # 예매 전화번호
+        perf_data['booking_website'] = self._get_text(db, 'relateurl')  # 관련 URL
+        perf_data['contact_email'] = self._get_text(db, 'email')  # 연락처 이메일
+        
+        return perf_data
+    
     def _parse_detail_xml_response(self, xml_text: str) -> Optional[Dict]:
         """공연 상세 정보 XML 파싱"""
         try:
@@ -270,12 +571,21 @@ class KOPISAPIClient:
             detail_data['date'] = self._get_text(db, 'prfpdfrom')
             detail_data['end_date'] = self._get_text(db, 'prfpdto')
             detail_data['location'] = self._get_text(db, 'fcltynm')
+            detail_data['venue_kopis_id'] = self._get_text(db, 'mt10id')  # 공연시설 ID (공연장 연결용)
             detail_data['address'] = self._get_text(db, 'adres')
             detail_data['category'] = self._get_text(db, 'genrenm')
             detail_data['price'] = self._get_text(db, 'pcseguidance')
             detail_data['image_url'] = self._get_text(db, 'poster')
             detail_data['description'] = self._get_text(db, 'sty')
             detail_data['time'] = self._get_text(db, 'dtguidance')
+            detail_data['state'] = self._get_text(db, 'prfstate')
+            detail_data['cast'] = self._get_text(db, 'prfcast')
+            detail_data['crew'] = self._get_text(db, 'prfcrew')
+            detail_data['runtime'] = self._get_text(db, 'prfruntime')
+            detail_data['age'] = self._get_text(db, 'prfage')
+            # 소개 이미지 목록 (Performance.story_images에 JSON 문자열로 저장)
+            story_images = [url.text for url in db.findall('.//styurl') if url.text]
+            detail_data['story_images'] = json.dumps(story_images, ensure_ascii=False) if story_images else ''
             
             # 예매처 정보 (상세 정보에서 더 정확한 정보)
             detail_data['ticket_url'] = self._get_text(db, 'ticket_url')
@@ -395,106 +705,819 @@ class PerformanceAnalytics:
 class KOPISDataImporter:
     """KOPIS 데이터 임포트 클래스"""
     
+    # 재동기화 시 KOPIS 값으로 갱신하는 필드 (빈 값은 기존 값 유지)
+    SYNC_UPDATE_FIELDS = ('title', 'group_name', 'description', 'location', 'address', 'price',
+                          'date', 'start_date', 'end_date', 'time', 'image_url', 'category',
+                          'ticket_url', 'booking_phone', 'booking_website', 'performance_state')
+    
     def __init__(self, db_session):
         self.db_session = db_session
         self.kopis_client = KOPISAPIClient()
         self.logger = logging.getLogger(__name__)
+        self.last_import_stats = {'inserted': 0, 'updated': 0, 'unchanged': 0, 'received': 0,
+                                  'failed_batches': 0, 'failed_partitions': 0, 'errors': []}
+        self._progress = None
         
         # Performance 모델 import
         try:
-            from main import Performance
+            from main import (Performance, KopisSyncState, Venue, parse_single_date,
+                              normalize_performance_state, expected_performance_state)
             self.Performance = Performance
+            self.KopisSyncState = KopisSyncState
+            self.Venue = Venue
+            self.parse_single_date = parse_single_date
+            self.normalize_performance_state = normalize_performance_state
+            self.expected_performance_state = expected_performance_state
         except ImportError:
             self.logger.error("Performance 모델을 import할 수 없습니다.")
             self.Performance = None
+            self.KopisSyncState = None
+            self.Venue = None
+            self.parse_single_date = None
+            self.normalize_performance_state = None
+            self.expected_performance_state = None
     
     def import_performances(self, start_date: str = None, end_date: str = None, 
-                          fetch_details: bool = False, batch_size: int = 50) -> int:
-        """KOPIS 데이터를 로컬 데이터베이스로 임포트 (성능 최적화)"""
+                          fetch_details: bool = False, batch_size: int = 50,
+                          full_sync: bool = False, max_workers: int = 4,
+                          incremental: bool = False, progress=None) -> int:
+        """KOPIS 데이터를 로컬 데이터베이스로 임포트 (성능 최적화)
+        
+        full_sync=True이면 기간/지역/장르로 분할해 모든 페이지를 동시에 조회하고,
+        아니면 지역/장르로 나누지 않고 기간 구간별로 모든 페이지를 조회한다.
+        incremental=True이면 월 구간별(full_sync이면 × 지역 × 장르) 처리 위치를 KopisSyncState에
+        저장해 두고, 다음 실행에서는 그 이후 등록/수정된 공연만 조회하며 이미 끝난 구간은 건너뛴다.
+        배치마다 기존 kopis_id와 내용 해시를 한 번에 조회해 새 공연은 일괄 삽입, 내용이 바뀐 공연만
+        일괄 갱신하며 (같은 공연은 건너뜀) 새로 추가된 공연 수를 반환한다 (갱신 수는 self.last_import_stats).
+        응답은 스트리밍으로 파싱되는 대로 배치에 쌓여 바로 반영되므로 전체 목록을 메모리에 두지 않는다.
+        progress가 주어지면 배치가 끝날 때마다 progress(self.last_import_stats)를 호출한다.
+        """
+        self.last_import_stats = {'inserted': 0, 'updated': 0, 'unchanged': 0, 'received': 0,
+                                  'failed_batches': 0, 'failed_partitions': 0, 'errors': []}
+        self._progress = progress
+        self.kopis_client.last_sync_stats = {}
+        run_started = datetime.now()
+        
         try:
             # 실제 KOPIS API 호출
-            performances = self.kopis_client.get_performance_list(start_date, end_date)
-            self.logger.info(f"KOPIS API에서 {len(performances)}개의 공연 데이터를 가져왔습니다.")
+            partitions = None
+            if incremental:
+                start_date = start_date or (run_started - timedelta(days=30)).strftime('%Y%m%d')
+                end_date = end_date or (run_started + timedelta(days=30)).strftime('%Y%m%d')
+                partitions = self.kopis_client.build_sync_partitions(
+                    start_date, end_date, by_area=full_sync, by_genre=full_sync, monthly=True
+                )
+                partitions = self._plan_incremental(partitions, run_started)
+                performances = self.kopis_client.iter_all_performances(max_workers=max_workers, partitions=partitions) \
+                    if partitions else iter(())
+            else:
+                performances = self.kopis_client.iter_all_performances(
+                    start_date, end_date, max_workers=max_workers, by_area=full_sync, by_genre=full_sync
+                )
             
-            imported_count = 0
-            batch_count = 0
-            
-            for i, perf_data in enumerate(performances):
-                try:
-                    # 중복 확인 (제목으로 체크)
-                    existing = self.db_session.query(self.Performance).filter_by(
-                        title=perf_data.get('title', '')
-                    ).first()
-                    
-                    if existing:
-                        self.logger.debug(f"이미 존재하는 공연: {perf_data.get('title', '')}")
-                        continue
-                    
-                    # 상세 정보 가져오기 (선택적, 성능 향상을 위해 기본적으로 비활성화)
-                    if fetch_details and perf_data.get('kopis_id'):
-                        try:
-                            detail_data = self.kopis_client.get_performance_detail(perf_data['kopis_id'])
-                            if detail_data:
-                                # 상세 정보에서 예매처 정보 업데이트
-                                perf_data['ticket_url'] = detail_data.get('ticket_url', perf_data.get('ticket_url', ''))
-                                perf_data['booking_phone'] = detail_data.get('booking_phone', '')
-                                perf_data['booking_website'] = detail_data.get('booking_website', '')
-                                perf_data['contact_email'] = detail_data.get('contact_email', '')
-                        except Exception as e:
-                            self.logger.warning(f"상세 정보 조회 실패 (ID: {perf_data.get('kopis_id', '')}): {e}")
-                    
-                    # 구매 방법 설정 (기본값)
-                    purchase_methods = ['현장구매']  # 기본값
-                    
-                    # 새로운 공연 데이터 생성
-                    performance = self.Performance(
-                        title=perf_data.get('title', ''),
-                        group_name=perf_data.get('group_name', ''),
-                        description=perf_data.get('description', ''),
-                        location=perf_data.get('location', ''),
-                        address=perf_data.get('address', ''),
-                        price=perf_data.get('price', ''),
-                        date=perf_data.get('date', ''),
-                        time=perf_data.get('time', ''),
-                        contact_email=perf_data.get('contact_email', ''),
-                        video_url=perf_data.get('video_url', ''),
-                        image_url=perf_data.get('image_url', ''),
-                        main_category='공연',
-                        category=perf_data.get('category', ''),
-                        ticket_url=perf_data.get('ticket_url', ''),
-                        booking_phone=perf_data.get('booking_phone', ''),
-                        booking_website=perf_data.get('booking_website', ''),
-                        purchase_methods=json.dumps(purchase_methods),
-                        is_approved=True,
-                        kopis_id=perf_data.get('kopis_id', ''),
-                        kopis_synced_at=datetime.now()
-                    )
-                    
-                    self.db_session.add(performance)
-                    imported_count += 1
-                    batch_count += 1
-                    
-                    # 배치 커밋 (성능 향상)
-                    if batch_count >= batch_size:
-                        self.db_session.commit()
-                        self.logger.info(f"배치 커밋 완료: {batch_count}개 공연 처리됨 (총 {imported_count}개)")
-                        batch_count = 0
-                    
-                except Exception as e:
-                    self.logger.error(f"공연 데이터 임포트 실패: {e}")
+            # kopis_id 기준 중복 제거 (같은 응답 안의 중복 포함) 후 배치 단위 반영
+            seen_ids = set()
+            batch = []
+            for perf_data in performances:
+                kopis_id = perf_data.get('kopis_id')
+                if not kopis_id or kopis_id in seen_ids:
                     continue
+                seen_ids.add(kopis_id)
+                self.last_import_stats['received'] += 1
+                batch.append(perf_data)
+                if len(batch) >= batch_size:
+                    self._commit_batch(batch, fetch_details)
+                    batch = []
+            if batch:
+                self._commit_batch(batch, fetch_details)
+            
+            # 분할 조회 실패는 예외가 아니라 조회 통계에만 남으므로 결과에 옮겨 둠
+            self.last_import_stats['failed_partitions'] = self.kopis_client.last_sync_stats.get('failed_partitions', 0)
+            self.logger.info(f"KOPIS API에서 {len(seen_ids)}개의 공연 데이터를 가져왔습니다.")
             
-            # 남은 배치 커밋
-            if batch_count > 0:
-                self.db_session.commit()
-                self.logger.info(f"최종 배치 커밋 완료: {batch_count}개 공연 처리됨")
+            # 모든 배치가 반영된 경우에만 처리 위치 전진 (실패 시 다음 실행에서 같은 구간 재조회)
+            if incremental and partitions and not self.last_import_stats['failed_batches']:
+                self._save_sync_state(partitions, run_started)
             
-            self.logger.info(f"총 {imported_count}개의 새로운 공연이 성공적으로 임포트되었습니다.")
+            imported_count = self.last_import_stats['inserted']
+            self.logger.info(f"총 {imported_count}개의 새로운 공연이 성공적으로 임포트되었습니다. "
+                             f"(갱신 {self.last_import_stats['updated']}개, "
+                             f"변경 없음 {self.last_import_stats['unchanged']}개)")
             return imported_count
             
         except Exception as e:
             self.logger.error(f"KOPIS 데이터 임포트 중 오류 발생: {e}")
+            self.last_import_stats['errors'].append(f"임포트 중단: {e}")
+            return self.last_import_stats['inserted']
+    
+    def _commit_batch(self, batch: List[Dict], fetch_details: bool) -> bool:
+        """배치 하나 반영 후 커밋 (실패 시 롤백하고 False)"""
+        try:
+            inserted, updated, unchanged = self._import_batch(batch, fetch_details)
+            self.db_session.commit()
+            self.last_import_stats['inserted'] += inserted
+            self.last_import_stats['updated'] += updated
+            self.last_import_stats['unchanged'] += unchanged
+            self.logger.info(f"배치 커밋 완료: 추가 {inserted}개, 갱신 {updated}개, 변경 없음 {unchanged}개")
+            committed = True
+        except Exception as e:
+            self.db_session.rollback()
+            self.last_import_stats['failed_batches'] += 1
+            self.last_import_stats['errors'].append(f"배치 임포트 실패: {e}")
+            self.logger.error(f"공연 데이터 배치 임포트 실패: {e}")
+            committed = False
+        
+        if self._progress is not None:
+            self._progress(self.last_import_stats)
+        return committed
+    
+    def _plan_incremental(self, partitions: List[Dict], run_started: datetime) -> List[Dict]:
+        """저장된 처리 위치로 이번 실행에서 조회할 분할과 afterdate 결정"""
+        keys = [self.kopis_client.partition_key(partition) for partition in partitions]
+        states = {
+            state.partition_key: state
+            for state in self.db_session.query(self.KopisSyncState)
+            .filter(self.KopisSyncState.partition_key.in_(keys))
+        }
+        
+        today = run_started.date()
+        planned = []
+        skipped = 0
+        for key, partition in zip(keys, partitions):
+            state = states.get(key)
+            if state is None or state.last_synced_at is None:
+                planned.append((datetime.min, partition))
+                continue
+            # 이미 끝난 구간을 끝난 뒤에 동기화했다면 더 받을 것이 없음
+            if state.window_end < today and state.last_synced_at.date() > state.window_end:
+                skipped += 1
+                continue
+            # 하루 겹쳐서 조회 (afterdate는 일 단위)
+            after_date = (state.last_synced_at - timedelta(days=1)).strftime('%Y%m%d')
+            planned.append((state.last_synced_at, dict(partition, after_date=after_date)))
+        
+        # 남은 목록 호출 예산보다 분할이 많으면 오래 동기화하지 않은 분할부터 (분할당 최소 1회 호출)
+        # 나머지는 처리 위치가 저장되지 않으므로 다음 실행에서 이어서 조회
+        deferred = 0
+        remaining = self.kopis_client.transport.quota.remaining('list')
+        if remaining is not None and len(planned) > remaining:
+            planned.sort(key=lambda item: item[0])
+            deferred = len(planned) - remaining
+            planned = planned[:remaining]
+        planned = [partition for _, partition in planned]
+        
+        self.last_import_stats.update(planned_partitions=len(planned), skipped_partitions=skipped,
+                                      deferred_partitions=deferred)
+        self.logger.info(f"KOPIS 증분 동기화 계획: 조회 {len(planned)}개, 건너뜀 {skipped}개, 예산 부족으로 미룸 {deferred}개")
+        return planned
+    
+    def _save_sync_state(self, partitions: List[Dict], run_started: datetime):
+        """성공한 분할의 처리 위치 저장"""
+        results = getattr(self.kopis_client, 'last_partition_results', {})
+        keys = [self.kopis_client.partition_key(partition) for partition in partitions]
+        states = {
+            state.partition_key: state
+            for state in self.db_session.query(self.KopisSyncState)
+            .filter(self.KopisSyncState.partition_key.in_(keys))
+        }
+        
+        for key, partition in zip(keys, partitions):
+            result = results.get(key)
+            if result is None:
+                continue
+            state = states.get(key)
+            if state is None:
+                state = self.KopisSyncState(
+                    partition_key=key,
+                    window_start=datetime.strptime(partition['start_date'], '%Y%m%d').date(),
+                    window_end=datetime.strptime(partition['end_date'], '%Y%m%d').date(),
+                    area=partition.get('location'),
+                    genre=partition.get('category')
+                )
+                self.db_session.add(state)
+            state.last_synced_at = run_started
+            state.last_seen_count = result['count']
+            state.last_seen_max_id = result['max_id']
+        
+        self.db_session.commit()
+    
+    def _import_batch(self, batch: List[Dict], fetch_details: bool):
+        """한 배치 반영 - (추가 수, 갱신 수, 변경 없음 수)"""
+        kopis_ids = [perf_data['kopis_id'] for perf_data in batch]
+        
+        # 배치의 기존 공연과 내용 해시를 한 번에 조회 (kopis_id 고유 인덱스 사용)
+        existing = {
+            kopis_id: (performance_id, content_hash)
+            for kopis_id, performance_id, content_hash in
+            self.db_session.query(self.Performance.kopis_id, self.Performance.id, self.Performance.kopis_content_hash)
+            .filter(self.Performance.kopis_id.in_(kopis_ids))
+        }
+        
+        # 장소명으로 공연장 연결 (공연장 이름 인덱스로 배치당 한 번 조회)
+        venues = self._venues_by_name(perf_data.get('location') for perf_data in batch)
+        
+        synced_at = datetime.now()
+        new_rows = []
+        update_rows = []
+        unchanged = 0
+        
+        for perf_data in batch:
+            performance_id, stored_hash = existing.get(perf_data['kopis_id'], (None, None))
+            venue = next((venues[key] for key in venue_name_keys(perf_data.get('location')) if key in venues), None)
+            if venue is not None and not perf_data.get('address'):
+                perf_data['address'] = venue['address']
+            content_hash = self._content_hash(self._performance_values(perf_data), venue)
+            
+            if performance_id is not None:
+                # 내용이 같으면 행을 건드리지 않음 (쓰기/캐시 무효화를 실제 변경에 비례하게)
+                if content_hash == stored_hash:
+                    unchanged += 1
+                    continue
+                values = self._performance_values(perf_data)
+                update = {field: values[field] for field in self.SYNC_UPDATE_FIELDS if values[field]}
+                update.update(id=performance_id, kopis_synced_at=synced_at, kopis_content_hash=content_hash)
+                if venue is not None:
+                    update['venue_id'] = venue['id']
+                update_rows.append(update)
+                continue
+            
+            # 상세 정보 가져오기 (선택적, 성능 향상을 위해 기본적으로 비활성화)
+            if fetch_details:
+                try:
+                    detail_data = self.kopis_client.get_performance_detail(perf_data['kopis_id'])
+                    if detail_data:
+                        # 상세 정보에서 예매처 정보 업데이트
+                        perf_data['ticket_url'] = detail_data.get('ticket_url', perf_data.get('ticket_url', ''))
+                        perf_data['booking_phone'] = detail_data.get('booking_phone', '')
+                        perf_data['booking_website'] = detail_data.get('booking_website', '')
+                        perf_data['contact_email'] = detail_data.get('contact_email', '')
+                except Exception as e:
+                    self.logger.warning(f"상세 정보 조회 실패 (ID: {perf_data.get('kopis_id', '')}): {e}")
+            
+            values = self._performance_values(perf_data)
+            values.update(
+                contact_email=perf_data.get('contact_email', ''),
+                video_url=perf_data.get('video_url', ''),
+                main_category='공연',
+                # 구매 방법 설정 (기본값)
+                purchase_methods=json.dumps(['현장구매']),
+                is_approved=True,
+                kopis_id=perf_data['kopis_id'],
+                kopis_synced_at=synced_at,
+                kopis_content_hash=content_hash,
+                venue_id=venue['id'] if venue is not None else None
+            )
+            new_rows.append(values)
+        
+        # 다중 행 INSERT / 기본 키 기준 일괄 UPDATE (변경된 행만)
+        if new_rows:
+            self.db_session.bulk_insert_mappings(self.Performance, new_rows)
+        if update_rows:
+            self.db_session.bulk_update_mappings(self.Performance, update_rows)
+        
+        return len(new_rows), len(update_rows), unchanged
+    
+    def _content_hash(self, values: Dict, venue: Optional[Dict]) -> str:
+        """정규화된 KOPIS 목록 값(+ 연결된 공연장)의 내용 해시 - 재동기화 시 변경 여부 비교용
+        
+        상세 보강으로 채워지는 값은 포함하지 않으므로 목록 내용이 같으면 해시도 같다.
+        """
+        payload = {field: values[field] for field in self.SYNC_UPDATE_FIELDS}
+        payload['venue_id'] = venue['id'] if venue is not None else None
+        encoded = json.dumps(payload, sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha256(encoded.encode('utf-8')).hexdigest()
+    
+    def _venues_by_name(self, locations) -> Dict[str, Dict]:
+        """장소명 후보 → 공연장 {'id', 'address'} (같은 이름의 공연장이 여럿이면 제외)"""
+        if self.Venue is None:
+            return {}
+        keys = {key for location in locations for key in venue_name_keys(location)}
+        if not keys:
+            return {}
+        
+        venues = {}
+        ambiguous = set()
+        for venue_id, name, address in self.db_session.query(self.Venue.id, self.Venue.name, self.Venue.address)\
+                .filter(self.Venue.name.in_(keys)):
+            if name in venues:
+                ambiguous.add(name)
+            venues[name] = {'id': venue_id, 'address': address or ''}
+        for name in ambiguous:
+            del venues[name]
+        return venues
+    
+    def _performance_values(self, perf_data: Dict) -> Dict:
+        """KOPIS 목록 데이터를 Performance 컬럼 값으로 변환"""
+        # 공연 기간 정규화 (KOPIS는 'YYYY.MM.DD' 형식)
+        start_date = self.parse_single_date(perf_data.get('date'))
+        end_date = self.parse_single_date(perf_data.get('end_date')) or start_date
+        # KOPIS 상태가 없으면 날짜로 계산
+        state = self.normalize_performance_state(perf_data.get('state')) or \
+            self.expected_performance_state(start_date, end_date)
+        
+        return {
+            'title': perf_data.get('title', ''),
+            'group_name': perf_data.get('group_name', ''),
+            'description': perf_data.get('description', ''),
+            'location': perf_data.get('location', ''),
+            'address': perf_data.get('address', ''),
+            'price': perf_data.get('price', ''),
+            'date': perf_data.get('date', ''),
+            'start_date': start_date,
+            'end_date': end_date,
+            'time': perf_data.get('time', ''),
+            'image_url': perf_data.get('image_url', ''),
+            'category': perf_data.get('category', ''),
+            'ticket_url': perf_data.get('ticket_url', ''),
+            'booking_phone': perf_data.get('booking_phone', ''),
+            'booking_website': perf_data.get('booking_website', ''),
+            'performance_state': state
+        }
+
+class KOPISDetailEnricher:
+    """KOPIS 상세 정보 보강 작업
+    
+    목록 동기화로 들어온 공연 중 아직 보강되지 않은 행(kopis_detail_synced_at IS NULL)을
+    제한된 스레드 풀에서 상세/예매처 API로 조회해 채운다. 호출 속도는 토큰 버킷으로 제한하고
+    결과는 배치마다 커밋하므로 중간에 멈춰도 다음 실행이 남은 행부터 이어서 처리한다.
+    """
+    
+    # 상세 조회 1건당 HTTP 호출 수 (상세 + 예매처)
+    CALLS_PER_DETAIL = 2
+    
+    # 상세 정보로 채우는 필드 (상세 응답 키 -> Performance 컬럼)
+    DETAIL_FIELDS = {
+        'group_name': 'group_name',
+        'description': 'description',
+        'time': 'time',
+        'price': 'price',
+        'address': 'address',
+        'ticket_url': 'ticket_url',
+        'booking_phone': 'booking_phone',
+        'booking_website': 'booking_website',
+        'contact_email': 'contact_email',
+        'venue_kopis_id': 'kopis_venue_id',
+        'cast': 'cast_info',
+        'crew': 'crew_info',
+        'runtime': 'runtime',
+        'age': 'age_limit',
+        'story_images': 'story_images'
+    }
+    
+    def __init__(self, db_session, kopis_client: KOPISAPIClient = None,
+                 max_workers: int = 4, rate_per_second: float = 5.0, max_attempts: int = 3):
+        self.db_session = db_session
+        self.kopis_client = kopis_client or KOPISAPIClient()
+        self.max_workers = max(1, max_workers)
+        # 한 번에 상세 + 예매처 두 토큰을 쓰므로 rate가 2보다 작아도 채워질 수 있는 크기로
+        self.rate_limiter = TokenBucket(rate_per_second, capacity=max(rate_per_second, self.CALLS_PER_DETAIL))
+        self.max_attempts = max_attempts
+        self.logger = logging.getLogger(__name__)
+        
+        from main import Performance, Venue
+        self.Performance = Performance
+        self.Venue = Venue
+    
+    def pending_query(self):
+        """보강 대기 공연 (실패 횟수 초과 행 제외)"""
+        Performance = self.Performance
+        return self.db_session.query(Performance.id, Performance.kopis_id)\
+            .filter(Performance.kopis_id.isnot(None),
+                    Performance.kopis_detail_synced_at.is_(None),
+                    (Performance.kopis_detail_attempts.is_(None)) |
+                    (Performance.kopis_detail_attempts < self.max_attempts))\
+            .order_by(Performance.id)
+    
+    def count_pending(self) -> int:
+        """보강 대기 공연 수"""
+        return self.pending_query().count()
+    
+    def enrich_pending(self, limit: int = 500, batch_size: int = 50) -> Dict:
+        """대기 공연을 최대 limit개까지 보강 - {'enriched', 'failed', 'remaining'}
+        
+        상세 조회용 호출 예산이 모자라면 예산만큼만 보강하고 나머지는 다음 실행으로 미룬다.
+        """
+        if not self.kopis_client.api_key:
+            return {'enriched': 0, 'failed': 0, 'remaining': self.count_pending()}
+        
+        allowance = self.kopis_client.transport.quota.remaining('detail')
+        if allowance is not None and allowance // self.CALLS_PER_DETAIL < limit:
+            limit = allowance // self.CALLS_PER_DETAIL
+            self.logger.info(f"KOPIS 호출 예산으로 이번 실행은 최대 {limit}개만 보강합니다.")
+        
+        stats = {'enriched': 0, 'failed': 0}
+        last_id = 0
+        
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            while stats['enriched'] + stats['failed'] < limit:
+                size = min(batch_size, limit - stats['enriched'] - stats['failed'])
+                rows = self.pending_query().filter(self.Performance.id > last_id).limit(size).all()
+                if not rows:
+                    break
+                last_id = rows[-1].id
+                
+                # HTTP 호출만 워커에서 수행하고 DB 반영은 현재 스레드에서 배치로 처리
+                try:
+                    details = list(executor.map(self._fetch_detail, [row.kopis_id for row in rows]))
+                except KOPISBudgetExceeded as e:
+                    # 이번 배치는 반영하지 않고 다음 실행으로 미룸 (실패 횟수에 넣지 않음)
+                    self.logger.warning(f"상세 정보 보강 중단: {e}")
+                    break
+                enriched, failed = self._apply_batch(rows, details)
+                stats['enriched'] += enriched
+                stats['failed'] += failed
+        
+        stats['remaining'] = self.count_pending()
+        self.logger.info(f"KOPIS 상세 정보 보강 완료: {stats}")
+        return stats
+    
+    def enrich_one(self, performance) -> bool:
+        """공연 하나를 바로 보강 (상세 페이지 첫 조회 시) - 성공 여부"""
+        if not self.kopis_client.api_key or not performance.kopis_id:
+            return False
+        # 오래된 상세 정보를 다시 받는 경우도 있으므로 응답 캐시를 거치지 않음
+        detail = self._fetch_detail(performance.kopis_id, fresh=True)
+        enriched, _ = self._apply_batch([performance], [detail])
+        return bool(enriched)
+    
+    def _fetch_detail(self, kopis_id: str, fresh: bool = False) -> Optional[Dict]:
+        """상세 정보 조회 (토큰 버킷으로 호출 속도 제한)"""
+        self.rate_limiter.acquire(self.CALLS_PER_DETAIL)
+        try:
+            return self.kopis_client.get_performance_detail(kopis_id, fresh=fresh)
+        except KOPISBudgetExceeded:
+            raise
+        except Exception as e:
+            self.logger.warning(f"상세 정보 조회 실패 (ID: {kopis_id}): {e}")
+            return None
+    
+    def _apply_batch(self, rows, details):
+        """조회 결과 일괄 반영 - (보강 수, 실패 수)"""
+        Performance = self.Performance
+        now = datetime.now()
+        failed_ids = []
+        updates = []
+        
+        # 상세 정보의 공연시설 ID로 공연장 연결 (배치당 한 번 조회)
+        venue_kopis_ids = {detail['venue_kopis_id'] for detail in details if detail and detail.get('venue_kopis_id')}
+        venue_ids = dict(
+            self.db_session.query(self.Venue.kopis_venue_id, self.Venue.id)
+            .filter(self.Venue.kopis_venue_id.in_(venue_kopis_ids))
+        ) if venue_kopis_ids else {}
+        
+        for row, detail in zip(rows, details):
+            if not detail:
+                failed_ids.append(row.id)
+                continue
+            update = {column: detail[key] for key, column in self.DETAIL_FIELDS.items() if detail.get(key)}
+            update.update(id=row.id, kopis_detail_synced_at=now, kopis_detail_attempts=0)
+            if venue_ids.get(detail.get('venue_kopis_id')):
+                update['venue_id'] = venue_ids[detail['venue_kopis_id']]
+            updates.append(update)
+        
+        try:
+            if updates:
+                self.db_session.bulk_update_mappings(Performance, updates)
+            if failed_ids:
+                self.db_session.query(Performance).filter(Performance.id.in_(failed_ids))\
+                    .update({Performance.kopis_detail_attempts: func.coalesce(Performance.kopis_detail_attempts, 0) + 1},
+                            synchronize_session=False)
+            self.db_session.commit()
+        except Exception:
+            self.db_session.rollback()
+            raise
+        
+        return len(updates), len(failed_ids)
+
+class KOPISVenueSyncer:
+    """KOPIS 공연장(공연시설) 동기화 작업
+    
+    /prfplc 목록을 스트리밍으로 받아 kopis_venue_id 기준으로 일괄 삽입/갱신하고, 상세 정보(주소/좌표)가
+    없는 공연장은 호출 속도를 제한하며 상세 API로 채운다. KOPIS가 좌표를 주지 않은 공연장만
+    지오코딩 캐시로 해결하고, 마지막으로 아직 연결되지 않은 공연을 공연장에 연결한다.
+    """
+    
+    LIST_FIELDS = ('name', 'area', 'district', 'facility_type', 'hall_count', 'opened_year')
+    DETAIL_FIELDS = ('address', 'phone', 'website', 'seat_count', 'latitude', 'longitude')
+    
+    def __init__(self, db_session, kopis_client: KOPISAPIClient = None,
+                 max_workers: int = 4, rate_per_second: float = 5.0):
+        self.db_session = db_session
+        self.kopis_client = kopis_client or KOPISAPIClient()
+        self.max_workers = max(1, max_workers)
+        self.rate_limiter = TokenBucket(rate_per_second)
+        self.logger = logging.getLogger(__name__)
+        
+        from main import Performance, Venue, geocode_address
+        self.Performance = Performance
+        self.Venue = Venue
+        self.geocode_address = geocode_address
+    
+    def sync(self, detail_limit: int = 500, geocode_limit: int = 200) -> Dict:
+        """목록 → 상세 → 지오코딩 → 공연 연결 순서로 1회 실행"""
+        inserted, updated = self.sync_list()
+        stats = {'inserted': inserted, 'updated': updated}
+        stats['detailed'] = self.enrich_details(limit=detail_limit)
+        stats['geocoded'] = self.geocode_missing(limit=geocode_limit)
+        stats['linked'] = self.link_performances()
+        self.logger.info(f"KOPIS 공연장 동기화 완료: {stats}")
+        return stats
+    
+    def sync_list(self, batch_size: int = 200):
+        """공연장 목록 일괄 삽입/갱신 - (추가 수, 갱신 수)"""
+        inserted = updated = 0
+        batch = {}
+        for venue in self.kopis_client.iter_venue_list():
+            batch[venue['kopis_venue_id']] = venue
+            if len(batch) >= batch_size:
+                added, changed = self._upsert_batch(list(batch.values()))
+                inserted, updated = inserted + added, updated + changed
+                batch = {}
+        if batch:
+            added, changed = self._upsert_batch(list(batch.values()))
+            inserted, updated = inserted + added, updated + changed
+        return inserted, updated
+    
+    def _upsert_batch(self, venues: List[Dict]):
+        """한 배치 반영 후 커밋 - (추가 수, 갱신 수)"""
+        Venue = self.Venue
+        existing_ids = dict(
+            self.db_session.query(Venue.kopis_venue_id, Venue.id)
+            .filter(Venue.kopis_venue_id.in_([venue['kopis_venue_id'] for venue in venues]))
+        )
+        synced_at = datetime.now()
+        new_rows = []
+        update_rows = []
+        for venue in venues:
+            values = {field: venue[field] for field in self.LIST_FIELDS if venue.get(field) not in (None, '')}
+            values['synced_at'] = synced_at
+            venue_id = existing_ids.get(venue['kopis_venue_id'])
+            if venue_id is None:
+                new_rows.append(dict(values, kopis_venue_id=venue['kopis_venue_id']))
+            else:
+                update_rows.append(dict(values, id=venue_id))
+        
+        try:
+            if new_rows:
+                self.db_session.bulk_insert_mappings(Venue, new_rows)
+            if update_rows:
+                self.db_session.bulk_update_mappings(Venue, update_rows)
+            self.db_session.commit()
+        except Exception:
+            self.db_session.rollback()
+            raise
+        return len(new_rows), len(update_rows)
+    
+    def enrich_details(self, limit: int = 500, batch_size: int = 50) -> int:
+        """상세 정보가 없는 공연장을 최대 limit개까지 채움 - 처리한 공연장 수 (호출 예산을 넘는 몫은 다음 실행으로)"""
+        if not self.kopis_client.api_key:
             return 0
+        allowance = self.kopis_client.transport.quota.remaining('detail')
+        if allowance is not None:
+            limit = min(limit, allowance)
+        
+        Venue = self.Venue
+        done = 0
+        last_id = 0
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            while done < limit:
+                rows = self.db_session.query(Venue.id, Venue.kopis_venue_id)\
+                    .filter(Venue.detail_synced_at.is_(None), Venue.id > last_id)\
+                    .order_by(Venue.id).limit(min(batch_size, limit - done)).all()
+                if not rows:
+                    break
+                last_id = rows[-1].id
+                
+                # HTTP 호출만 워커에서 수행하고 DB 반영은 현재 스레드에서 배치로 처리
+                try:
+                    details = list(executor.map(self._fetch_detail, [row.kopis_venue_id for row in rows]))
+                except KOPISBudgetExceeded as e:
+                    self.logger.warning(f"공연장 상세 조회 중단: {e}")
+                    break
+                now = datetime.now()
+                updates = []
+                for row, detail in zip(rows, details):
+                    if detail is None:
+                        continue
+                    update = {field: detail[field] for field in self.DETAIL_FIELDS if detail.get(field) not in (None, '')}
+                    update.update(id=row.id, detail_synced_at=now)
+                    if detail.get('latitude') and detail.get('longitude'):
+                        update.update(geocode_source='kopis', geocoded_at=now)
+                    updates.append(update)
+                
+                try:
+                    if updates:
+                        self.db_session.bulk_update_mappings(Venue, updates)
+                    self.db_session.commit()
+                except Exception:
+                    self.db_session.rollback()
+                    raise
+                done += len(updates)
+        return done
+    
+    def _fetch_detail(self, venue_id: str) -> Optional[Dict]:
+        """공연장 상세 조회 (토큰 버킷으로 호출 속도 제한)"""
+        self.rate_limiter.acquire()
+        return self.kopis_client.get_venue_detail(venue_id)
+    
+    def geocode_missing(self, limit: int = 200) -> int:
+        """KOPIS 좌표가 없는 공연장 주소를 지오코딩 캐시로 해결 - 좌표를 찾은 공연장 수"""
+        Venue = self.Venue
+        venues = Venue.query.filter(Venue.latitude.is_(None), Venue.geocoded_at.is_(None),
+                                    Venue.address.isnot(None), Venue.address != '')\
+            .order_by(Venue.id).limit(limit).all()
+        
+        resolved = 0
+        for venue in venues:
+            self.rate_limiter.acquire()
+            coordinates = self.geocode_address(venue.address)
+            if coordinates:
+                venue.latitude, venue.longitude = coordinates
+                venue.geocode_source = 'kakao'
+                resolved += 1
+            venue.geocoded_at = datetime.now()
+        self.db_session.commit()
+        return resolved
+    
+    def link_performances(self) -> int:
+        """공연장이 연결되지 않은 KOPIS 공연을 공연장에 연결 - 연결한 공연 수
+        
+        공연시설 ID(상세 보강으로 채워짐)가 있으면 그것으로, 없으면 장소명으로 찾는다.
+        연결된 공연에 주소가 비어 있으면 공연장 주소를 채운다.
+        """
+        Performance, Venue = self.Performance, self.Venue
+        rows = self.db_session.query(Performance.id, Performance.kopis_venue_id, Performance.location,
+                                     Performance.address)\
+            .filter(Performance.kopis_id.isnot(None), Performance.venue_id.is_(None)).all()
+        venues = {}
+        by_name = {}
+        ambiguous = set()
+        for venue in self.db_session.query(Venue.id, Venue.kopis_venue_id, Venue.name, Venue.address):
+            venues[venue.kopis_venue_id] = venue
+            if venue.name in by_name:
+                ambiguous.add(venue.name)
+            by_name[venue.name] = venue
+        for name in ambiguous:
+            del by_name[name]
+        
+        updates = []
+        for row in rows:
+            venue = venues.get(row.kopis_venue_id) or next(
+                (by_name[key] for key in venue_name_keys(row.location) if key in by_name), None)
+            if venue is None:
+                continue
+            update = {'id': row.id, 'venue_id': venue.id}
+            if not row.address and venue.address:
+                update['address'] = venue.address
+            updates.append(update)
+        
+        try:
+            if updates:
+                self.db_session.bulk_update_mappings(Performance, updates)
+            # 연결 후에 공연장 상세가 채워진 경우 비어 있는 공연 주소 보충
+            self.db_session.query(Performance)\
+                .filter(Performance.venue_id.in_(self.db_session.query(Venue.id).filter(Venue.address != '')),
+                        (Performance.address.is_(None)) | (Performance.address == ''))\
+                .update({Performance.address: self.db_session.query(Venue.address)
+                         .filter(Venue.id == Performance.venue_id).scalar_subquery()},
+                        synchronize_session=False)
+            self.db_session.commit()
+        except Exception:
+            self.db_session.rollback()
+            raise
+        return len(updates)
+
+class KOPISStateRefresher:
+    """공연 진행 상태(공연예정/공연중/공연완료) 갱신 작업
+    
+    저장된 시작/종료일로 보아 상태가 바뀌었을 공연(시작일이 지난 공연예정, 종료일이 지난 미완료,
+    상태 미기록)만 고른다. KOPIS 공연은 상세 API(예매처 제외, 호출 속도 제한)로 다시 조회해 KOPIS
+    상태와 바뀐 기간을 반영하고, 조회에 실패했거나 직접 등록한 공연은 날짜로 계산한 상태를 쓴다.
+    확인한 행은 state_checked_at을 기록해 같은 날 다시 조회하지 않으며, 공연완료가 된 행은 대상에서 빠진다.
+    """
+    
+    def __init__(self, db_session, kopis_client: KOPISAPIClient = None,
+                 max_workers: int = 4, rate_per_second: float = 5.0):
+        self.db_session = db_session
+        self.kopis_client = kopis_client or KOPISAPIClient()
+        self.max_workers = max(1, max_workers)
+        self.rate_limiter = TokenBucket(rate_per_second)
+        self.logger = logging.getLogger(__name__)
+        
+        from main import (Performance, parse_single_date, normalize_performance_state,
+                          expected_performance_state, PERFORMANCE_STATE_UPCOMING, PERFORMANCE_STATE_COMPLETED)
+        self.Performance = Performance
+        self.parse_single_date = parse_single_date
+        self.normalize_performance_state = normalize_performance_state
+        self.expected_performance_state = expected_performance_state
+        self.STATE_UPCOMING = PERFORMANCE_STATE_UPCOMING
+        self.STATE_COMPLETED = PERFORMANCE_STATE_COMPLETED
+    
+    def due_query(self, today=None):
+        """상태가 바뀌었을 공연 (오늘 이미 확인한 행 제외)"""
+        Performance = self.Performance
+        today = today or datetime.now().date()
+        day_start = datetime.combine(today, datetime.min.time())
+        return self.db_session.query(Performance.id, Performance.kopis_id, Performance.start_date,
+                                     Performance.end_date, Performance.performance_state)\
+            .filter(
+                (Performance.performance_state.is_(None) &
+                 (Performance.start_date.isnot(None) | Performance.end_date.isnot(None))) |
+                ((Performance.performance_state == self.STATE_UPCOMING) & (Performance.start_date <= today)) |
+                ((Performance.performance_state != self.STATE_COMPLETED) & (Performance.end_date < today)),
+                (Performance.state_checked_at.is_(None)) | (Performance.state_checked_at < day_start))\
+            .order_by(Performance.id)
+    
+    def count_due(self) -> int:
+        """갱신 대상 공연 수"""
+        return self.due_query().count()
+    
+    def refresh(self, limit: int = 1000, batch_size: int = 100, repoll: bool = True) -> Dict:
+        """대상 공연을 최대 limit개까지 갱신 - {'checked', 'changed', 'repolled', 'repoll_failed', 'remaining'}
+        
+        repoll=False이거나 API 키가 없으면 KOPIS를 조회하지 않고 날짜로만 계산한다.
+        """
+        repoll = repoll and bool(self.kopis_client.api_key)
+        stats = {'checked': 0, 'changed': 0, 'repolled': 0, 'repoll_failed': 0}
+        last_id = 0
+        # 상세 조회용 호출 예산을 넘는 공연은 날짜로만 계산
+        repoll_left = self.kopis_client.transport.quota.remaining('detail') if repoll else 0
+        
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            while stats['checked'] < limit:
+                size = min(batch_size, limit - stats['checked'])
+                rows = self.due_query().filter(self.Performance.id > last_id).limit(size).all()
+                if not rows:
+                    break
+                last_id = rows[-1].id
+                
+                # HTTP 호출만 워커에서 수행하고 DB 반영은 현재 스레드에서 배치로 처리
+                kopis_rows = [row for row in rows if row.kopis_id] if repoll else []
+                if repoll_left is not None:
+                    kopis_rows = kopis_rows[:repoll_left]
+                    repoll_left -= len(kopis_rows)
+                details = {}
+                try:
+                    for row, detail in zip(kopis_rows, executor.map(self._fetch_detail,
+                                                                    [row.kopis_id for row in kopis_rows])):
+                        details[row.id] = detail
+                except KOPISBudgetExceeded as e:
+                    # 다른 프로세스와 함께 예산을 다 쓴 경우 - 이번 실행의 나머지는 날짜로만 계산
+                    self.logger.warning(f"공연 상태 조회 중단: {e}")
+                    repoll = False
+                stats['repolled'] += sum(1 for detail in details.values() if detail)
+                stats['repoll_failed'] += sum(1 for detail in details.values() if not detail)
+                stats['changed'] += self._apply_batch(rows, details)
+                stats['checked'] += len(rows)
+        
+        stats['remaining'] = self.count_due()
+        self.logger.info(f"공연 진행 상태 갱신 완료: {stats}")
+        return stats
+    
+    def _fetch_detail(self, kopis_id: str) -> Optional[Dict]:
+        """상태 확인용 상세 조회 (예매처 제외, 응답 캐시 무시, 토큰 버킷으로 호출 속도 제한)"""
+        self.rate_limiter.acquire()
+        try:
+            return self.kopis_client.get_performance_detail(kopis_id, with_booking=False, fresh=True)
+        except KOPISBudgetExceeded:
+            raise
+        except Exception as e:
+            self.logger.warning(f"상태 조회 실패 (ID: {kopis_id}): {e}")
+            return None
+    
+    def _apply_batch(self, rows, details: Dict) -> int:
+        """새 상태 일괄 반영 - 상태가 바뀐 공연 수"""
+        now = datetime.now()
+        changed = 0
+        updates = []
+        
+        for row in rows:
+            update = {'id': row.id, 'state_checked_at': now}
+            start_date, end_date = row.start_date, row.end_date
+            state = None
+            detail = details.get(row.id)
+            if detail:
+                # 연장/조기 종료로 바뀐 기간 반영
+                new_start = self.parse_single_date(detail.get('date'))
+                new_end = self.parse_single_date(detail.get('end_date')) or new_start
+                if new_start and (new_start, new_end) != (start_date, end_date):
+                    start_date, end_date = new_start, new_end
+                    update.update(date=detail.get('date'), start_date=start_date, end_date=end_date)
+                state = self.normalize_performance_state(detail.get('state'))
+            state = state or self.expected_performance_state(start_date, end_date, now.date())
+            if state != row.performance_state:
+                update['performance_state'] = state
+                changed += 1
+            updates.append(update)
+        
+        try:
+            self.db_session.bulk_update_mappings(self.Performance, updates)
+            self.db_session.commit()
+        except Exception:
+            self.db_session.rollback()
+            raise
+        
+        return changed
 
 def main():
     """메인 실행 함수"""
@@ -0,0 +1,582 @@
+#!/usr/bin/env python3
+"""
+KOPIS HTTP 전송 계층
+main.py의 KopisAPIClient와 kopis_api_integration.py의 KOPISAPIClient가 함께 사용하는
+연결 풀(keep-alive) 세션, 연결/응답 타임아웃, 지터가 있는 지수 백오프 재시도,
+엔드포인트별 지연 시간 통계, 디스크 응답 캐시(기록/재생 모드), 스트리밍 XML 파싱,
+일별 호출 수 집계와 호출 예산(KOPISQuota)을 제공합니다.
+"""
+
+import os
+import re
+import atexit
+import json
+import hashlib
+import time
+import random
+import logging
+import threading
+import xml.etree.ElementTree as ET
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# KOPIS Open API 주소 (로컬 대역 서버 fake_kopis_server.py로 바꿔 시험할 수 있음)
+KOPIS_BASE_URL = os.environ.get('KOPIS_BASE_URL', 'http://www.kopis.or.kr/openApi/restful')
+
+# 재시도 대상 HTTP 상태 코드 (서버 오류 및 요청 제한)
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+# 엔드포인트 이름 정규화용 (공연/공연장 ID를 자리표시자로 치환)
+KOPIS_ID_PATTERN = re.compile(r'/[A-Z]{2}\d+')
+
+# 응답 캐시 모드
+#   off    - 캐시 사용 안 함 (기본)
+#   on     - TTL 이내 캐시 응답 사용, 없거나 만료되면 조회 후 저장 (만료 파일은 주기적으로 삭제)
+#   record - 항상 조회하고 저장 (캐시 갱신)
+#   replay - 캐시에서만 응답 (TTL 무시, 없으면 KOPISCacheMiss) - 오프라인 테스트/벤치마크용
+CACHE_MODES = ('off', 'on', 'record', 'replay')
+
+# HTTP 200으로 오는 KOPIS 오류 응답 (인증키 오류, 호출 제한 등) - 캐시하지 않음
+ERROR_PAYLOAD_PATTERN = re.compile(rb'<errmsg>|<returncode>\s*(?!0+\s*</returncode>)')
+ERROR_PAYLOAD_HEAD_BYTES = 1024
+
+class KOPISCacheMiss(requests.RequestException):
+    """replay 모드에서 캐시에 없는 요청"""
+
+class KOPISBudgetExceeded(requests.RequestException):
+    """오늘의 KOPIS 호출 예산을 다 써서 보내지 않은 요청"""
+
+# 목록 엔드포인트 - 예산 우선순위가 높음 (상세 조회는 목록용 예약분을 남기고 사용)
+LIST_ENDPOINTS = ('pblprfr', 'prfplc')
+
+class KOPISQuota:
+    """KOPIS 일별 호출 수 집계와 호출 예산
+
+    실제 네트워크 호출(재시도 포함, 캐시 적중 제외)을 엔드포인트별로 세어 두었다가 저장소(store)의 일별
+    누적값에 더하고(flush), 예산은 저장된 오늘 사용량(다른 프로세스 포함) + 아직 저장하지 않은 호출 수로
+    판단한다. 목록 조회는 예산 전체를, 상세 조회는 목록용 예약분(list_reserve 비율)을 뺀 만큼만 쓸 수 있어
+    상세 보강이 예산을 다 써서 목록 동기화가 멈추는 일이 없다. daily_budget이 0이면 집계만 한다.
+
+    store는 load(day) -> 그날 저장된 총 호출 수, add(day, {엔드포인트: 호출 수})를 제공하는 객체이며
+    (main.KopisUsageStore), 없으면 프로세스 메모리에서만 센다. store_factory를 주면 첫 호출(예산 확인)
+    때 저장소를 만들고 종료 시 남은 집계를 저장하도록 등록한다 (import만 한 프로세스는 DB를 건드리지 않음).
+    """
+
+    def __init__(self, daily_budget: int = 0, list_reserve: float = 0.3, store=None, sync_seconds: float = 60,
+                 store_factory=None):
+        self.daily_budget = max(0, daily_budget)
+        self.list_reserve = min(1.0, max(0.0, list_reserve))
+        self.store = store
+        self.store_factory = store_factory
+        self.sync_seconds = sync_seconds
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+        self._pending = defaultdict(int)  # (날짜, 엔드포인트) -> 저장 전 호출 수
+        self._stored_day = None
+        self._stored_total = 0
+        self._synced_at = 0.0
+
+    @staticmethod
+    def priority(endpoint: str) -> str:
+        """엔드포인트 우선순위 ('list' 또는 'detail')"""
+        return 'list' if endpoint in LIST_ENDPOINTS else 'detail'
+
+    def limit(self, priority: str = 'list') -> Optional[int]:
+        """우선순위별 하루 호출 한도 (예산이 없으면 None)"""
+        if not self.daily_budget:
+            return None
+        if priority == 'list':
+            return self.daily_budget
+        return int(self.daily_budget * (1 - self.list_reserve))
+
+    def ensure_store(self):
+        """store_factory로 저장소를 만들고 종료 시 flush 등록 (처음 한 번만)"""
+        if self.store is not None or self.store_factory is None:
+            return
+        with self._lock:
+            if self.store is not None:
+                return
+            self.store = self.store_factory()
+        atexit.register(self.flush)
+
+    def used_today(self) -> int:
+        """오늘 호출 수 (저장된 값 + 저장 전 호출 수, sync_seconds마다 저장소와 동기화)"""
+        if self.store is not None and time.monotonic() - self._synced_at >= self.sync_seconds:
+            self.refresh()
+        today = datetime.now().date()
+        with self._lock:
+            stored = self._stored_total if self._stored_day == today else 0
+            pending = sum(calls for (day, _), calls in self._pending.items() if day == today)
+        return stored + pending
+
+    def remaining(self, priority: str = 'list') -> Optional[int]:
+        """우선순위별 오늘 남은 호출 수 (예산이 없으면 None)"""
+        limit = self.limit(priority)
+        if limit is None:
+            return None
+        return max(0, limit - self.used_today())
+
+    def check(self, endpoint: str):
+        """호출 전 예산 확인 (다 썼으면 KOPISBudgetExceeded)"""
+        self.ensure_store()
+        if not self.daily_budget:
+            return
+        priority = self.priority(endpoint)
+        if self.remaining(priority) <= 0:
+            raise KOPISBudgetExceeded(f"오늘의 KOPIS 호출 예산({priority} {self.limit(priority)}회)을 모두 사용했습니다: {endpoint}")
+
+    def record(self, endpoint: str):
+        """네트워크 호출 1회 집계"""
+        with self._lock:
+            self._pending[(datetime.now().date(), endpoint)] += 1
+
+    def flush(self):
+        """저장 전 호출 수를 저장소에 더하고 오늘 누적값 다시 읽기 (저장할 호출이 없으면 아무것도 하지 않음)"""
+        self._sync(reload=False)
+
+    def refresh(self):
+        """저장 전 호출 수를 저장하고 다른 프로세스 호출을 포함한 오늘 누적값 다시 읽기"""
+        self.ensure_store()
+        self._sync(reload=True)
+
+    def _sync(self, reload: bool):
+        # 실패하면 저장 전 호출 수를 되돌려 다음에 다시 시도
+        if self.store is None:
+            return
+        with self._lock:
+            if not self._pending and not reload:
+                return
+            pending, self._pending = self._pending, defaultdict(int)
+            self._synced_at = time.monotonic()
+        today = datetime.now().date()
+        try:
+            by_day = defaultdict(dict)
+            for (day, endpoint), calls in pending.items():
+                by_day[day][endpoint] = calls
+            for day, counts in by_day.items():
+                self.store.add(day, counts)
+            total = self.store.load(today)
+        except Exception as e:
+            self.logger.warning(f"KOPIS 호출 수 저장 실패: {e}")
+            with self._lock:
+                for key, calls in pending.items():
+                    self._pending[key] += calls
+            return
+        with self._lock:
+            self._stored_day = today
+            self._stored_total = total
+
+    def get_usage(self) -> Dict:
+        """오늘 사용량과 우선순위별 남은 호출 수"""
+        used = self.used_today()
+        return {
+            'daily_budget': self.daily_budget or None,
+            'used': used,
+            'remaining_list': self.remaining('list'),
+            'remaining_detail': self.remaining('detail'),
+        }
+
+class KOPISResponseCache:
+    """엔드포인트 + 파라미터 해시로 주소를 정하는 디스크 응답 캐시 (엔드포인트별 TTL)"""
+
+    # 캐시 키에서 제외하는 파라미터 (API 키가 바뀌어도 같은 응답 재사용)
+    IGNORED_PARAMS = ('service',)
+
+    def __init__(self, directory: str, ttls: Optional[Dict[str, int]] = None, default_ttl: int = 3600,
+                 prune_interval: float = 3600):
+        self.directory = directory
+        self.ttls = ttls or {}
+        self.default_ttl = default_ttl
+        self.prune_interval = prune_interval
+        self._pruned_at = None
+        self._prune_lock = threading.Lock()
+
+    @staticmethod
+    def is_error_payload(content: bytes) -> bool:
+        """KOPIS 오류 응답 본문인지 (앞부분만 확인)"""
+        return bool(ERROR_PAYLOAD_PATTERN.search(content[:ERROR_PAYLOAD_HEAD_BYTES]))
+
+    def prune(self, max_age: float = None) -> int:
+        """가장 긴 TTL보다 오래된 캐시 파일과 남은 임시 파일 삭제 - 삭제한 파일 수
+
+        afterdate/기간 조건이 실행마다 달라 키가 계속 늘어나므로 on 모드에서 주기적으로 호출한다.
+        """
+        if max_age is None:
+            max_age = max([self.default_ttl, *self.ttls.values()])
+        cutoff = time.time() - max_age
+        removed = 0
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                path = os.path.join(root, name)
+                try:
+                    if os.path.getmtime(path) < cutoff:
+                        os.remove(path)
+                        removed += 1
+                except OSError:
+                    continue
+        if removed:
+            logging.getLogger(__name__).info(f"KOPIS 응답 캐시 만료 파일 {removed}개 삭제")
+        return removed
+
+    def maybe_prune(self):
+        """prune_interval마다 한 번만 만료 파일 정리 (처음 호출 시에도 실행)"""
+        now = time.monotonic()
+        if self._pruned_at is not None and now - self._pruned_at < self.prune_interval:
+            return
+        if not self._prune_lock.acquire(blocking=False):
+            return
+        try:
+            self._pruned_at = now
+            self.prune()
+        finally:
+            self._prune_lock.release()
+
+    def key(self, endpoint: str, params: Optional[Dict]) -> str:
+        """요청 식별 해시"""
+        canonical = json.dumps({
+            'endpoint': endpoint,
+            'params': {name: str(value) for name, value in (params or {}).items()
+                       if name not in self.IGNORED_PARAMS and value is not None}
+        }, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+    def get(self, endpoint: str, params: Optional[Dict], ignore_ttl: bool = False) -> Optional[bytes]:
+        """캐시된 응답 본문 (없거나 만료되면 None)"""
+        f = self.open(endpoint, params, ignore_ttl)
+        if f is None:
+            return None
+        with f:
+            return f.read()
+
+    def open(self, endpoint: str, params: Optional[Dict], ignore_ttl: bool = False):
+        """캐시된 응답 파일을 읽기용으로 열기 (없거나 만료되면 None)"""
+        path = self._path(self.key(endpoint, params))
+        try:
+            age = time.time() - os.path.getmtime(path)
+            if not ignore_ttl and age > self.ttls.get(endpoint, self.default_ttl):
+                return None
+            return open(path, 'rb')
+        except OSError:
+            return None
+
+    def writer(self, endpoint: str, params: Optional[Dict]):
+        """스트리밍 저장용 (임시 파일 객체, 완료 시 교체할 최종 경로)"""
+        path = self._path(self.key(endpoint, params))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        return open(f"{path}.{os.getpid()}.{threading.get_ident()}.tmp", 'wb'), path
+
+    def set(self, endpoint: str, params: Optional[Dict], content: bytes):
+        """응답 본문 저장 (임시 파일에 쓴 뒤 교체하므로 동시 접근에도 안전)"""
+        path = self._path(self.key(endpoint, params))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temp_path, 'wb') as f:
+            f.write(content)
+        os.replace(temp_path, path)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], f"{key}.xml")
+
+class _CachingStream:
+    """응답 본문을 읽는 대로 캐시 임시 파일에도 기록하고, 끝까지 읽으면 캐시에 반영하는 스트림"""
+
+    def __init__(self, response: requests.Response, cache_file=None, cache_path: str = None):
+        self.response = response
+        self.raw = response.raw
+        self.raw.decode_content = True
+        self.cache_file = cache_file
+        self.cache_path = cache_path
+        self._head = b''  # 오류 응답 판별용 본문 앞부분
+
+    def read(self, size: int = -1) -> bytes:
+        data = self.raw.read(None if size is None or size < 0 else size)
+        if self.cache_file is not None:
+            if data:
+                if len(self._head) < ERROR_PAYLOAD_HEAD_BYTES:
+                    self._head += data[:ERROR_PAYLOAD_HEAD_BYTES - len(self._head)]
+                self.cache_file.write(data)
+            elif KOPISResponseCache.is_error_payload(self._head):
+                # HTTP 200 오류 응답은 캐시에 남기지 않음
+                self._discard()
+            else:
+                # 본문 끝 - 완전한 응답만 캐시에 반영
+                self.cache_file.close()
+                os.replace(self.cache_file.name, self.cache_path)
+                self.cache_file = None
+        return data
+
+    def close(self):
+        self.response.close()
+        if self.cache_file is not None:
+            # 중간에 닫힌 응답은 캐시에 남기지 않음
+            self._discard()
+
+    def _discard(self):
+        self.cache_file.close()
+        try:
+            os.remove(self.cache_file.name)
+        except OSError:
+            pass
+        self.cache_file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+def iterparse_records(stream, tag: str = 'db'):
+    """XML 스트림에서 tag 요소를 하나씩 반환 (처리한 요소는 바로 해제해 메모리 일정 유지)
+
+    반환된 요소는 다음 요소를 읽기 전까지만 유효하므로 필요한 값은 즉시 꺼내 써야 한다.
+    """
+    parents = []
+    for event, element in ET.iterparse(stream, events=('start', 'end')):
+        if event == 'start':
+            parents.append(element)
+            continue
+        parents.pop()
+        if element.tag == tag:
+            yield element
+            element.clear()
+            if parents:
+                parents[-1].remove(element)
+
+class TokenBucket:
+    """스레드 안전 토큰 버킷 (초당 rate개 보충, 최대 capacity개까지 순간 허용)"""
+
+    def __init__(self, rate: float, capacity: float = None):
+        if rate <= 0:
+            raise ValueError(f"TokenBucket rate must be positive: {rate}")
+        self.rate = rate
+        self.capacity = capacity or max(1.0, rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, tokens: float = 1):
+        """토큰을 얻을 때까지 대기 (capacity보다 많이 요청하면 영원히 채워지지 않으므로 ValueError)"""
+        if tokens > self.capacity:
+            raise ValueError(f"Cannot acquire {tokens} tokens from a bucket of capacity {self.capacity}")
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return
+                wait = (tokens - self._tokens) / self.rate
+            time.sleep(wait)
+
+class KOPISTransport:
+    """KOPIS API 공용 HTTP 전송 (연결 풀 + 타임아웃 + 재시도 + 지연 시간 통계)"""
+
+    def __init__(self, pool_size: int = 10, connect_timeout: float = 5.0, read_timeout: float = 30.0,
+                 max_retries: int = 3, backoff_base: float = 0.5, backoff_max: float = 8.0,
+                 cache: KOPISResponseCache = None, cache_mode: str = 'off', quota: KOPISQuota = None):
+        if cache_mode not in CACHE_MODES:
+            raise ValueError(f"Unknown KOPIS cache mode: {cache_mode}")
+        self.cache = cache
+        self.cache_mode = cache_mode if cache else 'off'
+        self.quota = quota or KOPISQuota()
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.logger = logging.getLogger(__name__)
+
+        # 재시도는 직접 처리하므로 어댑터 재시도는 끔
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+        self._lock = threading.Lock()
+        self._stats = defaultdict(lambda: {'calls': 0, 'errors': 0, 'retries': 0, 'cache_hits': 0,
+                                           'total_ms': 0.0, 'max_ms': 0.0})
+
+    @classmethod
+    def from_env(cls):
+        """환경 변수 설정으로 생성"""
+        list_ttl = int(os.environ.get('KOPIS_CACHE_LIST_TTL', 3600))
+        detail_ttl = int(os.environ.get('KOPIS_CACHE_DETAIL_TTL', 86400))
+        cache = KOPISResponseCache(
+            os.environ.get('KOPIS_CACHE_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                                           'instance', 'kopis_cache')),
+            ttls={
+                'pblprfr': list_ttl,
+                'prfplc': list_ttl,
+                'pblprfr/:id': detail_ttl,
+                'pblprfr/:id/booking': detail_ttl
+            },
+            default_ttl=list_ttl
+        )
+        return cls(
+            pool_size=int(os.environ.get('KOPIS_HTTP_POOL_SIZE', 10)),
+            connect_timeout=float(os.environ.get('KOPIS_CONNECT_TIMEOUT', 5)),
+            read_timeout=float(os.environ.get('KOPIS_READ_TIMEOUT', 30)),
+            max_retries=int(os.environ.get('KOPIS_MAX_RETRIES', 3)),
+            backoff_base=float(os.environ.get('KOPIS_BACKOFF_BASE', 0.5)),
+            cache=cache,
+            cache_mode=os.environ.get('KOPIS_CACHE_MODE', 'off'),
+            quota=KOPISQuota(
+                daily_budget=int(os.environ.get('KOPIS_DAILY_BUDGET', 0)),
+                list_reserve=float(os.environ.get('KOPIS_LIST_RESERVE', 0.3))
+            )
+        )
+
+    def get(self, url: str, params: Optional[Dict] = None, endpoint: str = None,
+            fresh: bool = False) -> requests.Response:
+        """GET 요청 (5xx/429/연결 오류/타임아웃은 지수 백오프 후 재시도)
+
+        재시도 후에도 실패하면 마지막 예외를 그대로 올리며, 4xx 응답은 재시도 없이 반환한다.
+        캐시 모드에 따라 디스크 캐시 응답을 돌려주거나 성공(200, 오류 본문 제외) 응답을 캐시에 저장한다.
+        fresh=True이면 on 모드에서도 캐시를 읽지 않고 조회한다 (상태 재확인 등 최신 값이 필요한 경우).
+        """
+        endpoint = endpoint or self._endpoint_name(url)
+        
+        if self.cache_mode == 'replay' or (self.cache_mode == 'on' and not fresh):
+            content = self.cache.get(endpoint, params, ignore_ttl=self.cache_mode == 'replay')
+            if content is not None:
+                with self._lock:
+                    self._stats[endpoint]['cache_hits'] += 1
+                return self._cached_response(url, content)
+            if self.cache_mode == 'replay':
+                shown = {name: value for name, value in (params or {}).items()
+                         if name not in KOPISResponseCache.IGNORED_PARAMS}
+                raise KOPISCacheMiss(f"KOPIS 캐시에 없는 요청 (replay 모드): {endpoint} {shown}")
+        
+        response = self._get_with_retry(url, params, endpoint)
+        if self.cache_mode in ('on', 'record') and response.status_code == 200 \
+                and not self.cache.is_error_payload(response.content):
+            if self.cache_mode == 'on':
+                self.cache.maybe_prune()
+            try:
+                self.cache.set(endpoint, params, response.content)
+            except OSError as e:
+                self.logger.warning(f"KOPIS 응답 캐시 저장 실패: {e}")
+        return response
+
+    def open_stream(self, url: str, params: Optional[Dict] = None, endpoint: str = None):
+        """GET 응답 본문을 파일처럼 읽는 스트림 (with 문으로 사용)
+
+        캐시가 있으면 캐시 파일을, 없으면 네트워크 응답을 받는 대로 읽으며 (on/record 모드에서는
+        동시에 캐시에 기록), 오류 응답은 requests.HTTPError로 올린다. 재시도는 응답 헤더를 받기
+        전까지만 적용되며 지연 시간 통계도 첫 응답까지의 시간이다.
+        """
+        endpoint = endpoint or self._endpoint_name(url)
+
+        if self.cache_mode in ('on', 'replay'):
+            cached = self.cache.open(endpoint, params, ignore_ttl=self.cache_mode == 'replay')
+            if cached is not None:
+                with self._lock:
+                    self._stats[endpoint]['cache_hits'] += 1
+                return cached
+            if self.cache_mode == 'replay':
+                shown = {name: value for name, value in (params or {}).items()
+                         if name not in KOPISResponseCache.IGNORED_PARAMS}
+                raise KOPISCacheMiss(f"KOPIS 캐시에 없는 요청 (replay 모드): {endpoint} {shown}")
+
+        response = self._get_with_retry(url, params, endpoint, stream=True)
+        if response.status_code != 200:
+            response.close()
+            response.raise_for_status()
+
+        if self.cache_mode in ('on', 'record'):
+            if self.cache_mode == 'on':
+                self.cache.maybe_prune()
+            try:
+                cache_file, cache_path = self.cache.writer(endpoint, params)
+                return _CachingStream(response, cache_file, cache_path)
+            except OSError as e:
+                self.logger.warning(f"KOPIS 응답 캐시 저장 실패: {e}")
+        return _CachingStream(response)
+
+    def _get_with_retry(self, url: str, params: Optional[Dict], endpoint: str,
+                        stream: bool = False) -> requests.Response:
+        """네트워크 GET (재시도 포함, 시도마다 호출 예산 확인)"""
+        attempt = 0
+
+        while True:
+            self.quota.check(endpoint)
+            started = time.monotonic()
+            try:
+                response = self.session.get(url, params=params, stream=stream,
+                                            timeout=(self.connect_timeout, self.read_timeout))
+                if response.status_code in RETRY_STATUS_CODES and attempt < self.max_retries:
+                    response.close()
+                    self._record(endpoint, started, error=True, retry=True)
+                    self._sleep_backoff(attempt, endpoint, f"HTTP {response.status_code}")
+                    attempt += 1
+                    continue
+                self._record(endpoint, started, error=response.status_code >= 400)
+                return response
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if attempt >= self.max_retries:
+                    self._record(endpoint, started, error=True)
+                    raise
+                self._record(endpoint, started, error=True, retry=True)
+                self._sleep_backoff(attempt, endpoint, e)
+                attempt += 1
+
+    def get_stats(self) -> Dict:
+        """엔드포인트별 호출/오류/재시도 횟수와 평균/최대 지연 시간(ms)"""
+        with self._lock:
+            return {
+                endpoint: {
+                    'calls': stat['calls'],
+                    'errors': stat['errors'],
+                    'retries': stat['retries'],
+                    'cache_hits': stat['cache_hits'],
+                    'avg_ms': round(stat['total_ms'] / stat['calls'], 1) if stat['calls'] else 0,
+                    'max_ms': round(stat['max_ms'], 1)
+                }
+                for endpoint, stat in self._stats.items()
+            }
+
+    def _sleep_backoff(self, attempt: int, endpoint: str, reason):
+        """지터가 있는 지수 백오프 대기 (여러 워커가 동시에 재시도하지 않도록 분산)"""
+        delay = min(self.backoff_max, self.backoff_base * (2 ** attempt))
+        delay = random.uniform(delay / 2, delay)
+        self.logger.warning(f"KOPIS {endpoint} 재시도 {attempt + 1}/{self.max_retries} ({reason}), {delay:.2f}초 후")
+        time.sleep(delay)
+
+    def _record(self, endpoint: str, started: float, error: bool = False, retry: bool = False):
+        """호출 1회 통계 기록"""
+        elapsed_ms = (time.monotonic() - started) * 1000
+        self.quota.record(endpoint)
+        with self._lock:
+            stat = self._stats[endpoint]
+            stat['calls'] += 1
+            stat['total_ms'] += elapsed_ms
+            stat['max_ms'] = max(stat['max_ms'], elapsed_ms)
+            if error:
+                stat['errors'] += 1
+            if retry:
+                stat['retries'] += 1
+
+    @staticmethod
+    def _cached_response(url: str, content: bytes) -> requests.Response:
+        """캐시 본문으로 만든 응답 객체"""
+        response = requests.Response()
+        response.status_code = 200
+        response.url = url
+        response._content = content
+        response.encoding = 'utf-8'
+        response.headers['Content-Type'] = 'text/xml;charset=UTF-8'
+        return response
+
+    @staticmethod
+    def _endpoint_name(url: str) -> str:
+        """URL에서 엔드포인트 이름 추출 (예: .../restful/pblprfr/PF123 -> pblprfr/:id)"""
+        path = url.split('/restful', 1)[-1]
+        return KOPIS_ID_PATTERN.sub('/:id', path).strip('/') or path
+
+# 프로세스 공용 전송 인스턴스
+kopis_transport = KOPISTransport.from_env()
@@ -1,14 +1,23 @@
-from flask import Flask, request, render_template, redirect, url_for, flash, send_from_directory, jsonify, session, g, send_file, make_response
-from io import BytesIO
+from flask import Flask, request, render_template, redirect, url_for, flash, send_from_directory, jsonify, session, g, send_file, make_response, Response, stream_with_context
+from io import BytesIO, StringIO
 from flask_sqlalchemy import SQLAlchemy
 from flask_login import LoginManager, UserMixin, login_user, login_required, logout_user, current_user
 from werkzeug.security import generate_password_hash, check_password_hash
 from sqlalchemy import func, text
+from sqlalchemy.exc import IntegrityError
 import os
 import logging
 from datetime import datetime, timedelta
 from dotenv import load_dotenv
+from collections import defaultdict
 import uuid
+import base64
+import threading
+import queue
+import socket
+import zlib
+from itertools import chain
+import atexit
 import traceback
 import cloudinary
 import cloudinary.uploader
@@ -16,9 +25,15 @@ import requests
 import time
 import xml.etree.ElementTree as ET
 import json
+import csv
+import tempfile
+from urllib.parse import quote
 from openpyxl import Workbook
+from openpyxl.cell.cell import ILLEGAL_CHARACTERS_RE
 
 from flask_babel import Babel
+from markupsafe import Markup
+from kopis_transport import kopis_transport, iterparse_records, KOPIS_BASE_URL
 
 load_dotenv()
 
@@ -109,6 +124,9 @@ if database_url and database_url.startswith('postgres://'):
         }
     }
     logger.info(f"Using PostgreSQL: {database_url}")
+elif database_url and database_url.startswith('sqlite:'):
+    # SQLite URL(예: 벤치마크용 임시 파일)은 그대로 사용
+    logger.info(f"Using database: {database_url}")
 else:
     # 로컬 개발용 SQLite 데이터베이스
     database_url = 'sqlite:///app.db'
@@ -140,6 +158,49 @@ class User(UserMixin, db.Model):
     def get_id(self):
         return str(self.id)
 
+# KOPIS 공연장 (공연시설) 모델
+class Venue(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    kopis_venue_id = db.Column(db.String(50), nullable=False, unique=True)  # KOPIS 공연시설 ID (mt10id)
+    name = db.Column(db.String(200), nullable=False, index=True)  # 공연시설명 (공연 연결 시 이름 조회)
+    area = db.Column(db.String(20))  # 시도
+    district = db.Column(db.String(50))  # 구군
+    facility_type = db.Column(db.String(50))  # 시설 특성 (공공/민간 등)
+    hall_count = db.Column(db.Integer)  # 공연장 수
+    seat_count = db.Column(db.Integer)  # 객석 수
+    opened_year = db.Column(db.String(10))  # 개관 연도
+    address = db.Column(db.String(300))
+    phone = db.Column(db.String(50))
+    website = db.Column(db.String(300))
+    latitude = db.Column(db.Float)
+    longitude = db.Column(db.Float)
+    geocode_source = db.Column(db.String(20))  # 좌표 출처: 'kopis' 또는 'kakao'
+    geocoded_at = db.Column(db.DateTime)  # 지오코딩 시도 시각 (실패해도 기록해 반복 조회 방지)
+    detail_synced_at = db.Column(db.DateTime)  # 상세 API(주소/좌표) 조회 시각 (NULL이면 조회 대기)
+    synced_at = db.Column(db.DateTime)  # 목록 동기화 시각
+    created_at = db.Column(db.DateTime, default=func.now())
+    
+    @property
+    def coordinates(self):
+        """(위도, 경도) - 좌표가 없으면 None"""
+        if self.latitude is None or self.longitude is None:
+            return None
+        return self.latitude, self.longitude
+
+# 주소 → 좌표 서버측 캐시 (공연장이 없는 직접 등록 공연의 지도용)
+class GeocodeCache(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    address = db.Column(db.String(300), nullable=False, unique=True)  # 공백 정규화된 주소
+    latitude = db.Column(db.Float)  # 찾지 못한 주소는 NULL로 남겨 다시 조회하지 않음
+    longitude = db.Column(db.Float)
+    source = db.Column(db.String(20), default='kakao')
+    resolved_at = db.Column(db.DateTime, default=datetime.now)
+
+# 공연 진행 상태 (KOPIS prfstate 표기와 동일)
+PERFORMANCE_STATE_UPCOMING = '공연예정'
+PERFORMANCE_STATE_ONGOING = '공연중'
+PERFORMANCE_STATE_COMPLETED = '공연완료'
+
 # Performance 모델
 class Performance(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -150,6 +211,8 @@ class Performance(db.Model):
     address = db.Column(db.String(200))  # 상세 주소 (지도용)
     price = db.Column(db.String(50))
     date = db.Column(db.String(20))
+    start_date = db.Column(db.Date, index=True)  # 공연 시작일 (date 문자열에서 정규화)
+    end_date = db.Column(db.Date, index=True)  # 공연 종료일 (단일 일자 공연은 시작일과 동일)
     time = db.Column(db.String(20))
     contact_email = db.Column(db.String(120))
     video_url = db.Column(db.String(300))
@@ -166,11 +229,33 @@ class Performance(db.Model):
     purchase_methods = db.Column(db.String(100), default='["현장구매"]')  # 구매방법 (JSON 문자열)
     
     # KOPIS 연동 필드
-    kopis_id = db.Column(db.String(50))  # KOPIS 고유 ID
+    kopis_id = db.Column(db.String(50))  # KOPIS 고유 ID (직접 등록한 공연은 NULL)
     kopis_venue_id = db.Column(db.String(50))  # KOPIS 공연장 ID
-    kopis_synced_at = db.Column(db.DateTime)  # KOPIS 동기화 시간
+    kopis_synced_at = db.Column(db.DateTime)  # KOPIS 동기화 시간 (내용이 바뀐 경우에만 갱신)
+    kopis_content_hash = db.Column(db.String(64))  # 정규화된 KOPIS 목록 내용의 SHA-256 (재동기화 시 변경 여부 비교)
+    kopis_detail_synced_at = db.Column(db.DateTime)  # KOPIS 상세 정보 보강 시간 (NULL이면 보강 대기)
+    kopis_detail_attempts = db.Column(db.Integer, default=0)  # 상세 정보 보강 실패 횟수
+    cast_info = db.Column(db.Text)  # 출연진 (KOPIS prfcast, 상세 보강 시 채움)
+    crew_info = db.Column(db.Text)  # 제작진 (KOPIS prfcrew)
+    runtime = db.Column(db.String(50))  # 공연 시간 (KOPIS prfruntime)
+    age_limit = db.Column(db.String(50))  # 관람 연령 (KOPIS prfage)
+    story_images = db.Column(db.Text)  # 소개 이미지 URL 목록 (JSON 문자열, KOPIS styurls)
+    venue_id = db.Column(db.Integer, db.ForeignKey('venue.id'), index=True)  # 공연장 (KOPIS 공연장 동기화로 연결)
+    performance_state = db.Column(db.String(10))  # 진행 상태 (공연예정/공연중/공연완료, 날짜가 없으면 NULL)
+    state_checked_at = db.Column(db.DateTime)  # 상태 갱신 작업이 마지막으로 확인한 시간
 
     user = db.relationship('User', backref='performances')
+    venue = db.relationship('Venue', backref='performances')
+    
+    # 공개 목록 조회 패턴별 복합 인덱스 (승인 여부 + 정렬/필터 컬럼)
+    __table_args__ = (
+        db.Index('ix_performance_approved_created_at', 'is_approved', 'created_at'),
+        db.Index('ix_performance_approved_category', 'is_approved', 'category'),
+        db.Index('ix_performance_approved_likes', 'is_approved', 'likes'),
+        db.Index('ix_performance_created_at', 'created_at'),  # 롤업 시각 구간 조회
+        # 임포트 시 kopis_id 집합 조회 및 중복 방지
+        db.Index('ux_performance_kopis_id', 'kopis_id', unique=True),
+    )
     
     @property
     def kopis_url(self):
@@ -181,6 +266,66 @@ class Performance(db.Model):
     def is_kopis_synced(self):
         """KOPIS에서 동기화된 공연인지 확인"""
         return bool(self.kopis_id and self.kopis_synced_at)
+    
+    @property
+    def story_image_urls(self):
+        """소개 이미지 URL 목록"""
+        try:
+            return json.loads(self.story_images) if self.story_images else []
+        except ValueError:
+            return []
+    
+    def sync_date_range(self):
+        """date 문자열에서 start_date/end_date 갱신"""
+        start_date, end_date = parse_date_range(self.date)
+        if start_date:
+            self.start_date = start_date
+            self.end_date = end_date
+
+# 종료되지 않은 공연 조건 (상태를 모르는 공연 포함)
+# 공개 목록 쿼리와 아래 부분 인덱스가 같은 식을 써야 인덱스 조건과 일치한다
+ACTIVE_PERFORMANCE_CONDITION = db.or_(
+    Performance.performance_state.is_(None),
+    Performance.performance_state != PERFORMANCE_STATE_COMPLETED
+)
+
+# 승인 대기열 전용 부분 인덱스 (부분 인덱스를 지원하지 않는 DB에서는 일반 인덱스로 생성됨)
+db.Index(
+    'ix_performance_pending_created_at',
+    Performance.created_at,
+    postgresql_where=(Performance.is_approved == False),
+    sqlite_where=(Performance.is_approved == False)
+)
+
+# 상세 정보 보강 대기열 전용 부분 인덱스
+db.Index(
+    'ix_performance_detail_pending',
+    Performance.id,
+    postgresql_where=db.and_(Performance.kopis_id.isnot(None), Performance.kopis_detail_synced_at.is_(None)),
+    sqlite_where=db.and_(Performance.kopis_id.isnot(None), Performance.kopis_detail_synced_at.is_(None))
+)
+
+# 공개 목록(종료되지 않은 승인 공연) 최신순 조회 전용 부분 인덱스 - 종료된 공연은 인덱스에서 빠짐
+# (is_approved를 앞에 두어 SQLite 플래너도 ix_performance_approved_created_at 대신 이 인덱스를 고름)
+db.Index(
+    'ix_performance_active_created_at',
+    Performance.is_approved,
+    Performance.created_at,
+    Performance.id,
+    postgresql_where=db.and_(Performance.is_approved == True, ACTIVE_PERFORMANCE_CONDITION),
+    sqlite_where=db.and_(Performance.is_approved == True, ACTIVE_PERFORMANCE_CONDITION)
+)
+
+@db.event.listens_for(Performance, 'before_insert')
+@db.event.listens_for(Performance, 'before_update')
+def _sync_performance_date_range(mapper, connection, target):
+    """공연 저장 시 정규화된 날짜 컬럼과 진행 상태 자동 채우기"""
+    date_changed = db.inspect(target).attrs.date.history.has_changes()
+    if target.start_date is None or date_changed:
+        target.sync_date_range()
+    # KOPIS 공연은 KOPIS 상태를 따르고, 직접 등록한 공연은 날짜가 바뀌면 다시 계산
+    if target.performance_state is None or (date_changed and not target.kopis_id):
+        target.performance_state = expected_performance_state(target.start_date, target.end_date)
 
 # 사용자별 좋아요 정보
 class UserLike(db.Model):
@@ -189,8 +334,12 @@ class UserLike(db.Model):
     performance_id = db.Column(db.Integer, db.ForeignKey('performance.id'), nullable=False)
     created_at = db.Column(db.DateTime, default=func.now())
     
-    # 중복 좋아요 방지
-    __table_args__ = (db.UniqueConstraint('user_id', 'performance_id', name='unique_user_performance_like'),)
+    # 중복 좋아요 방지 + 공연별 좋아요 조회 인덱스
+    __table_args__ = (
+        db.UniqueConstraint('user_id', 'performance_id', name='unique_user_performance_like'),
+        db.Index('ix_user_like_performance_id', 'performance_id'),
+        db.Index('ix_user_like_created_at', 'created_at'),  # 롤업 시각 구간 조회
+    )
 
 # 댓글 모델
 class Comment(db.Model):
@@ -203,6 +352,10 @@ class Comment(db.Model):
     
     user = db.relationship('User', backref='comments')
     performance = db.relationship('Performance', backref='comments')
+    
+    __table_args__ = (
+        db.Index('ix_comment_created_at', 'created_at'),  # 롤업 시각 구간 조회
+    )
 
 @login_manager.user_loader
 def load_user(user_id):
@@ -221,16 +374,157 @@ def loads_filter(s):
     import json
     return json.loads(s) if s else []
 
+# 서버측 지오코딩용 카카오 REST API 키 (로그인용 REST 키와 같은 키를 쓸 수 있음)
+KAKAO_REST_API_KEY = os.getenv('KAKAO_REST_API_KEY') or KAKAO_CLIENT_ID
+KAKAO_GEOCODE_URL = 'https://dapi.kakao.com/v2/local/search/address.json'
+
+def normalize_address(address):
+    """지오코딩 캐시 키용 주소 (앞뒤/연속 공백 정리)"""
+    return ' '.join((address or '').split())[:300]
+
+# 캐시에 아직 없는 주소 (찾지 못한 주소로 캐시된 경우의 None과 구분)
+GEOCODE_NOT_CACHED = object()
+
+def get_cached_coordinates(address):
+    """캐시된 주소 좌표 (위도, 경도) - 찾지 못한 주소로 캐시됐으면 None, 캐시에 없으면 GEOCODE_NOT_CACHED
+    
+    네트워크 호출은 하지 않는다.
+    """
+    address = normalize_address(address)
+    if not address:
+        return None
+    cached = GeocodeCache.query.filter_by(address=address).first()
+    if cached is None:
+        return GEOCODE_NOT_CACHED
+    if cached.latitude is None:
+        return None
+    return cached.latitude, cached.longitude
+
+def geocode_address(address, timeout=3):
+    """주소 → (위도, 경도), 결과는 GeocodeCache에 저장해 주소당 한 번만 카카오 API 호출
+    
+    찾지 못한 주소도 캐시에 남겨 다시 호출하지 않는다. API 키가 없거나 호출이 실패하면
+    캐시하지 않고 None을 반환한다 (다음 기회에 다시 시도).
+    """
+    address = normalize_address(address)
+    if not address:
+        return None
+    cached = GeocodeCache.query.filter_by(address=address).first()
+    if cached is not None:
+        return (cached.latitude, cached.longitude) if cached.latitude is not None else None
+    if not KAKAO_REST_API_KEY:
+        return None
+    
+    try:
+        response = requests.get(KAKAO_GEOCODE_URL, params={'query': address},
+                                headers={'Authorization': f'KakaoAK {KAKAO_REST_API_KEY}'}, timeout=timeout)
+        response.raise_for_status()
+        documents = response.json().get('documents') or []
+    except Exception as e:
+        logger.warning(f"지오코딩 실패 ({address}): {e}")
+        return None
+    
+    coordinates = (float(documents[0]['y']), float(documents[0]['x'])) if documents else None
+    try:
+        db.session.add(GeocodeCache(address=address,
+                                    latitude=coordinates[0] if coordinates else None,
+                                    longitude=coordinates[1] if coordinates else None))
+        db.session.commit()
+    except Exception:
+        # 다른 요청이 같은 주소를 먼저 저장한 경우
+        db.session.rollback()
+    return coordinates
+
+def get_performance_coordinates(performance, allow_lookup=False):
+    """공연 지도 좌표 - 공연장 좌표 우선, 없으면 주소 지오코딩 캐시
+    
+    allow_lookup이면 캐시에 없는 주소를 바로 지오코딩해 저장한다 (카카오 API를 기다리므로 요청 처리 중에는 쓰지 않음).
+    아니면 캐시에 없는 주소는 GEOCODE_NOT_CACHED를 반환한다.
+    """
+    if performance.venue is not None and performance.venue.coordinates:
+        return performance.venue.coordinates
+    if not performance.address:
+        return None
+    if allow_lookup:
+        return geocode_address(performance.address)
+    return get_cached_coordinates(performance.address)
+
+def geocode_in_background(address):
+    """캐시에 없는 주소를 백그라운드에서 지오코딩해 캐시에 저장 (다음 조회부터 지도 표시)"""
+    address = normalize_address(address)
+    if address and KAKAO_REST_API_KEY:
+        page_task_runner.submit(_geocode_task, address, key=('geocode', address))
+
+def _geocode_task(address):
+    with app.app_context():
+        geocode_address(address)
+
+# 상세 페이지에서 KOPIS 상세 정보를 다시 받아오는 주기(초) - 저장된 상세 정보가 이보다 오래되면 조회 시 갱신
+KOPIS_DETAIL_STALE_SECONDS = int(os.environ.get('KOPIS_DETAIL_STALE_SECONDS', 7 * 86400))
+# 연속 실패가 이 횟수에 이르면 상세 페이지에서 더 조회하지 않음 (KOPISDetailEnricher와 같은 기준)
+KOPIS_DETAIL_MAX_ATTEMPTS = 3
+
+_kopis_detail_enricher = None
+
+def get_kopis_detail_enricher():
+    """상세 정보 지연 조회용 KOPISDetailEnricher (프로세스당 하나 - 호출 속도 제한을 작업 간에 공유)"""
+    global _kopis_detail_enricher
+    if _kopis_detail_enricher is None:
+        from kopis_api_integration import KOPISDetailEnricher
+        _kopis_detail_enricher = KOPISDetailEnricher(
+            db.session,
+            max_workers=1,
+            rate_per_second=float(os.environ.get('KOPIS_DETAIL_RATE', 5)),
+            max_attempts=KOPIS_DETAIL_MAX_ATTEMPTS
+        )
+    return _kopis_detail_enricher
+
+def kopis_detail_is_stale(performance, now=None):
+    """상세 정보를 (다시) 받아와야 하는 KOPIS 공연인지 - 아직 보강되지 않았거나 주기가 지남"""
+    if not performance.kopis_id or (performance.kopis_detail_attempts or 0) >= KOPIS_DETAIL_MAX_ATTEMPTS:
+        return False
+    if performance.kopis_detail_synced_at is None:
+        return True
+    now = now or datetime.now()
+    return (now - performance.kopis_detail_synced_at).total_seconds() > KOPIS_DETAIL_STALE_SECONDS
+
+def schedule_kopis_detail(performance):
+    """상세 페이지를 열 때 KOPIS 상세 정보(줄거리/출연진/공연 시간/소개 이미지) 지연 조회 예약
+    
+    처음 열리거나 저장된 정보가 오래된 KOPIS 공연만 백그라운드에서 상세 API를 호출해 저장한다.
+    페이지는 기다리지 않고 저장된 값으로 표시하며, 같은 공연의 조회가 이미 대기 중이면 다시 넣지 않는다.
+    예약 여부를 반환한다.
+    """
+    if not kopis_detail_is_stale(performance):
+        return False
+    # 상세 조회용 호출 예산을 다 썼으면 저장된 정보로 표시 (목록 동기화용 예약분은 쓰지 않음)
+    if kopis_transport.quota.remaining('detail') == 0:
+        return False
+    return page_task_runner.submit(_kopis_detail_task, performance.id, key=('kopis_detail', performance.id))
+
+def _kopis_detail_task(performance_id):
+    with app.app_context():
+        try:
+            # 앞선 작업이 방금 저장했을 수 있으므로 최신 행으로 다시 확인
+            performance = Performance.query.get(performance_id)
+            if performance is None or not kopis_detail_is_stale(performance):
+                return
+            get_kopis_detail_enricher().enrich_one(performance)
+        except Exception as e:
+            db.session.rollback()
+            logger.warning(f"KOPIS 상세 정보 지연 조회 실패 (공연 {performance_id}): {e}")
+
 class KopisAPIClient:
     """KOPIS API 클라이언트"""
     
-    def __init__(self, api_key):
+    def __init__(self, api_key, transport=None):
         self.api_key = api_key
-        self.base_url = "http://www.kopis.or.kr/openApi/restful"
+        self.base_url = KOPIS_BASE_URL
+        self.transport = transport or kopis_transport
         self.logger = logging.getLogger(__name__)
     
-    def get_performances(self, start_date=None, end_date=None, page=1, rows=100):
-        """공연 목록 조회"""
+    def get_performances(self, start_date=None, end_date=None, page=1, rows=100, prfstate='02'):
+        """공연 목록 조회 (prfstate: 01 공연예정, 02 공연중, 03 공연완료, None이면 전체)"""
         try:
             # 기본값 설정
             if not start_date:
@@ -243,30 +537,27 @@ class KopisAPIClient:
                 'stdate': start_date,
                 'eddate': end_date,
                 'cpage': page,
-                'rows': rows,
-                'prfstate': '02'  # 공연예정
+                'rows': rows
             }
+            if prfstate:
+                params['prfstate'] = prfstate
             
-            response = requests.get(f"{self.base_url}/pblprfr", params=params)
-            response.raise_for_status()
-            
-            # XML 파싱
-            root = ET.fromstring(response.content)
+            # XML 스트리밍 파싱 (응답 전체를 메모리에 올리지 않음)
             performances = []
-            
-            for db in root.findall('.//db'):
-                performance = {
-                    'mt20id': self._get_text(db, 'mt20id'),
-                    'prfnm': self._get_text(db, 'prfnm'),
-                    'prfpdfrom': self._get_text(db, 'prfpdfrom'),
-                    'prfpdto': self._get_text(db, 'prfpdto'),
-                    'fcltynm': self._get_text(db, 'fcltynm'),
-                    'poster': self._get_text(db, 'poster'),
-                    'genrenm': self._get_text(db, 'genrenm'),
-                    'prfstate': self._get_text(db, 'prfstate'),
-                    'openrun': self._get_text(db, 'openrun')
-                }
-                performances.append(performance)
+            with self.transport.open_stream(f"{self.base_url}/pblprfr", params=params) as stream:
+                for db in iterparse_records(stream):
+                    performance = {
+                        'mt20id': self._get_text(db, 'mt20id'),
+                        'prfnm': self._get_text(db, 'prfnm'),
+                        'prfpdfrom': self._get_text(db, 'prfpdfrom'),
+                        'prfpdto': self._get_text(db, 'prfpdto'),
+                        'fcltynm': self._get_text(db, 'fcltynm'),
+                        'poster': self._get_text(db, 'poster'),
+                        'genrenm': self._get_text(db, 'genrenm'),
+                        'prfstate': self._get_text(db, 'prfstate'),
+                        'openrun': self._get_text(db, 'openrun')
+                    }
+                    performances.append(performance)
             
             return performances
             
@@ -281,7 +572,7 @@ class KopisAPIClient:
                 'service': self.api_key
             }
             
-            response = requests.get(f"{self.base_url}/pblprfr/{mt20id}", params=params)
+            response = self.transport.get(f"{self.base_url}/pblprfr/{mt20id}", params=params)
             response.raise_for_status()
             
             # XML 파싱
@@ -323,6 +614,68 @@ class KopisAPIClient:
         found = element.find(tag)
         return found.text if found is not None else ''
 
+DATE_FORMATS = ('%Y-%m-%d', '%Y.%m.%d', '%Y%m%d')
+
+def parse_single_date(value):
+    """'YYYY-MM-DD', 'YYYY.MM.DD', 'YYYYMMDD' 형식의 문자열을 date로 변환 (실패 시 None)"""
+    if not value:
+        return None
+    if hasattr(value, 'strftime'):
+        return value.date() if isinstance(value, datetime) else value
+    value = value.strip()
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(value, fmt).date()
+        except ValueError:
+            continue
+    return None
+
+def parse_date_range(value):
+    """공연 date 문자열('YYYY-MM-DD' 또는 'YYYY-MM-DD ~ YYYY-MM-DD')을 (시작일, 종료일)로 변환"""
+    if not value:
+        return None, None
+    parts = value.split('~')
+    start_date = parse_single_date(parts[0])
+    end_date = parse_single_date(parts[-1]) or start_date
+    if start_date and end_date and end_date < start_date:
+        start_date, end_date = end_date, start_date
+    return start_date, end_date
+
+KOPIS_STATE_CODES = {
+    '01': PERFORMANCE_STATE_UPCOMING,
+    '02': PERFORMANCE_STATE_ONGOING,
+    '03': PERFORMANCE_STATE_COMPLETED,
+}
+
+def normalize_performance_state(value):
+    """KOPIS prfstate 값(한글 표기 또는 01~03 코드)을 진행 상태로 변환 (알 수 없는 값은 None)"""
+    value = (value or '').strip()
+    value = KOPIS_STATE_CODES.get(value, value)
+    if value in (PERFORMANCE_STATE_UPCOMING, PERFORMANCE_STATE_ONGOING, PERFORMANCE_STATE_COMPLETED):
+        return value
+    return None
+
+def expected_performance_state(start_date, end_date, today=None):
+    """시작/종료일로 계산한 진행 상태 (날짜가 없으면 None)"""
+    today = today or datetime.now().date()
+    if end_date and end_date < today:
+        return PERFORMANCE_STATE_COMPLETED
+    if start_date and start_date > today:
+        return PERFORMANCE_STATE_UPCOMING
+    if start_date or end_date:
+        return PERFORMANCE_STATE_ONGOING
+    return None
+
+def filter_by_date_range(query, range_start=None, range_end=None):
+    """기간과 겹치는 공연만 조회 (start_date/end_date 인덱스 범위 검색)"""
+    range_start = parse_single_date(range_start)
+    range_end = parse_single_date(range_end)
+    if range_start:
+        query = query.filter(Performance.end_date >= range_start)
+    if range_end:
+        query = query.filter(Performance.start_date <= range_end)
+    return query
+
 def map_kopis_to_performance(kopis_data):
     """KOPIS 데이터를 내부 Performance 모델로 매핑"""
     
@@ -347,6 +700,9 @@ def map_kopis_to_performance(kopis_data):
     except:
         date_range = f"{kopis_data.get('prfpdfrom', '')} ~ {kopis_data.get('prfpdto', '')}"
     
+    start_date = parse_single_date(kopis_data.get('prfpdfrom'))
+    end_date = parse_single_date(kopis_data.get('prfpdto')) or start_date
+    
     # 장르 분류
     genre = kopis_data.get('genrenm', '')
     mapped_genre = genre_mapping.get(genre, '복합')
@@ -362,6 +718,8 @@ def map_kopis_to_performance(kopis_data):
         'address': '',  # KOPIS에서 제공하지 않음
         'price': '가격 정보 없음',  # KOPIS에서 제공하지 않음
         'date': date_range,
+        'start_date': start_date,
+        'end_date': end_date,
         'time': kopis_data.get('dtguidance', ''),
         'contact_email': '',  # KOPIS에서 제공하지 않음
         'video_url': '',  # KOPIS에서 제공하지 않음
@@ -370,7 +728,7 @@ def map_kopis_to_performance(kopis_data):
         'category': mapped_genre,
         'ticket_url': '',  # KOPIS에서 제공하지 않음
         'is_approved': True,  # KOPIS 데이터는 자동 승인
-        'kopis_id': kopis_data.get('mt20id', ''),  # KOPIS 고유 ID 저장
+        'kopis_id': kopis_data.get('mt20id') or None,  # KOPIS 고유 ID 저장 (고유 인덱스이므로 빈 값은 NULL)
         'kopis_venue_id': kopis_data.get('mt10id', ''),  # KOPIS 공연장 ID
         'kopis_synced_at': datetime.now()
     }
@@ -443,6 +801,103 @@ def create_tables():
         logger.warning("Continuing without database initialization to prevent infinite loop.")
         return False
 
+def find_missing_indexes():
+    """모델에 선언된 인덱스 중 DB에 없는 인덱스 목록 [(테이블명, Index)]"""
+    inspector = db.inspect(db.engine)
+    existing_tables = set(inspector.get_table_names())
+    missing = []
+    
+    for table in db.metadata.sorted_tables:
+        if table.name not in existing_tables:
+            continue
+        existing_indexes = {index['name'] for index in inspector.get_indexes(table.name)}
+        for index in sorted(table.indexes, key=lambda index: index.name):
+            if index.name not in existing_indexes:
+                missing.append((table.name, index))
+    
+    return missing
+
+def find_missing_columns():
+    """모델에 선언된 컬럼 중 기존 테이블에 없는 컬럼 목록 [(테이블명, Column)]"""
+    inspector = db.inspect(db.engine)
+    existing_tables = set(inspector.get_table_names())
+    missing = []
+    
+    for table in db.metadata.sorted_tables:
+        if table.name not in existing_tables:
+            continue
+        existing_columns = {column['name'] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name not in existing_columns:
+                missing.append((table.name, column))
+    
+    return missing
+
+def add_missing_columns():
+    """누락된 컬럼 추가 (ALTER TABLE ADD COLUMN, SQLite/PostgreSQL 공통) - 추가한 컬럼 목록 반환"""
+    dialect = db.engine.dialect
+    added = []
+    
+    for table_name, column in find_missing_columns():
+        ddl = f"ALTER TABLE {table_name} ADD COLUMN {column.name} {column.type.compile(dialect=dialect)}"
+        default = column.default.arg if column.default is not None and column.default.is_scalar else None
+        if isinstance(default, bool):
+            ddl += f" DEFAULT {'true' if default else 'false'}" if dialect.name == 'postgresql' else f" DEFAULT {int(default)}"
+        elif isinstance(default, (int, float)):
+            ddl += f" DEFAULT {default}"
+        elif isinstance(default, str):
+            ddl += " DEFAULT '{}'".format(default.replace("'", "''"))
+        with db.engine.begin() as connection:
+            connection.execute(text(ddl))
+        logger.info(f"Added column {table_name}.{column.name}")
+        added.append(f"{table_name}.{column.name}")
+    
+    return added
+
+def normalize_kopis_ids():
+    """kopis_id 고유 인덱스 생성 전 정리 - 빈 문자열은 NULL로, 중복은 가장 먼저 등록된 공연만 유지
+    
+    중복된 나머지 공연은 삭제하지 않고 kopis_id만 비운다. 정리한 행 수를 반환.
+    """
+    with db.engine.begin() as connection:
+        cleared = connection.execute(
+            text("UPDATE performance SET kopis_id = NULL WHERE kopis_id = ''")
+        ).rowcount
+        duplicates = connection.execute(text(
+            "UPDATE performance SET kopis_id = NULL "
+            "WHERE kopis_id IS NOT NULL AND id NOT IN ("
+            "SELECT MIN(id) FROM performance WHERE kopis_id IS NOT NULL GROUP BY kopis_id)"
+        )).rowcount
+    if duplicates:
+        logger.warning(f"Cleared duplicate kopis_id on {duplicates} performances")
+    return cleared + duplicates
+
+def create_missing_indexes():
+    """누락된 인덱스 생성 (SQLite/PostgreSQL 공통) - 생성한 인덱스 이름 목록 반환"""
+    created = []
+    for table_name, index in find_missing_indexes():
+        index.create(bind=db.engine)
+        logger.info(f"Created index {index.name} on {table_name}")
+        created.append(index.name)
+    return created
+
+def report_schema_drift():
+    """시작 시 모델과 DB 스키마 차이(누락된 컬럼/인덱스)를 로그로 알림"""
+    try:
+        with app.app_context():
+            missing_columns = find_missing_columns()
+            missing_indexes = find_missing_indexes()
+        if missing_columns:
+            names = ', '.join(f"{table_name}.{column.name}" for table_name, column in missing_columns)
+            logger.warning(f"Missing database columns: {names} (run `python migrate_schema.py`)")
+        if missing_indexes:
+            names = ', '.join(f"{table_name}.{index.name}" for table_name, index in missing_indexes)
+            logger.warning(f"Missing database indexes: {names} (run `python migrate_schema.py`)")
+        return missing_columns, missing_indexes
+    except Exception as e:
+        logger.warning(f"Schema check skipped: {e}")
+        return [], []
+
 def create_sample_data_if_needed():
     try:
         with app.app_context():
@@ -1184,10 +1639,194 @@ cloudinary.config(
     api_secret=os.getenv('CLOUDINARY_API_SECRET')
 )
 
+class CacheGeneration(db.Model):
+    """프로세스 간 캐시 무효화 신호 (이름별 세대 번호, 바뀌면 각 프로세스가 메모리 캐시를 비움)"""
+    name = db.Column(db.String(50), primary_key=True)
+    generation = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=func.now(), onupdate=func.now())
+
+def get_cache_generation(name):
+    """캐시 세대 번호 조회 (행이 없으면 0)"""
+    table = CacheGeneration.__table__
+    with db.engine.connect() as connection:
+        return connection.execute(
+            db.select(table.c.generation).where(table.c.name == name)
+        ).scalar() or 0
+
+def bump_cache_generation(name):
+    """캐시 세대 번호 증가 - 다른 프로세스가 다음 확인 때 메모리 캐시를 비운다"""
+    table = CacheGeneration.__table__
+    bump = table.update().where(table.c.name == name)\
+        .values(generation=table.c.generation + 1, updated_at=func.now())
+    with db.engine.begin() as connection:
+        if connection.execute(bump).rowcount:
+            return
+    try:
+        with db.engine.begin() as connection:
+            connection.execute(table.insert().values(name=name, generation=1, updated_at=func.now()))
+    except IntegrityError:
+        # 다른 프로세스가 먼저 행을 만든 경우
+        with db.engine.begin() as connection:
+            connection.execute(bump)
+
+class RenderedFragmentCache:
+    """렌더링된 HTML 조각 캐시 (프로세스 내 메모리, 카탈로그 변경 시 전체 무효화)
+    
+    generation_name을 주면 무효화할 때 DB 세대 번호(CacheGeneration)를 올리고, 조회할 때
+    check_seconds마다 세대 번호를 확인해 CLI 스크립트나 다른 워커의 무효화도 반영한다.
+    """
+    
+    def __init__(self, ttl_seconds=300, generation_name=None, check_seconds=5.0):
+        # TTL은 세대 번호를 확인할 수 없을 때 다른 프로세스의 변경이 반영되기까지의 최대 지연 시간
+        self.ttl_seconds = ttl_seconds
+        self.generation_name = generation_name
+        self.check_seconds = check_seconds
+        self._generation = None
+        self._checked_at = None
+        self._entries = {}
+        self._lock = threading.Lock()
+    
+    def _check_generation(self):
+        if self.generation_name is None:
+            return
+        now = time.monotonic()
+        if self._checked_at is not None and now - self._checked_at < self.check_seconds:
+            return
+        self._checked_at = now
+        try:
+            generation = get_cache_generation(self.generation_name)
+        except Exception as e:
+            logger.debug(f"캐시 세대 번호 확인 실패 ({self.generation_name}): {e}")
+            return
+        with self._lock:
+            if generation != self._generation:
+                self._entries.clear()
+                self._generation = generation
+    
+    def get(self, key):
+        self._check_generation()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            return value
+    
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + self.ttl_seconds)
+    
+    def invalidate(self):
+        with self._lock:
+            self._entries.clear()
+        if self.generation_name is not None:
+            try:
+                bump_cache_generation(self.generation_name)
+            except Exception as e:
+                logger.warning(f"캐시 세대 번호 갱신 실패 ({self.generation_name}): {e}")
+
+# 홈 공연 목록 조각 캐시 (category_filter, 언어, 날짜별)
+home_fragment_cache = RenderedFragmentCache(
+    ttl_seconds=int(os.getenv('HOME_CACHE_TTL', 300)),
+    generation_name='home',
+    check_seconds=float(os.getenv('HOME_CACHE_CHECK_SECONDS', 5))
+)
+
+def invalidate_home_cache(reason):
+    """승인/삭제/동기화 등 홈 목록에 보이는 공연이나 카드 내용이 바뀌는 작업 후 홈 캐시 무효화
+    
+    DB 세대 번호를 올리고 모든 워커의 캐시를 비우므로 자주 일어나는 사용자 행동(좋아요 등)에는 쓰지 않는다.
+    CLI 스크립트에서 호출해도 웹 워커가 HOME_CACHE_CHECK_SECONDS 안에 반영한다.
+    """
+    home_fragment_cache.invalidate()
+    logger.debug(f"Home fragment cache invalidated: {reason}")
+
+# 홈 목록 페이지네이션 설정
+HOME_PAGE_SIZE = 24
+HOME_PAGE_MAX_SIZE = 100
+
+def build_home_query(category_filter):
+    """홈 목록 기본 쿼리 (종료되지 않은 승인 공연 + 기간/카테고리 필터)"""
+    # 기본 쿼리 (승인된 공연 중 공연완료 제외 - ix_performance_active_created_at 사용)
+    query = Performance.query.filter_by(is_approved=True).filter(ACTIVE_PERFORMANCE_CONDITION)
+    
+    # 카테고리 필터 적용
+    if category_filter and category_filter != '전체기간':
+        if category_filter == '이번주':
+            # 이번 주 공연 필터링
+            today = datetime.now().date()
+            week_start = today - timedelta(days=today.weekday())
+            week_end = week_start + timedelta(days=6)
+            query = filter_by_date_range(query, week_start, week_end)
+        elif category_filter == '이번달':
+            # 이번 달 공연 필터링
+            today = datetime.now().date()
+            month_start = today.replace(day=1)
+            if today.month == 12:
+                month_end = today.replace(year=today.year + 1, month=1, day=1) - timedelta(days=1)
+            else:
+                month_end = today.replace(month=today.month + 1, day=1) - timedelta(days=1)
+            query = filter_by_date_range(query, month_start, month_end)
+        elif category_filter == '다음달':
+            # 다음 달 공연 필터링
+            today = datetime.now().date()
+            if today.month == 12:
+                next_month_start = today.replace(year=today.year + 1, month=1, day=1)
+                next_month_end = today.replace(year=today.year + 1, month=2, day=1) - timedelta(days=1)
+            else:
+                next_month_start = today.replace(month=today.month + 1, day=1)
+                if today.month == 11:
+                    next_month_end = today.replace(year=today.year + 1, month=1, day=1) - timedelta(days=1)
+                else:
+                    next_month_end = today.replace(month=today.month + 2, day=1) - timedelta(days=1)
+            query = filter_by_date_range(query, next_month_start, next_month_end)
+        else:
+            # 일반 카테고리 필터링
+            query = query.filter_by(category=category_filter)
+    
+    return query
+
+def encode_performance_cursor(performance):
+    """(created_at, id) 키셋 커서 문자열 생성"""
+    created_at = performance.created_at.isoformat() if performance.created_at else ''
+    raw = f"{created_at}|{performance.id}"
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii')
+
+def decode_performance_cursor(cursor):
+    """키셋 커서 해석 - 잘못된 커서는 ValueError"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode('ascii')).decode('utf-8')
+        created_at_text, performance_id = raw.rsplit('|', 1)
+        created_at = datetime.fromisoformat(created_at_text) if created_at_text else None
+        return created_at, int(performance_id)
+    except Exception:
+        raise ValueError(f"Invalid cursor: {cursor}")
+
+def paginate_performances(query, cursor=None, limit=HOME_PAGE_SIZE):
+    """최신순 키셋 페이지네이션 - (공연 목록, 다음 커서) 반환"""
+    if cursor:
+        created_at, last_id = decode_performance_cursor(cursor)
+        # SQLite는 DATETIME을 문자열로 저장하므로 바인딩 값과 직접 비교하면 포맷 차이가 생긴다.
+        # 커서 행의 실제 created_at 값을 서브쿼리로 가져와 비교하고, 행이 삭제된 경우에만 커서 값을 사용한다.
+        anchor = db.session.query(Performance.created_at).filter(Performance.id == last_id).scalar_subquery()
+        anchor = func.coalesce(anchor, created_at)
+        query = query.filter(db.or_(
+            Performance.created_at < anchor,
+            db.and_(Performance.created_at == anchor, Performance.id < last_id)
+        ))
+    
+    rows = query.order_by(Performance.created_at.desc(), Performance.id.desc()).limit(limit + 1).all()
+    performances = rows[:limit]
+    next_cursor = encode_performance_cursor(performances[-1]) if len(rows) > limit else None
+    return performances, next_cursor
+
 # 기본 라우트들
 @app.route('/')
 def home():
-    """홈페이지 - 승인된 공연 목록"""
+    """홈페이지 - 승인된 공연 목록 (첫 페이지, 이후는 /api/performances로 이어서 로드)"""
     try:
         # 사용자 이벤트 추적 (로그인한 사용자만)
         if current_user.is_authenticated:
@@ -1200,49 +1839,24 @@ def home():
         # 필터 파라미터 받기
         category_filter = request.args.get('category_filter', '전체기간')
         
-        # 기본 쿼리 (승인된 공연만)
-        query = Performance.query.filter_by(is_approved=True)
-        
-        # 카테고리 필터 적용
-        if category_filter and category_filter != '전체기간':
-            if category_filter == '이번주':
-                # 이번 주 공연 필터링
-                today = datetime.now().date()
-                week_start = today - timedelta(days=today.weekday())
-                week_end = week_start + timedelta(days=6)
-                query = query.filter(Performance.date >= week_start, Performance.date <= week_end)
-            elif category_filter == '이번달':
-                # 이번 달 공연 필터링
-                today = datetime.now().date()
-                month_start = today.replace(day=1)
-                if today.month == 12:
-                    month_end = today.replace(year=today.year + 1, month=1, day=1) - timedelta(days=1)
-                else:
-                    month_end = today.replace(month=today.month + 1, day=1) - timedelta(days=1)
-                query = query.filter(Performance.date >= month_start, Performance.date <= month_end)
-            elif category_filter == '다음달':
-                # 다음 달 공연 필터링
-                today = datetime.now().date()
-                if today.month == 12:
-                    next_month_start = today.replace(year=today.year + 1, month=1, day=1)
-                    next_month_end = today.replace(year=today.year + 1, month=2, day=1) - timedelta(days=1)
-                else:
-                    next_month_start = today.replace(month=today.month + 1, day=1)
-                    if today.month == 11:
-                        next_month_end = today.replace(year=today.year + 1, month=1, day=1) - timedelta(days=1)
-                    else:
-                        next_month_end = today.replace(month=today.month + 2, day=1) - timedelta(days=1)
-                query = query.filter(Performance.date >= next_month_start, Performance.date <= next_month_end)
-            else:
-                # 일반 카테고리 필터링
-                query = query.filter_by(category=category_filter)
-        
-        # 최신순으로 정렬
-        performances = query.order_by(Performance.created_at.desc()).all()
+        # 공연 목록 조각 (캐시에 없을 때만 DB 조회 후 렌더링)
+        # 이번주/이번달 필터가 날짜에 따라 달라지므로 오늘 날짜도 키에 포함
+        cache_key = (category_filter, g.get('lang', 'ko'), datetime.now().date())
+        performance_grid_html = home_fragment_cache.get(cache_key)
+        if performance_grid_html is None:
+            query = build_home_query(category_filter)
+            performances, next_cursor = paginate_performances(query)
+            performance_grid_html = Markup('')
+            if performances:
+                performance_grid_html = Markup(render_template("performance_grid.html",
+                                               performances=performances,
+                                               next_cursor=next_cursor,
+                                               selected_category=category_filter))
+            home_fragment_cache.set(cache_key, performance_grid_html)
         
         # 템플릿 렌더링
         response = make_response(render_template("index.html", 
-                             performances=performances, 
+                             performance_grid_html=performance_grid_html, 
                              selected_category=category_filter))
         
         # 캐시 무효화 헤더 추가
@@ -1254,7 +1868,30 @@ def home():
     except Exception as e:
         logger.error(f"홈페이지 오류: {e}")
         flash('홈페이지를 불러오는 중 오류가 발생했습니다.', 'error')
-        return render_template("index.html", performances=[], selected_category='전체기간')
+        return render_template("index.html", performance_grid_html=None, selected_category='전체기간')
+
+@app.route('/api/performances')
+def api_performances():
+    """홈 목록 다음 페이지 API (무한 스크롤용)"""
+    category_filter = request.args.get('category_filter', '전체기간')
+    cursor = request.args.get('cursor')
+    limit = min(max(request.args.get('limit', HOME_PAGE_SIZE, type=int), 1), HOME_PAGE_MAX_SIZE)
+    
+    try:
+        query = build_home_query(category_filter)
+        performances, next_cursor = paginate_performances(query, cursor, limit)
+    except ValueError:
+        return jsonify({'success': False, 'error': '잘못된 커서입니다.'}), 400
+    except Exception as e:
+        logger.error(f"공연 목록 API 오류: {e}")
+        return jsonify({'success': False, 'error': '오류가 발생했습니다.'}), 500
+    
+    return jsonify({
+        'success': True,
+        'html': render_template('performance_cards.html', performances=performances),
+        'count': len(performances),
+        'next_cursor': next_cursor
+    })
 
 @app.route('/home')
 def home_redirect():
@@ -1395,6 +2032,8 @@ def health_check():
         return jsonify({
             'status': 'healthy',
             'database': 'connected',
+            'event_buffer': user_event_buffer.get_stats(),
+            'kopis_http': kopis_transport.get_stats(),
             'timestamp': datetime.now().isoformat()
         }), 200
     except Exception as e:
@@ -1506,14 +2145,9 @@ def admin_panel():
         pending_query = Performance.query.filter_by(is_approved=False)
         approved_query = Performance.query.filter_by(is_approved=True)
         
-        # 날짜 필터 적용
-        if start_date:
-            pending_query = pending_query.filter(Performance.date >= start_date)
-            approved_query = approved_query.filter(Performance.date >= start_date)
-        
-        if end_date:
-            pending_query = pending_query.filter(Performance.date <= end_date)
-            approved_query = approved_query.filter(Performance.date <= end_date)
+        # 날짜 필터 적용 (공연 기간이 필터 기간과 겹치는 공연)
+        pending_query = filter_by_date_range(pending_query, start_date, end_date)
+        approved_query = filter_by_date_range(approved_query, start_date, end_date)
         
         # 카테고리 필터 적용
         if category_filter:
@@ -1540,6 +2174,7 @@ def admin_panel():
         trend_prediction = get_trend_prediction()
         performance_stats = get_performance_statistics()
         category_trends = get_category_trends()
+        category_trend_chart_data = get_category_trend_series('week', 12)
         
         # 템플릿 렌더링
         response = make_response(render_template("admin.html", 
@@ -1555,7 +2190,8 @@ def admin_panel():
                              audience_analysis=audience_analysis,
                              trend_prediction=trend_prediction,
                              performance_stats=performance_stats,
-                             category_trends=category_trends))
+                             category_trends=category_trends,
+                             category_trend_chart_data=category_trend_chart_data))
         
         # 캐시 무효화 헤더 추가
         response.headers['Cache-Control'] = 'no-cache, no-store, must-revalidate'
@@ -1569,75 +2205,61 @@ def admin_panel():
         return redirect(url_for('home'))
 
 def get_monthly_chart_data(start_date=None, end_date=None, category_filter=None):
-    """월별 공연 등록 차트 데이터 (필터 적용)"""
-    from datetime import datetime, timedelta
-    import calendar
-    
-    # 최근 12개월 데이터
+    """월별 공연 등록 차트 데이터 (필터 적용, 월 단위 GROUP BY 한 번으로 집계)"""
+    # 최근 12개월 버킷
     months = []
-    data = []
-    
     for i in range(11, -1, -1):
         date = datetime.now() - timedelta(days=30*i)
-        year = date.year
-        month = date.month
-        
-        # 해당 월의 시작일과 종료일
-        month_start = datetime(year, month, 1)
-        if month == 12:
-            month_end = datetime(year + 1, 1, 1) - timedelta(days=1)
-        else:
-            month_end = datetime(year, month + 1, 1) - timedelta(days=1)
-        
-        # 기본 쿼리
-        query = Performance.query
-        
-        # 필터 적용
-        if start_date:
-            query = query.filter(Performance.date >= start_date)
-        if end_date:
-            query = query.filter(Performance.date <= end_date)
-        if category_filter:
-            query = query.filter_by(category=category_filter)
-        
-        # 해당 월의 공연 수 (공연일 기준)
-        count = query.filter(
-            Performance.date >= month_start.strftime('%Y-%m-%d'),
-            Performance.date <= month_end.strftime('%Y-%m-%d')
-        ).count()
-        
-        months.append(f"{year}-{month:02d}")
-        data.append(count)
+        months.append((date.year, date.month))
+    
+    # 전체 조회 범위 (첫 달 1일 ~ 마지막 달 말일)
+    first_year, first_month = months[0]
+    last_year, last_month = months[-1]
+    range_start = datetime(first_year, first_month, 1).date()
+    if last_month == 12:
+        range_end = datetime(last_year + 1, 1, 1).date() - timedelta(days=1)
+    else:
+        range_end = datetime(last_year, last_month + 1, 1).date() - timedelta(days=1)
+    
+    # 공연 시작일 기준 연/월별 공연 수
+    year_bucket = db.extract('year', Performance.start_date)
+    month_bucket = db.extract('month', Performance.start_date)
+    query = db.session.query(year_bucket, month_bucket, func.count(Performance.id))\
+        .filter(Performance.start_date >= range_start, Performance.start_date <= range_end)
+    
+    # 필터 적용
+    query = filter_by_date_range(query, start_date, end_date)
+    if category_filter:
+        query = query.filter(Performance.category == category_filter)
+    
+    counts = {
+        (int(year), int(month)): count
+        for year, month, count in query.group_by(year_bucket, month_bucket).all()
+    }
     
     return {
-        'labels': months,
-        'data': data
+        'labels': [f"{year}-{month:02d}" for year, month in months],
+        'data': [counts.get((year, month), 0) for year, month in months]
     }
 
 def get_category_chart_data(start_date=None, end_date=None, category_filter=None):
-    """카테고리별 공연 차트 데이터 (필터 적용)"""
+    """카테고리별 공연 차트 데이터 (필터 적용, 카테고리 GROUP BY 한 번으로 집계)"""
     categories = ['연극', '뮤지컬', '서양음악(클래식)', '한국음악(국악)', 
                  '대중음악', '무용(서양/한국무용)', '대중무용', '서커스/마술', '복합']
     
-    data = []
-    for category in categories:
-        # 기본 쿼리
-        query = Performance.query.filter_by(category=category)
-        
-        # 필터 적용
-        if start_date:
-            query = query.filter(Performance.date >= start_date)
-        if end_date:
-            query = query.filter(Performance.date <= end_date)
-        if category_filter:
-            query = query.filter_by(category=category_filter)
-        
-        count = query.count()
-        data.append(count)
+    query = db.session.query(Performance.category, func.count(Performance.id))\
+        .filter(Performance.category.in_(categories))
+    
+    # 필터 적용
+    query = filter_by_date_range(query, start_date, end_date)
+    if category_filter:
+        query = query.filter(Performance.category == category_filter)
+    
+    counts = dict(query.group_by(Performance.category).all())
     
     return {
         'labels': categories,
-        'data': data
+        'data': [counts.get(category, 0) for category in categories]
     }
 
 @app.route('/admin/approve/<int:performance_id>', methods=['POST'])
@@ -1651,6 +2273,7 @@ def approve_performance(performance_id):
     if performance:
         performance.is_approved = True
         db.session.commit()
+        invalidate_home_cache('approve')
         flash('공연이 승인되었습니다.', 'success')
     
     return redirect(url_for('admin_panel'))
@@ -1666,6 +2289,7 @@ def reject_performance(performance_id):
     if performance:
         db.session.delete(performance)
         db.session.commit()
+        invalidate_home_cache('reject')
         flash('공연이 거절되었습니다.', 'success')
     
     return redirect(url_for('admin_panel'))
@@ -1693,6 +2317,7 @@ def delete_performance(performance_id):
         
         db.session.delete(performance)
         db.session.commit()
+        invalidate_home_cache('delete')
         flash('공연이 삭제되었습니다.', 'success')
     
     return redirect(url_for('admin_panel'))
@@ -1779,6 +2404,9 @@ def performance_detail(performance_id):
     try:
         performance = Performance.query.get_or_404(performance_id)
         
+        # KOPIS 공연은 처음 열릴 때 상세 정보를 백그라운드에서 받아 저장 (이번 응답은 저장된 값으로 표시)
+        schedule_kopis_detail(performance)
+        
         # 사용자 이벤트 추적 (로그인한 사용자만)
         if current_user.is_authenticated:
             track_user_event(
@@ -1788,7 +2416,16 @@ def performance_detail(performance_id):
                 metadata={'page': 'performance_detail'}
             )
         
-        return render_template('performance_detail.html', performance=performance)
+        # 저장된 공연장/캐시 좌표로 지도 표시 (페이지마다 브라우저에서 지오코딩하지 않음)
+        # 캐시에 없는 주소는 응답을 기다리지 않고 백그라운드에서 지오코딩
+        # (찾지 못한 주소로 캐시된 경우는 다시 예약하지 않음)
+        map_coordinates = get_performance_coordinates(performance)
+        if map_coordinates is GEOCODE_NOT_CACHED:
+            geocode_in_background(performance.address)
+            map_coordinates = None
+        
+        return render_template('performance_detail.html', performance=performance,
+                               map_coordinates=map_coordinates)
     except Exception as e:
         logger.error(f"공연 상세 페이지 오류: {e}")
         flash('공연 정보를 불러오는 중 오류가 발생했습니다.', 'error')
@@ -1810,7 +2447,16 @@ def toggle_like(performance_id):
         ).first()
         
         if existing_like:
-            # 좋아요 취소
+            # 좋아요 취소 - 롤업이 이미 집계한 좋아요를 차감하도록 같은 트랜잭션에 'unlike' 이벤트 기록
+            db.session.add(UserEvent(
+                user_id=current_user.id,
+                event_type='unlike',
+                performance_id=performance_id,
+                event_data=json.dumps({
+                    'like_id': existing_like.id,
+                    'liked_at': existing_like.created_at.isoformat() if existing_like.created_at else None
+                })
+            ))
             db.session.delete(existing_like)
             performance.likes -= 1
             liked = False
@@ -1822,6 +2468,8 @@ def toggle_like(performance_id):
             liked = True
         
         db.session.commit()
+        # 목록 순서와 구성은 그대로이므로 홈 캐시는 비우지 않음 (누른 사람은 응답의 likes로 갱신,
+        # 다른 방문자의 카드 좋아요 수는 HOME_CACHE_TTL 안에 반영)
         
         return jsonify({
             'success': True, 
@@ -2093,6 +2741,7 @@ def bulk_approve_performances():
             performance.is_approved = True
         
         db.session.commit()
+        invalidate_home_cache('bulk_approve')
         
         return jsonify({
             'success': True, 
@@ -2132,6 +2781,7 @@ def bulk_reject_performances():
             db.session.delete(performance)
         
         db.session.commit()
+        invalidate_home_cache('bulk_reject')
         
         return jsonify({
             'success': True, 
@@ -2142,82 +2792,173 @@ def bulk_reject_performances():
         logger.error(f"Bulk reject error: {e}")
         return jsonify({'success': False, 'error': '오류가 발생했습니다.'})
 
+# 공연 데이터 내보내기 (서버 측 커서로 청크 단위 조회 후 스트리밍)
+EXPORT_CHUNK_SIZE = int(os.environ.get('EXPORT_CHUNK_SIZE', 1000))
+
+PERFORMANCE_EXPORT_HEADER = [
+    'ID', '제목', '팀명', '설명', '장소', '주소', '가격', '날짜', '시간',
+    '연락처', '비디오URL', '이미지URL', '메인카테고리', '카테고리', 
+    '티켓URL', '좋아요수', '승인상태', '신청자', '신청자이메일', '등록일'
+]
+
+def build_performance_export_query(start_date=None, end_date=None, category_filter=None):
+    """내보내기용 공연 + 신청자 조회 (User는 한 번의 조인으로 함께 조회)"""
+    query = db.session.query(Performance, User.name, User.email)\
+        .outerjoin(User, Performance.user_id == User.id)
+    
+    query = filter_by_date_range(query, start_date, end_date)
+    if category_filter:
+        query = query.filter(Performance.category == category_filter)
+    
+    return query.order_by(Performance.id)
+
+def performance_export_row(perf, user_name, user_email):
+    """내보내기 한 행"""
+    return [
+        perf.id,
+        perf.title,
+        perf.group_name,
+        perf.description or '',
+        perf.location or '',
+        perf.address or '',
+        perf.price or '',
+        perf.date or '',
+        perf.time or '',
+        perf.contact_email or '',
+        perf.video_url or '',
+        perf.image_url or '',
+        perf.main_category or '',
+        perf.category or '',
+        perf.ticket_url or '',
+        perf.likes,
+        '승인됨' if perf.is_approved else '대기중',
+        user_name or '알 수 없음',
+        user_email or '알 수 없음',
+        perf.created_at.strftime('%Y-%m-%d %H:%M:%S') if perf.created_at else ''
+    ]
+
+def iter_performance_csv(query, chunk_size=EXPORT_CHUNK_SIZE):
+    """CSV를 청크 단위 문자열로 생성 (메모리에는 한 청크만 유지)
+    
+    첫 청크를 만들 때 쿼리를 실행하므로 조회 오류는 첫 next()에서 그대로 발생한다.
+    그 뒤(응답 전송 중)의 오류는 로그에 남기고 마지막 줄에 오류 표시를 붙여 스트림을 끝낸다.
+    """
+    buffer = StringIO()
+    writer = csv.writer(buffer)
+    
+    def drain():
+        data = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate(0)
+        return data
+    
+    # 헤더를 보내기 전에 쿼리를 실행해 조회 오류가 응답 시작 전에 드러나게 함
+    rows = iter(query.yield_per(chunk_size))
+    first = next(rows, None)
+    
+    # Excel에서 한글이 깨지지 않도록 BOM 포함 (기존 utf-8-sig와 동일)
+    buffer.write('\ufeff')
+    writer.writerow(PERFORMANCE_EXPORT_HEADER)
+    if first is None:
+        yield drain()
+        return
+    writer.writerow(performance_export_row(*first))
+    yield drain()
+    
+    try:
+        for index, (perf, user_name, user_email) in enumerate(rows, 2):
+            writer.writerow(performance_export_row(perf, user_name, user_email))
+            if index % chunk_size == 0:
+                yield drain()
+        yield drain()
+    except Exception:
+        # 이미 200 응답을 보내는 중이라 오류 페이지로 바꿀 수 없으므로 잘린 파일임을 본문에 표시
+        logger.exception("CSV streaming error")
+        writer.writerow([])
+        writer.writerow(['#ERROR', '내보내기 중 오류가 발생해 데이터가 일부만 포함되었습니다. 다시 시도해 주세요.'])
+        yield drain()
+
+def performance_export_sheet(start_date=None, end_date=None, category_filter=None, chunk_size=EXPORT_CHUNK_SIZE):
+    """공연 데이터 시트 (title, header, rows) - rows는 청크 단위로 조회하는 제너레이터"""
+    query = build_performance_export_query(start_date, end_date, category_filter)
+    rows = (performance_export_row(perf, user_name, user_email)
+            for perf, user_name, user_email in query.yield_per(chunk_size))
+    return '공연 데이터', PERFORMANCE_EXPORT_HEADER, rows
+
+def write_xlsx_export(sheets):
+    """write-only 워크북으로 여러 시트를 한 번에 임시 파일에 기록하고 파일 객체 반환
+    
+    sheets는 (시트명, 헤더, 행 iterable) 목록이며 각 행은 기록 즉시 파일로 내려가므로
+    메모리 사용량은 행 수와 무관하다. 임시 파일은 닫히는 즉시 삭제된다.
+    """
+    file = tempfile.TemporaryFile(prefix='export_', suffix='.xlsx')
+    
+    try:
+        wb = Workbook(write_only=True)
+        for title, header, rows in sheets:
+            ws = wb.create_sheet(title)
+            ws.append(header)
+            for row in rows:
+                # 엑셀에서 허용하지 않는 제어 문자 제거
+                ws.append([ILLEGAL_CHARACTERS_RE.sub('', value) if isinstance(value, str) else value
+                           for value in row])
+        wb.save(file)
+        file.seek(0)
+        return file
+    except Exception:
+        file.close()
+        raise
+
+def send_xlsx_export(file, filename):
+    """임시 XLSX 파일 전송 (전송이 끝나 파일이 닫히면 자동 삭제)"""
+    return send_file(
+        file,
+        mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+        as_attachment=True,
+        download_name=filename
+    )
+
+def stream_performance_csv(filename):
+    """필터 파라미터로 공연 CSV 스트리밍 응답 생성"""
+    query = build_performance_export_query(
+        request.args.get('start_date'),
+        request.args.get('end_date'),
+        request.args.get('category_filter')
+    )
+    
+    # 한글 파일명은 RFC 5987 형식으로 전달
+    ascii_filename = f"performances_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
+    disposition = f"attachment; filename={ascii_filename}; filename*=UTF-8''{quote(filename)}"
+    
+    # 첫 청크(쿼리 실행 포함)는 응답을 시작하기 전에 만들어 조회 오류를 라우트의 except에서 처리
+    chunks = iter_performance_csv(query)
+    first_chunk = next(chunks)
+    return Response(
+        stream_with_context(chain([first_chunk], chunks)),
+        mimetype='text/csv',
+        headers={'Content-Disposition': disposition, 'X-Accel-Buffering': 'no'}
+    )
+
 @app.route('/admin/export/excel')
 def export_excel():
-    """공연 데이터 Excel 내보내기 (CSV 형식으로 대체)"""
+    """공연 데이터 Excel 내보내기 (공연 데이터/공연별 통계/카테고리 트렌드 시트)"""
     if not current_user.is_authenticated or not current_user.is_admin:
         flash('관리자 권한이 필요합니다.', 'error')
         return redirect(url_for('login'))
     
     try:
-        from io import StringIO
-        from datetime import datetime
-        import csv
-        
-        # 필터 파라미터 받기
-        start_date = request.args.get('start_date')
-        end_date = request.args.get('end_date')
-        category_filter = request.args.get('category_filter')
-        
-        # 쿼리 구성
-        query = Performance.query
-        
-        if start_date:
-            query = query.filter(Performance.date >= start_date)
-        if end_date:
-            query = query.filter(Performance.date <= end_date)
-        if category_filter:
-            query = query.filter_by(category=category_filter)
-        
-        performances = query.all()
-        
-        # CSV 데이터 생성
-        output = StringIO()
-        writer = csv.writer(output)
-        
-        # 헤더 작성
-        writer.writerow([
-            'ID', '제목', '팀명', '설명', '장소', '주소', '가격', '날짜', '시간',
-            '연락처', '비디오URL', '이미지URL', '메인카테고리', '카테고리', 
-            '티켓URL', '좋아요수', '승인상태', '신청자', '신청자이메일', '등록일'
+        file = write_xlsx_export([
+            performance_export_sheet(
+                request.args.get('start_date'),
+                request.args.get('end_date'),
+                request.args.get('category_filter')
+            ),
+            performance_stats_sheet(),
+            category_trends_sheet()
         ])
         
-        # 데이터 작성
-        for perf in performances:
-            user = User.query.get(perf.user_id)
-            writer.writerow([
-                perf.id,
-                perf.title,
-                perf.group_name,
-                perf.description or '',
-                perf.location or '',
-                perf.address or '',
-                perf.price or '',
-                perf.date or '',
-                perf.time or '',
-                perf.contact_email or '',
-                perf.video_url or '',
-                perf.image_url or '',
-                perf.main_category or '',
-                perf.category or '',
-                perf.ticket_url or '',
-                perf.likes,
-                '승인됨' if perf.is_approved else '대기중',
-                user.name if user else '알 수 없음',
-                user.email if user else '알 수 없음',
-                perf.created_at.strftime('%Y-%m-%d %H:%M:%S')
-            ])
-        
-        output.seek(0)
-        
-        filename = f"공연데이터_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
-        
-        return send_file(
-            BytesIO(output.getvalue().encode('utf-8-sig')),
-            mimetype='text/csv',
-            as_attachment=True,
-            download_name=filename
-        )
+        filename = f"공연데이터_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
+        return send_xlsx_export(file, filename)
         
     except Exception as e:
         logger.error(f"Excel export error: {e}")
@@ -2232,74 +2973,8 @@ def export_csv():
         return redirect(url_for('login'))
     
     try:
-        from io import StringIO
-        from datetime import datetime
-        import csv
-        
-        # 필터 파라미터 받기
-        start_date = request.args.get('start_date')
-        end_date = request.args.get('end_date')
-        category_filter = request.args.get('category_filter')
-        
-        # 쿼리 구성
-        query = Performance.query
-        
-        if start_date:
-            query = query.filter(Performance.date >= start_date)
-        if end_date:
-            query = query.filter(Performance.date <= end_date)
-        if category_filter:
-            query = query.filter_by(category=category_filter)
-        
-        performances = query.all()
-        
-        # CSV 데이터 생성
-        output = StringIO()
-        writer = csv.writer(output)
-        
-        # 헤더 작성
-        writer.writerow([
-            'ID', '제목', '팀명', '설명', '장소', '주소', '가격', '날짜', '시간',
-            '연락처', '비디오URL', '이미지URL', '메인카테고리', '카테고리', 
-            '티켓URL', '좋아요수', '승인상태', '신청자', '신청자이메일', '등록일'
-        ])
-        
-        # 데이터 작성
-        for perf in performances:
-            user = User.query.get(perf.user_id)
-            writer.writerow([
-                perf.id,
-                perf.title,
-                perf.group_name,
-                perf.description or '',
-                perf.location or '',
-                perf.address or '',
-                perf.price or '',
-                perf.date or '',
-                perf.time or '',
-                perf.contact_email or '',
-                perf.video_url or '',
-                perf.image_url or '',
-                perf.main_category or '',
-                perf.category or '',
-                perf.ticket_url or '',
-                perf.likes,
-                '승인됨' if perf.is_approved else '대기중',
-                user.name if user else '알 수 없음',
-                user.email if user else '알 수 없음',
-                perf.created_at.strftime('%Y-%m-%d %H:%M:%S')
-            ])
-        
-        output.seek(0)
-        
         filename = f"공연데이터_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
-        
-        return send_file(
-            BytesIO(output.getvalue().encode('utf-8-sig')),
-            mimetype='text/csv',
-            as_attachment=True,
-            download_name=filename
-        )
+        return stream_performance_csv(filename)
         
     except Exception as e:
         logger.error(f"CSV export error: {e}")
@@ -2513,48 +3188,307 @@ def generate_market_report():
         flash('시장 리포트 생성 중 오류가 발생했습니다.', 'error')
         return redirect(url_for('admin_panel'))
 
+# 전체 동기화 시 동시에 조회할 분할 작업 수
+KOPIS_SYNC_WORKERS = int(os.environ.get('KOPIS_SYNC_WORKERS', 4))
+
+# 이 시간(초) 동안 진행 보고가 없는 대기/실행 중 작업은 중단된 것으로 간주 (프로세스 재시작 등)
+KOPIS_SYNC_JOB_STALE_SECONDS = int(os.environ.get('KOPIS_SYNC_JOB_STALE_SECONDS', 1800))
+
+class BackgroundRunner:
+    """요청 밖에서 실행할 작업의 백그라운드 실행기
+    
+    요청 처리 중에는 큐에 넣기만 하고, 프로세스별 백그라운드 스레드가 한 번에 하나씩 실행한다.
+    key를 주면 같은 key의 작업이 대기/실행 중일 때는 다시 넣지 않는다.
+    """
+    
+    def __init__(self, name, max_queue_size=0):
+        self.name = name
+        self.max_queue_size = max_queue_size
+        self._queue = queue.Queue(maxsize=max_queue_size)
+        self._pending = set()
+        self._pending_lock = threading.Lock()
+        self._start_lock = threading.Lock()
+        self._thread = None
+        self._pid = None
+    
+    def submit(self, func, *args, key=None):
+        """작업 실행 예약 (블로킹 없음) - 같은 key가 대기 중이거나 큐가 가득 차면 False"""
+        self._ensure_worker()
+        if key is not None:
+            with self._pending_lock:
+                if key in self._pending:
+                    return False
+                self._pending.add(key)
+        try:
+            self._queue.put_nowait((key, func, args))
+            return True
+        except queue.Full:
+            self._done(key)
+            logger.warning(f"{self.name} 큐가 가득 차 작업을 건너뜀: {key or func.__name__}")
+            return False
+    
+    def _done(self, key):
+        if key is not None:
+            with self._pending_lock:
+                self._pending.discard(key)
+    
+    def _ensure_worker(self):
+        # gunicorn fork 이후에는 부모 프로세스의 스레드가 없으므로 프로세스별로 시작
+        if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+            return
+        with self._start_lock:
+            if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+                return
+            if self._pid != os.getpid():
+                # 부모 프로세스에서 넣은 작업은 실행할 스레드가 없으므로 버림
+                self._queue = queue.Queue(maxsize=self.max_queue_size)
+                self._pending = set()
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+            self._thread.start()
+    
+    def _run(self):
+        while True:
+            key, func, args = self._queue.get()
+            try:
+                func(*args)
+            except Exception as e:
+                logger.error(f"{self.name} 작업 실행 실패 ({key or func.__name__}): {e}")
+            finally:
+                self._done(key)
+
+# KOPIS 동기화 작업 (KopisSyncJob 행을 만든 뒤 넣고, 배치마다 진행 현황을 작업 행에 기록)
+kopis_sync_runner = BackgroundRunner('kopis-sync-runner')
+# 페이지 조회 중 필요해진 짧은 외부 호출 (지오코딩 등) - 긴 동기화 작업 뒤에 밀리지 않도록 따로 실행
+page_task_runner = BackgroundRunner('page-task-runner', max_queue_size=1000)
+
+def expire_stale_kopis_sync_jobs():
+    """진행 보고가 오래 끊긴 대기/실행 중 작업을 실패로 정리 - 정리한 건수 반환"""
+    cutoff = datetime.now() - timedelta(seconds=KOPIS_SYNC_JOB_STALE_SECONDS)
+    expired = KopisSyncJob.query.filter(
+        KopisSyncJob.status.in_(('queued', 'running')),
+        func.coalesce(KopisSyncJob.heartbeat_at, KopisSyncJob.created_at) < cutoff
+    ).update({
+        'status': 'failed',
+        'error': '진행 보고가 끊겨 중단된 작업으로 처리했습니다.',
+        'finished_at': datetime.now()
+    }, synchronize_session=False)
+    if expired:
+        db.session.commit()
+        logger.warning(f"중단된 KOPIS 동기화 작업 {expired}개 정리")
+    return expired
+
+def enqueue_kopis_sync_job(options, requested_by=None):
+    """동기화 작업 등록 후 백그라운드 실행 - (작업, 새로 만들었는지) 반환
+    
+    이미 대기/실행 중인 작업이 있으면 새로 만들지 않고 그 작업을 돌려준다.
+    작업 없이 잠금만 잡혀 있으면 (sync_kopis.py 실행 중) JobLockBusy를 발생시킨다.
+    """
+    expire_stale_kopis_sync_jobs()
+    active = KopisSyncJob.query.filter(KopisSyncJob.status.in_(('queued', 'running'))) \
+        .order_by(KopisSyncJob.id).first()
+    if active is not None:
+        return active, False
+    holder = get_job_lock_holder('kopis_sync')
+    if holder:
+        raise JobLockBusy('kopis_sync', holder)
+    
+    job = KopisSyncJob(status='queued', options=json.dumps(options), requested_by=requested_by,
+                       heartbeat_at=datetime.now())
+    db.session.add(job)
+    db.session.commit()
+    kopis_sync_runner.submit(run_kopis_sync_job, job.id)
+    return job, True
+
+def run_kopis_sync_job(job_id):
+    """동기화 작업 하나 실행 (백그라운드 스레드에서 호출)"""
+    with app.app_context():
+        job = KopisSyncJob.query.get(job_id)
+        if job is None or job.status != 'queued':
+            return
+        
+        # 다른 워커/호스트의 작업이나 sync_kopis.py가 실행 중이면 기다리지 않고 실패 처리
+        # 배치가 한동안 커밋되지 않아도 (빈 증분 분할 등) 잠금 하트비트가 작업의 진행 보고 시각을 늦춰
+        # expire_stale_kopis_sync_jobs가 실행 중인 작업을 실패로 정리하지 않게 한다
+        def touch_job(connection):
+            table = KopisSyncJob.__table__
+            connection.execute(
+                table.update()
+                .where(table.c.id == job_id, table.c.status.in_(('queued', 'running')))
+                .values(heartbeat_at=datetime.now())
+            )
+        
+        lock = LeaseLock('kopis_sync', description=f'KOPIS 동기화 작업 #{job_id}', on_renew=touch_job)
+        if not lock.acquire():
+            job.status = 'failed'
+            job.error = str(JobLockBusy('kopis_sync', get_job_lock_holder('kopis_sync')))
+            job.finished_at = datetime.now()
+            db.session.commit()
+            logger.warning(f"KOPIS 동기화 작업 {job_id} 건너뜀: {job.error}")
+            return
+        try:
+            _run_locked_kopis_sync_job(job, lock)
+        finally:
+            lock.release()
+
+def _run_locked_kopis_sync_job(job, lock):
+    """잠금을 얻은 동기화 작업 실행"""
+    from kopis_api_integration import KOPISDataImporter
+    
+    job_id = job.id
+    job.status = 'running'
+    job.started_at = job.heartbeat_at = datetime.now()
+    db.session.commit()
+    options = json.loads(job.options or '{}')
+    
+    importer = KOPISDataImporter(db.session)
+    api_key = importer.kopis_client.api_key
+    
+    def redact(message):
+        # 요청 URL이 포함된 오류 메시지에서 API 키 제거
+        return message.replace(api_key, '***') if api_key else message
+    
+    def report(stats):
+        KopisSyncJob.query.filter_by(id=job_id).update({
+            'received': stats['received'],
+            'inserted': stats['inserted'],
+            'updated': stats['updated'],
+            'failed_batches': stats['failed_batches'],
+            'failed_partitions': stats.get('failed_partitions', 0),
+            'heartbeat_at': datetime.now()
+        }, synchronize_session=False)
+        db.session.commit()
+        # 잠금이 만료되어 다른 프로세스가 가져갔으면 중단 (임포트 오류로 기록됨)
+        if not lock.renew():
+            raise JobLockBusy('kopis_sync', get_job_lock_holder('kopis_sync'))
+    
+    try:
+        importer.import_performances(
+            start_date=options.get('start_date'),
+            end_date=options.get('end_date'),
+            fetch_details=False,  # 성능 향상을 위해 상세 정보 조회 비활성화
+            batch_size=50,
+            full_sync=options.get('full_sync', False),
+            max_workers=KOPIS_SYNC_WORKERS,
+            incremental=options.get('incremental', False),
+            progress=report
+        )
+        stats = importer.last_import_stats
+        report(stats)
+        if stats['errors']:
+            status, error = 'failed', redact('\n'.join(stats['errors'][-10:]))
+        elif stats.get('failed_partitions'):
+            # 받은 공연은 반영됐지만 일부 분할(시간 초과, 호출 예산 등)을 받지 못함
+            status = 'partial'
+            error = f"KOPIS 분할 {stats['failed_partitions']}개 조회 실패 (증분 동기화는 다음 실행에서 다시 조회)"
+        else:
+            status, error = 'succeeded', None
+    except Exception as e:
+        db.session.rollback()
+        stats = importer.last_import_stats
+        status, error = 'failed', redact(str(e))
+    
+    KopisSyncJob.query.filter_by(id=job_id).update({
+        'status': status,
+        'error': error,
+        'finished_at': datetime.now()
+    }, synchronize_session=False)
+    db.session.commit()
+    
+    if stats['inserted'] or stats['updated']:
+        invalidate_home_cache('kopis_sync')
+    logger.info(f"KOPIS 동기화 작업 {job_id} {status}: 추가 {stats['inserted']}개, 갱신 {stats['updated']}개")
+
+def parse_kopis_sync_date(value):
+    """폼의 날짜(YYYY-MM-DD 또는 YYYYMMDD)를 KOPIS 형식(YYYYMMDD)으로 - 비어 있으면 None"""
+    if not value:
+        return None
+    return datetime.strptime(value.replace('-', ''), '%Y%m%d').strftime('%Y%m%d')
+
 @app.route('/kopis-sync', methods=['GET', 'POST'])
 @login_required
 def kopis_sync():
-    """KOPIS 데이터 동기화"""
+    """KOPIS 데이터 동기화 (GET: 작업 현황 페이지, POST: 백그라운드 작업 등록)"""
     if not current_user.is_admin:
         flash('관리자 권한이 필요합니다.', 'error')
         return redirect(url_for('home'))
     
+    wants_json = request.accept_mimetypes.best == 'application/json'
+    
     try:
-        from kopis_api_integration import KOPISDataImporter
-        from datetime import datetime
+        if request.method == 'GET':
+            expire_stale_kopis_sync_jobs()
+            jobs = KopisSyncJob.query.order_by(KopisSyncJob.id.desc()).limit(10).all()
+            active_job = next((job for job in jobs if job.is_active), None)
+            watch_id = request.args.get('job_id', type=int) or (active_job.id if active_job else None)
+            job_locks = JobLock.query.order_by(JobLock.name).all()
+            usage_rows, usage = get_kopis_usage_today()
+            return render_template('kopis_sync.html', jobs=jobs, watch_job_id=watch_id, job_locks=job_locks,
+                                   usage_rows=usage_rows, usage=usage)
         
-        # 성능 최적화된 동기화 (상세 정보 조회 비활성화)
-        importer = KOPISDataImporter(db.session)
-        imported_count = importer.import_performances(
-            fetch_details=False,  # 성능 향상을 위해 상세 정보 조회 비활성화
-            batch_size=50         # 배치 크기 설정
-        )
+        try:
+            options = {
+                'start_date': parse_kopis_sync_date(request.form.get('start_date')),
+                'end_date': parse_kopis_sync_date(request.form.get('end_date')),
+                # 전체 동기화: 기간/지역/장르로 분할해 모든 페이지를 동시에 조회
+                'full_sync': request.form.get('full_sync') == 'on',
+                # 증분 동기화: 구간별 처리 위치 이후 등록/수정된 공연만 조회
+                'incremental': request.form.get('incremental') == 'on'
+            }
+        except ValueError:
+            if wants_json:
+                return jsonify({'success': False, 'error': '날짜 형식이 올바르지 않습니다.'}), 400
+            flash('날짜 형식이 올바르지 않습니다.', 'error')
+            return redirect(url_for('kopis_sync'))
         
-        if imported_count > 0:
-            flash(f'KOPIS 데이터 {imported_count}개가 성공적으로 동기화되었습니다. (성능 최적화 모드)', 'success')
-            logger.info(f'KOPIS 동기화 완료: {imported_count}개 공연 추가')
+        try:
+            job, created = enqueue_kopis_sync_job(options, requested_by=current_user.id)
+        except JobLockBusy as e:
+            if wants_json:
+                return jsonify({'success': False, 'error': str(e)}), 409
+            flash(str(e), 'info')
+            return redirect(url_for('kopis_sync'))
+        if created:
+            logger.info(f"KOPIS 동기화 작업 {job.id} 등록: {options}")
+        
+        if wants_json:
+            return jsonify({
+                'success': True,
+                'created': created,
+                'job': job.to_dict(),
+                'status_url': url_for('kopis_sync_status', job_id=job.id)
+            }), 202
+        
+        if created:
+            flash('KOPIS 동기화 작업이 시작되었습니다. 이 페이지에서 진행 상황을 확인할 수 있습니다.', 'success')
         else:
-            flash('동기화할 새로운 KOPIS 데이터가 없습니다. (이미 모든 데이터가 동기화되어 있습니다)', 'info')
-            logger.info('KOPIS 동기화: 새로운 데이터 없음')
-        
-        # 동기화 후 홈페이지로 리다이렉션 (캐시 무효화)
-        response = redirect(url_for('home'))
-        response.headers['Cache-Control'] = 'no-cache, no-store, must-revalidate'
-        response.headers['Pragma'] = 'no-cache'
-        response.headers['Expires'] = '0'
-        return response
+            flash('이미 진행 중인 KOPIS 동기화 작업이 있습니다.', 'info')
+        return redirect(url_for('kopis_sync', job_id=job.id))
         
-    except ImportError as e:
-        logger.error(f"KOPIS module import error: {e}")
-        flash('KOPIS 모듈을 불러올 수 없습니다.', 'error')
-        return redirect(url_for('admin_panel'))
     except Exception as e:
         logger.error(f"KOPIS sync error: {e}")
-        flash('KOPIS 동기화 중 오류가 발생했습니다.', 'error')
+        if wants_json:
+            return jsonify({'success': False, 'error': 'KOPIS 동기화 작업을 시작하지 못했습니다.'}), 500
+        flash('KOPIS 동기화 작업을 시작하지 못했습니다.', 'error')
         return redirect(url_for('admin_panel'))
 
+@app.route('/kopis-sync/jobs/<int:job_id>')
+@login_required
+def kopis_sync_status(job_id):
+    """동기화 작업 진행 상황 (kopis_sync.html에서 주기적으로 조회)"""
+    if not current_user.is_admin:
+        return jsonify({'success': False, 'error': '관리자 권한이 필요합니다.'}), 403
+    
+    expire_stale_kopis_sync_jobs()
+    job = KopisSyncJob.query.get(job_id)
+    if job is None:
+        return jsonify({'success': False, 'error': '작업을 찾을 수 없습니다.'}), 404
+    
+    lock = db.session.get(JobLock, 'kopis_sync')
+    response = jsonify({'success': True, 'job': job.to_dict(), 'lock': lock.to_dict() if lock else None})
+    response.headers['Cache-Control'] = 'no-store'
+    return response
+
 # KOPIS URL 생성 함수 추가
 def generate_kopis_url(kopis_id):
     """KOPIS 공연 페이지 URL 생성"""
@@ -2574,6 +3508,11 @@ class UserEvent(db.Model):
     
     user = db.relationship('User', backref='events')
     performance = db.relationship('Performance', backref='events')
+    
+    # 기간별 이벤트 집계용 인덱스
+    __table_args__ = (
+        db.Index('ix_user_event_timestamp_event_type', 'timestamp', 'event_type'),
+    )
 
 class PerformanceStats(db.Model):
     """공연별 상세 통계"""
@@ -2588,17 +3527,31 @@ class PerformanceStats(db.Model):
     created_at = db.Column(db.DateTime, default=func.now())
     
     performance = db.relationship('Performance', backref='stats')
+    
+    # 공연별 일자별 한 행 (롤업 upsert 키)
+    __table_args__ = (
+        db.Index('ux_performance_stats_performance_date', 'performance_id', 'date', unique=True),
+    )
 
 class CategoryTrend(db.Model):
-    """카테고리별 트렌드 분석"""
+    """카테고리별 트렌드 분석 (일/주/월 단위 집계 큐브)"""
     id = db.Column(db.Integer, primary_key=True)
     category = db.Column(db.String(50), nullable=False)
-    date = db.Column(db.Date, nullable=False)
+    date = db.Column(db.Date, nullable=False)  # 구간 시작일 (주: 월요일, 월: 1일)
+    granularity = db.Column(db.String(10), default='day')  # 'day', 'week', 'month'
     total_performances = db.Column(db.Integer, default=0)
     total_views = db.Column(db.Integer, default=0)
     total_likes = db.Column(db.Integer, default=0)
+    total_comments = db.Column(db.Integer, default=0)
+    rating_sum = db.Column(db.Integer, default=0)  # 상위 구간 평균 계산용
+    rating_count = db.Column(db.Integer, default=0)
     avg_rating = db.Column(db.Float, default=0.0)
     created_at = db.Column(db.DateTime, default=func.now())
+    
+    __table_args__ = (
+        db.Index('ux_category_trend_category_granularity_date', 'category', 'granularity', 'date', unique=True),
+        db.Index('ix_category_trend_granularity_date', 'granularity', 'date'),
+    )
 
 class TrendData(db.Model):
     """트렌드 분석 데이터"""
@@ -2611,6 +3564,10 @@ class TrendData(db.Model):
     conversions = db.Column(db.Integer, default=0)
     revenue = db.Column(db.Float, default=0.0)
     created_at = db.Column(db.DateTime, default=func.now())
+    
+    __table_args__ = (
+        db.Index('ix_trend_data_category_date', 'category', 'date'),
+    )
 
 class UserProfile(db.Model):
     """사용자 프로필 확장"""
@@ -2624,6 +3581,340 @@ class UserProfile(db.Model):
     
     user = db.relationship('User', backref='profile', uselist=False)
 
+class RollupWatermark(db.Model):
+    """집계 작업별 원본 테이블 처리 위치 (마지막으로 반영한 시각 구간의 끝)"""
+    id = db.Column(db.Integer, primary_key=True)
+    job_name = db.Column(db.String(50), nullable=False)
+    source_table = db.Column(db.String(50), nullable=False)
+    last_id = db.Column(db.Integer, nullable=False, default=0)  # 반영한 가장 큰 id (last_time 도입 전 기준)
+    last_time = db.Column(db.DateTime)  # 이 시각(DB 시계) 이전 행까지 반영
+    updated_at = db.Column(db.DateTime, default=func.now(), onupdate=func.now())
+    
+    __table_args__ = (
+        db.UniqueConstraint('job_name', 'source_table', name='unique_rollup_watermark'),
+    )
+
+class KopisSyncState(db.Model):
+    """KOPIS 증분 동기화 분할(월 구간 × 지역 × 장르)별 처리 위치"""
+    id = db.Column(db.Integer, primary_key=True)
+    partition_key = db.Column(db.String(100), nullable=False, unique=True)  # 예: '20260101-20260131|서울|연극'
+    window_start = db.Column(db.Date, nullable=False)
+    window_end = db.Column(db.Date, nullable=False)
+    area = db.Column(db.String(20))  # NULL이면 전체 지역
+    genre = db.Column(db.String(50))  # NULL이면 전체 장르
+    last_synced_at = db.Column(db.DateTime)  # 마지막 성공 조회 시작 시각 (다음 afterdate 기준)
+    last_seen_count = db.Column(db.Integer, default=0)  # 마지막 조회에서 받은 공연 수
+    last_seen_max_id = db.Column(db.String(50))  # 마지막 조회에서 받은 가장 큰 kopis_id
+    updated_at = db.Column(db.DateTime, default=func.now(), onupdate=func.now())
+
+class KopisSyncJob(db.Model):
+    """관리자가 요청한 KOPIS 동기화 작업 (백그라운드 실행 상태/진행 현황)"""
+    id = db.Column(db.Integer, primary_key=True)
+    status = db.Column(db.String(20), nullable=False, default='queued', index=True)  # queued, running, succeeded, partial, failed
+    options = db.Column(db.Text)  # JSON: start_date, end_date, full_sync, incremental
+    requested_by = db.Column(db.Integer, db.ForeignKey('user.id'))
+    received = db.Column(db.Integer, default=0)  # KOPIS에서 받은 공연 수 (중복 제외)
+    inserted = db.Column(db.Integer, default=0)
+    updated = db.Column(db.Integer, default=0)
+    failed_batches = db.Column(db.Integer, default=0)
+    failed_partitions = db.Column(db.Integer, default=0)  # 조회에 실패한 KOPIS 분할 수 (있으면 partial)
+    error = db.Column(db.Text)
+    created_at = db.Column(db.DateTime, default=datetime.now)
+    started_at = db.Column(db.DateTime)
+    finished_at = db.Column(db.DateTime)
+    heartbeat_at = db.Column(db.DateTime)  # 마지막 진행 보고 시각 (중단된 작업 판별용)
+    
+    @property
+    def is_active(self):
+        return self.status in ('queued', 'running')
+    
+    def to_dict(self):
+        end = self.finished_at or datetime.now()
+        return {
+            'id': self.id,
+            'status': self.status,
+            'options': json.loads(self.options) if self.options else {},
+            'received': self.received or 0,
+            'inserted': self.inserted or 0,
+            'updated': self.updated or 0,
+            'failed_batches': self.failed_batches or 0,
+            'failed_partitions': self.failed_partitions or 0,
+            'error': self.error,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None,
+            'duration_seconds': round((end - self.started_at).total_seconds(), 1) if self.started_at else None,
+        }
+
+class JobLock(db.Model):
+    """장시간 작업(KOPIS 동기화, 통계 롤업) 실행 잠금 - 보유자 정보는 관리자 화면에 표시"""
+    name = db.Column(db.String(50), primary_key=True)  # 예: 'kopis_sync', 'stats_rollup'
+    token = db.Column(db.String(36))  # 현재 보유자 토큰 (NULL이면 해제됨)
+    holder = db.Column(db.String(200))  # 호스트명:PID
+    description = db.Column(db.String(200))  # 예: 'KOPIS 동기화 작업 #12'
+    acquired_at = db.Column(db.DateTime)
+    heartbeat_at = db.Column(db.DateTime)  # 마지막 갱신 시각
+    expires_at = db.Column(db.DateTime)  # 이때까지 갱신하지 않으면 만료 (보유 프로세스가 죽은 경우)
+    
+    @property
+    def is_held(self):
+        return bool(self.token) and self.expires_at is not None and self.expires_at > datetime.now()
+    
+    def to_dict(self):
+        return {
+            'name': self.name,
+            'held': self.is_held,
+            'holder': self.holder,
+            'description': self.description,
+            'acquired_at': self.acquired_at.isoformat() if self.acquired_at else None,
+            'heartbeat_at': self.heartbeat_at.isoformat() if self.heartbeat_at else None,
+            'expires_at': self.expires_at.isoformat() if self.expires_at else None,
+        }
+
+# 작업 잠금 만료 시간(초) - 보유자가 이 시간 동안 갱신하지 않으면 다른 프로세스가 가져갈 수 있음
+JOB_LOCK_TTL_SECONDS = int(os.environ.get('JOB_LOCK_TTL_SECONDS', 600))
+
+class JobLockBusy(Exception):
+    """다른 프로세스가 작업 잠금을 보유 중"""
+    
+    def __init__(self, name, holder=None):
+        self.name = name
+        self.holder = holder
+        super().__init__(f"'{name}' 작업이 이미 실행 중입니다" + (f" ({holder})" if holder else ''))
+
+class LeaseLock:
+    """DB 기반 작업 잠금 (여러 gunicorn 워커/호스트/스크립트 사이에서 한 번에 하나만 실행)
+    
+    PostgreSQL은 전용 연결의 세션 advisory lock으로 배타성을 보장하고 (연결이 끊기면 자동 해제),
+    그 외 DB는 JobLock 행을 만료 시각 조건으로 갱신해 차지한다. 두 경우 모두 JobLock 행에 보유자 정보를
+    기록한다. 잠금을 쥐고 있는 동안 하트비트 스레드가 ttl의 1/3마다 만료 시각을 늦추므로
+    배치 사이가 길어도 만료되지 않는다. 작업 중간에 renew()를 호출하면 잠금을 잃었는지 확인할 수 있다.
+    on_renew(connection)를 주면 갱신에 성공할 때마다 같은 트랜잭션에서 호출한다 (작업 행의 생존 표시 등).
+    잠금을 얻지 못하면 기다리지 않는다.
+    
+        with LeaseLock('kopis_sync', description='KOPIS 동기화') as lock:
+            ...
+            if not lock.renew():
+                raise JobLockBusy('kopis_sync')
+    """
+    
+    def __init__(self, name, description=None, ttl_seconds=JOB_LOCK_TTL_SECONDS, on_renew=None):
+        self.name = name
+        self.description = description
+        self.ttl_seconds = ttl_seconds
+        self.on_renew = on_renew
+        self.holder = f"{socket.gethostname()}:{os.getpid()}"
+        self.token = None
+        self.lost = False
+        self._connection = None
+        self._engine = None
+        self._heartbeat = None
+        self._stop_heartbeat = threading.Event()
+    
+    def acquire(self):
+        """잠금 획득 시도 - 성공 여부"""
+        token = str(uuid.uuid4())
+        now = datetime.now()
+        values = {
+            'token': token,
+            'holder': self.holder,
+            'description': self.description,
+            'acquired_at': now,
+            'heartbeat_at': now,
+            'expires_at': now + timedelta(seconds=self.ttl_seconds),
+        }
+        
+        # 하트비트 스레드는 앱 컨텍스트 밖에서 돌므로 엔진을 잡아 둔다
+        self._engine = db.engine
+        if self._engine.dialect.name == 'postgresql':
+            connection = self._engine.connect()
+            key = zlib.crc32(self.name.encode('utf-8'))
+            if not connection.execute(text('SELECT pg_try_advisory_lock(:key)'), {'key': key}).scalar():
+                connection.close()
+                return False
+            self._connection = connection
+            # advisory lock을 얻었으면 이전 보유자 행은 (만료 전이라도) 죽은 프로세스의 것
+            claimed = self._claim_row(values, force=True)
+        else:
+            claimed = self._claim_row(values, force=False)
+        
+        if not claimed:
+            self._close_connection()
+            return False
+        self.token = token
+        self.lost = False
+        self._start_heartbeat()
+        return True
+    
+    def _start_heartbeat(self):
+        self._stop_heartbeat.clear()
+        self._heartbeat = threading.Thread(target=self._heartbeat_loop, daemon=True,
+                                           name=f'lease-heartbeat-{self.name}')
+        self._heartbeat.start()
+    
+    def _heartbeat_loop(self):
+        interval = max(1, self.ttl_seconds / 3)
+        while not self._stop_heartbeat.wait(interval):
+            try:
+                if not self.renew():
+                    logger.warning(f"작업 잠금 {self.name} 만료됨 - 다른 프로세스가 가져감")
+                    return
+            except Exception as e:
+                # 일시적인 DB 오류는 다음 주기에 다시 시도 (만료 전까지)
+                logger.warning(f"작업 잠금 {self.name} 갱신 실패: {e}")
+    
+    def _stop_heartbeat_thread(self):
+        if self._heartbeat is not None:
+            self._stop_heartbeat.set()
+            if self._heartbeat is not threading.current_thread():
+                self._heartbeat.join()
+            self._heartbeat = None
+    
+    def _claim_row(self, values, force):
+        table = JobLock.__table__
+        condition = table.c.name == self.name
+        if not force:
+            condition = db.and_(condition, db.or_(table.c.token.is_(None), table.c.expires_at < values['heartbeat_at']))
+        with self._engine.begin() as connection:
+            if connection.execute(table.update().where(condition).values(**values)).rowcount:
+                return True
+        try:
+            with self._engine.begin() as connection:
+                connection.execute(table.insert().values(name=self.name, **values))
+            return True
+        except IntegrityError:
+            # 다른 보유자가 있거나 동시에 먼저 만든 경우
+            return False
+    
+    def renew(self):
+        """만료 시각 연장 - 잠금을 잃었으면 False (만료 후 다른 프로세스가 가져간 경우)"""
+        token = self.token
+        if token is None or self.lost:
+            return False
+        table = JobLock.__table__
+        now = datetime.now()
+        with self._engine.begin() as connection:
+            renewed = connection.execute(
+                table.update()
+                .where(table.c.name == self.name, table.c.token == token)
+                .values(heartbeat_at=now, expires_at=now + timedelta(seconds=self.ttl_seconds))
+            ).rowcount
+            if renewed and self.on_renew is not None:
+                self.on_renew(connection)
+        if not renewed:
+            self.lost = True
+        return bool(renewed)
+    
+    def release(self):
+        """잠금 해제 (보유자 정보는 마지막 실행 기록으로 남김)"""
+        if self.token is None:
+            return
+        self._stop_heartbeat_thread()
+        table = JobLock.__table__
+        try:
+            with self._engine.begin() as connection:
+                connection.execute(
+                    table.update()
+                    .where(table.c.name == self.name, table.c.token == self.token)
+                    .values(token=None, heartbeat_at=datetime.now(), expires_at=None)
+                )
+        finally:
+            self.token = None
+            self._close_connection()
+    
+    def _close_connection(self):
+        if self._connection is not None:
+            try:
+                self._connection.execute(text('SELECT pg_advisory_unlock(:key)'),
+                                         {'key': zlib.crc32(self.name.encode('utf-8'))})
+            finally:
+                self._connection.close()
+                self._connection = None
+    
+    def __enter__(self):
+        if not self.acquire():
+            raise JobLockBusy(self.name, get_job_lock_holder(self.name))
+        return self
+    
+    def __exit__(self, exc_type, exc_value, tb):
+        self.release()
+        return False
+
+def get_job_lock_holder(name):
+    """잠금 보유자 설명 ('설명 - 호스트:PID') - 보유자가 없으면 None"""
+    lock = db.session.get(JobLock, name)
+    if lock is None or not lock.is_held:
+        return None
+    return f"{lock.description or name} - {lock.holder}"
+
+class KopisApiUsage(db.Model):
+    """KOPIS API 일별·엔드포인트별 호출 수 (이 DB를 쓰는 모든 프로세스 합계, 캐시 적중 제외)"""
+    id = db.Column(db.Integer, primary_key=True)
+    day = db.Column(db.Date, nullable=False)
+    endpoint = db.Column(db.String(50), nullable=False)  # 예: 'pblprfr', 'pblprfr/:id'
+    calls = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.now)
+    
+    __table_args__ = (
+        db.UniqueConstraint('day', 'endpoint', name='unique_kopis_api_usage'),
+    )
+
+class KopisUsageStore:
+    """KOPISQuota 저장소 (KopisApiUsage 일별 누적)
+    
+    전송 계층의 조회 스레드에서도 호출되므로 자체 앱 컨텍스트와 별도 연결/트랜잭션을 쓴다.
+    """
+    
+    def load(self, day):
+        """그날 저장된 총 호출 수"""
+        with app.app_context():
+            table = KopisApiUsage.__table__
+            with db.engine.connect() as connection:
+                total = connection.execute(
+                    db.select(func.coalesce(func.sum(table.c.calls), 0)).where(table.c.day == day)
+                ).scalar()
+        return int(total or 0)
+    
+    def add(self, day, counts):
+        """엔드포인트별 호출 수 더하기 (행이 없으면 추가)"""
+        with app.app_context():
+            table = KopisApiUsage.__table__
+            now = datetime.now()
+            with db.engine.begin() as connection:
+                for endpoint, calls in counts.items():
+                    updated = connection.execute(
+                        table.update()
+                        .where(table.c.day == day, table.c.endpoint == endpoint)
+                        .values(calls=table.c.calls + calls, updated_at=now)
+                    ).rowcount
+                    if not updated:
+                        connection.execute(table.insert().values(day=day, endpoint=endpoint, calls=calls, updated_at=now))
+
+def get_kopis_usage_today():
+    """오늘 KOPIS 호출 현황 - (엔드포인트별 호출 수 목록, 예산 요약)"""
+    kopis_transport.quota.refresh()
+    rows = KopisApiUsage.query.filter_by(day=datetime.now().date()) \
+        .order_by(KopisApiUsage.calls.desc()).all()
+    return rows, kopis_transport.quota.get_usage()
+
+# 호출 수를 DB에 누적해 프로세스/재시작과 무관하게 일별 예산 적용
+# (저장소는 첫 KOPIS 호출 때 연결하고 종료 시 남은 집계 저장 - import만 해서는 DB를 건드리지 않음)
+kopis_transport.quota.store_factory = KopisUsageStore
+
+# 스키마 차이 점검은 웹 프로세스의 첫 요청에서 한 번만 (스크립트가 main을 import할 때는 DB를 검사하지 않음)
+_schema_drift_checked = False
+_schema_drift_lock = threading.Lock()
+
+@app.before_request
+def check_schema_drift_once():
+    global _schema_drift_checked
+    if _schema_drift_checked:
+        return
+    with _schema_drift_lock:
+        if not _schema_drift_checked:
+            _schema_drift_checked = True
+            report_schema_drift()
+
 # 템플릿 헬퍼 함수들
 def format_date(date_obj):
     """안전한 날짜 포맷팅"""
@@ -2647,18 +3938,123 @@ def format_datetime(datetime_obj):
 app.jinja_env.globals.update(format_date=format_date, format_datetime=format_datetime)
 
 # 데이터 분석 유틸리티 함수들
+class UserEventBuffer:
+    """사용자 이벤트 쓰기 지연(write-behind) 버퍼
+    
+    요청 처리 중에는 큐에 넣기만 하고, 백그라운드 스레드가 개수/시간 기준으로
+    여러 행을 한 번의 INSERT로 저장한다. 프로세스 종료 시 남은 이벤트를 모두 저장한다.
+    timestamp는 넣은 시각(앱 시계)을 저장 시 DB 시계(컬럼 기본값 func.now())로 옮겨 기록하므로
+    저장이 늦어져도 이벤트 시각이 밀리지 않는다.
+    """
+    
+    def __init__(self, max_queue_size=10000, batch_size=200, flush_interval=2.0):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue = queue.Queue(maxsize=max_queue_size)
+        self._flush_lock = threading.Lock()
+        self._start_lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread = None
+        self._pid = None
+        self._stats_lock = threading.Lock()
+        self.stats = {'enqueued': 0, 'flushed': 0, 'dropped': 0, 'failed': 0, 'batches': 0}
+    
+    def _count(self, **increments):
+        # 요청 스레드와 저장 스레드가 함께 갱신
+        with self._stats_lock:
+            for key, value in increments.items():
+                self.stats[key] += value
+    
+    def enqueue(self, row):
+        """이벤트 한 건 추가 (블로킹 없음, 큐가 가득 차면 버림)"""
+        self._ensure_worker()
+        try:
+            self._queue.put_nowait(dict(row, timestamp=datetime.now()))
+            self._count(enqueued=1)
+            return True
+        except queue.Full:
+            self._count(dropped=1)
+            return False
+    
+    def flush(self):
+        """큐에 쌓인 이벤트를 배치 단위로 모두 저장 - 저장한 건수 반환"""
+        flushed = 0
+        with self._flush_lock:
+            while True:
+                rows = []
+                while len(rows) < self.batch_size:
+                    try:
+                        rows.append(self._queue.get_nowait())
+                    except queue.Empty:
+                        break
+                if not rows:
+                    break
+                try:
+                    with app.app_context():
+                        with db.engine.begin() as connection:
+                            # 앱 시계로 찍은 시각을 DB 시계로 옮김 (SQLite func.now()는 UTC)
+                            offset = to_naive_db_time(connection.execute(db.select(func.now())).scalar()) \
+                                - datetime.now()
+                            connection.execute(UserEvent.__table__.insert(),
+                                               [dict(row, timestamp=row['timestamp'] + offset) for row in rows])
+                    flushed += len(rows)
+                    self._count(flushed=len(rows), batches=1)
+                except Exception as e:
+                    self._count(failed=len(rows))
+                    logger.error(f"이벤트 배치 저장 실패 ({len(rows)}건): {e}")
+        return flushed
+    
+    def get_stats(self):
+        """버퍼 카운터 (모니터링용)"""
+        with self._stats_lock:
+            return dict(self.stats, pending=self._queue.qsize())
+    
+    def shutdown(self):
+        """백그라운드 스레드 정지 후 남은 이벤트 저장"""
+        self._stop_event.set()
+        if self._thread is not None and self._thread.is_alive():
+            self._thread.join(timeout=self.flush_interval + 5)
+        self.flush()
+    
+    def _ensure_worker(self):
+        # gunicorn fork 이후에는 부모 프로세스의 스레드가 없으므로 프로세스별로 시작
+        if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+            return
+        with self._start_lock:
+            if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+                return
+            self._pid = os.getpid()
+            self._stop_event.clear()
+            self._thread = threading.Thread(target=self._run, name='user-event-flusher', daemon=True)
+            self._thread.start()
+    
+    def _run(self):
+        last_flush = time.monotonic()
+        while not self._stop_event.wait(0.2):
+            if self._queue.qsize() >= self.batch_size or time.monotonic() - last_flush >= self.flush_interval:
+                self.flush()
+                last_flush = time.monotonic()
+
+user_event_buffer = UserEventBuffer(
+    max_queue_size=int(os.getenv('EVENT_BUFFER_MAX_SIZE', 10000)),
+    batch_size=int(os.getenv('EVENT_BUFFER_BATCH_SIZE', 200)),
+    flush_interval=float(os.getenv('EVENT_BUFFER_FLUSH_INTERVAL', 2.0))
+)
+atexit.register(user_event_buffer.shutdown)
+
 def track_user_event(user_id, event_type, performance_id=None, metadata=None):
-    """사용자 이벤트 추적"""
+    """사용자 이벤트 추적 (버퍼에 추가 후 백그라운드에서 일괄 저장)
+    
+    timestamp는 버퍼가 넣은 시각을 DB 시계로 옮겨 채운다.
+    UserLike/Comment.created_at과 같은 DB 시계를 써야 일별 집계 구간이 맞는다.
+    """
     try:
-        event = UserEvent(
-            user_id=user_id,
-            event_type=event_type,
-            performance_id=performance_id,
-            event_data=json.dumps(metadata) if metadata else None
-        )
-        db.session.add(event)
-        db.session.commit()
-        return True
+        return user_event_buffer.enqueue({
+            'user_id': user_id,
+            'event_type': event_type,
+            'performance_id': performance_id,
+            'event_data': json.dumps(metadata) if metadata else None
+        })
     except Exception as e:
         logger.error(f"이벤트 추적 실패: {e}")
         return False
@@ -2774,12 +4170,17 @@ def get_trend_prediction():
         return {}
 
 def get_performance_statistics():
-    """공연별 상세 통계 조회"""
+    """공연별 상세 통계 조회 (PerformanceStats 일별 집계 행 기준)"""
     try:
         # 최근 30일간의 통계
         end_date = datetime.now().date()
         start_date = end_date - timedelta(days=30)
         
+        # 평점은 댓글 조인으로 집계 행이 중복되지 않도록 상관 서브쿼리로 계산
+        avg_rating = db.session.query(func.avg(Comment.rating))\
+            .filter(Comment.performance_id == Performance.id)\
+            .correlate(Performance).scalar_subquery()
+        
         stats = db.session.query(
             Performance.id,
             Performance.title,
@@ -2788,9 +4189,8 @@ def get_performance_statistics():
             func.sum(PerformanceStats.likes).label('total_likes'),
             func.sum(PerformanceStats.comments).label('total_comments'),
             func.sum(PerformanceStats.ticket_clicks).label('total_ticket_clicks'),
-            func.avg(Comment.rating).label('avg_rating')
-        ).outerjoin(PerformanceStats, Performance.id == PerformanceStats.performance_id)\
-         .outerjoin(Comment, Performance.id == Comment.performance_id)\
+            avg_rating.label('avg_rating')
+        ).join(PerformanceStats, Performance.id == PerformanceStats.performance_id)\
          .filter(PerformanceStats.date >= start_date)\
          .group_by(Performance.id, Performance.title, Performance.category)\
          .order_by(func.sum(PerformanceStats.views).desc())\
@@ -2811,35 +4211,367 @@ def get_performance_statistics():
         app.logger.error(f"공연 통계 조회 오류: {e}")
         return []
 
+# 이벤트 유형별 PerformanceStats 컬럼
+STATS_EVENT_COLUMNS = {
+    'view': 'views',
+    'share': 'shares',
+    'ticket_click': 'ticket_clicks'
+}
+
+# PerformanceStats에 누적하는 컬럼 (댓글 평점 합계/건수는 카테고리 트렌드 전용)
+STATS_COLUMNS = ('views', 'likes', 'comments', 'shares', 'ticket_clicks')
+
+def get_rollup_watermark(job_name, source_table):
+    """집계 작업의 원본 테이블 처리 위치 조회 (없으면 생성)"""
+    watermark = RollupWatermark.query.filter_by(job_name=job_name, source_table=source_table).first()
+    if watermark is None:
+        watermark = RollupWatermark(job_name=job_name, source_table=source_table, last_id=0)
+        db.session.add(watermark)
+    return watermark
+
+def to_naive_db_time(value):
+    """func.now() 조회 결과를 DateTime 컬럼에 저장되는 형태(시간대 없음)로 변환"""
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    if getattr(value, 'tzinfo', None) is not None:
+        value = value.replace(tzinfo=None)
+    return value
+
+def get_db_now():
+    """DB 시계 기준 현재 시각 (컬럼 기본값 func.now()와 같은 시계, SQLite는 UTC)"""
+    return to_naive_db_time(db.session.query(func.now()).scalar())
+
+def get_watermark_window(watermark, model, time_column, settle_before):
+    """워터마크 이후 ~ settle_before 이전 행 조건 (처리할 구간이 없으면 None)
+    
+    PostgreSQL 시퀀스 id는 커밋 순서와 달라 늦게 커밋된 작은 id를 건너뛸 수 있으므로
+    DB 시계 기준 시각 구간 [last_time, settle_before)로 자른다.
+    last_time이 없는 기존 워터마크는 첫 실행만 last_id 이후로 자른다.
+    
+    PostgreSQL의 now()(컬럼 기본값)는 트랜잭션 시작 시각이라, 커밋이 늦은 행은 이미 처리한
+    구간의 시각을 가질 수 있다. 이를 막는 것은 settle 지연뿐이므로 settle_seconds는 가장 긴
+    쓰기 트랜잭션(및 이벤트 버퍼 저장 지연 EVENT_BUFFER_FLUSH_INTERVAL)보다 길어야 한다.
+    """
+    if watermark.last_time is None:
+        return (model.id > (watermark.last_id or 0), time_column < settle_before)
+    if watermark.last_time >= settle_before:
+        return None
+    return (time_column >= watermark.last_time, time_column < settle_before)
+
+def advance_watermarks(advances):
+    """collect_new_activity가 반환한 구간 끝으로 워터마크 이동"""
+    for watermark, max_id, settle_before in advances:
+        if max_id:
+            watermark.last_id = max(watermark.last_id or 0, max_id)
+        watermark.last_time = settle_before
+
+def like_was_rolled_up(like_watermark, like_id, liked_at):
+    """취소된 좋아요가 해당 작업에서 이미 집계됐는지 여부"""
+    if like_watermark.last_time is not None:
+        return liked_at is not None and liked_at < like_watermark.last_time
+    return like_id is not None and like_id <= (like_watermark.last_id or 0)
+
+def collect_new_activity(job_name, settle_seconds=60):
+    """워터마크 이후 새로 쌓인 조회/좋아요/댓글(평점 합계/건수 포함)을 (공연 id, 일자)별로 집계
+    
+    반환값은 ({(performance_id, date): {컬럼: 건수}}, [(워터마크, 구간 내 최대 id, 구간 끝 시각)]).
+    아직 커밋 중일 수 있는 최근 행은 settle_seconds 동안 다음 실행으로 미룬다.
+    좋아요 취소('unlike' 이벤트)는 이미 집계된 좋아요만 원래 일자에서 차감한다.
+    """
+    settle_before = get_db_now() - timedelta(seconds=settle_seconds)
+    deltas = defaultdict(lambda: defaultdict(int))
+    advances = []
+    
+    sources = [
+        ('user_event', UserEvent, UserEvent.timestamp),
+        ('user_like', UserLike, UserLike.created_at),
+        ('comment', Comment, Comment.created_at),
+    ]
+    
+    # 좋아요 워터마크는 이번 실행에서 옮기기 전 값으로 취소 차감 여부를 판단
+    like_watermark = get_rollup_watermark(job_name, 'user_like')
+    
+    for source_table, model, time_column in sources:
+        watermark = get_rollup_watermark(job_name, source_table)
+        bounds = get_watermark_window(watermark, model, time_column, settle_before)
+        if bounds is None:
+            continue
+        max_id = db.session.query(func.max(model.id)).filter(*bounds).scalar()
+        advances.append((watermark, max_id, settle_before))
+        if not max_id:
+            continue
+        
+        day = func.date(time_column)
+        window = bounds + (model.performance_id.isnot(None),)
+        
+        if model is UserEvent:
+            rows = db.session.query(model.performance_id, day, model.event_type, func.count(model.id))\
+                .filter(*window, model.event_type.in_(list(STATS_EVENT_COLUMNS)))\
+                .group_by(model.performance_id, day, model.event_type).all()
+            for performance_id, event_day, event_type, count in rows:
+                deltas[(performance_id, parse_single_date(event_day))][STATS_EVENT_COLUMNS[event_type]] += count
+            
+            unlikes = db.session.query(model.performance_id, model.event_data)\
+                .filter(*window, model.event_type == 'unlike')
+            for performance_id, event_data in unlikes:
+                like = json.loads(event_data) if event_data else {}
+                liked_at = datetime.fromisoformat(like['liked_at']) if like.get('liked_at') else None
+                if liked_at and like_was_rolled_up(like_watermark, like.get('like_id'), liked_at):
+                    deltas[(performance_id, liked_at.date())]['likes'] -= 1
+        elif model is Comment:
+            rows = db.session.query(model.performance_id, day, func.count(model.id),
+                                    func.sum(model.rating), func.count(model.rating))\
+                .filter(*window)\
+                .group_by(model.performance_id, day).all()
+            for performance_id, event_day, count, rating_sum, rating_count in rows:
+                counts = deltas[(performance_id, parse_single_date(event_day))]
+                counts['comments'] += count
+                counts['rating_sum'] += rating_sum or 0
+                counts['rating_count'] += rating_count
+        else:
+            rows = db.session.query(model.performance_id, day, func.count(model.id))\
+                .filter(*window)\
+                .group_by(model.performance_id, day).all()
+            for performance_id, event_day, count in rows:
+                deltas[(performance_id, parse_single_date(event_day))]['likes'] += count
+    
+    return deltas, advances
+
+def rollup_performance_stats(settle_seconds=60):
+    """신규 UserEvent/UserLike/Comment 행을 공연별 일별 PerformanceStats에 증분 반영
+    
+    settle_seconds는 가장 긴 쓰기 트랜잭션보다 길어야 한다 (get_watermark_window 참고).
+    """
+    try:
+        deltas, advances = collect_new_activity('performance_stats', settle_seconds)
+        
+        # 영향받는 (공연, 일자) 행을 한 번에 읽어 누적 후 없는 행만 추가
+        existing = {}
+        if deltas:
+            performance_ids = {performance_id for performance_id, _ in deltas}
+            days = {day for _, day in deltas}
+            for stat in PerformanceStats.query.filter(
+                PerformanceStats.performance_id.in_(performance_ids),
+                PerformanceStats.date.in_(days)
+            ):
+                existing[(stat.performance_id, stat.date)] = stat
+        
+        inserted = 0
+        for (performance_id, day), counts in deltas.items():
+            stat = existing.get((performance_id, day))
+            if stat is None:
+                stat = PerformanceStats(performance_id=performance_id, date=day,
+                                        views=0, likes=0, comments=0, shares=0, ticket_clicks=0)
+                db.session.add(stat)
+                inserted += 1
+            for column in STATS_COLUMNS:
+                if counts.get(column):
+                    setattr(stat, column, (getattr(stat, column) or 0) + counts[column])
+        
+        advance_watermarks(advances)
+        
+        db.session.commit()
+        result = {'updated_rows': len(deltas) - inserted, 'inserted_rows': inserted,
+                  'sources': sum(1 for _, max_id, _ in advances if max_id)}
+        logger.info(f"PerformanceStats 롤업 완료: {result}")
+        return result
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f"PerformanceStats 롤업 실패: {e}")
+        raise
+
+# CategoryTrend 집계 단위와 활동 컬럼 매핑
+TREND_GRANULARITIES = ('day', 'week', 'month')
+TREND_ACTIVITY_COLUMNS = {
+    'views': 'total_views',
+    'likes': 'total_likes',
+    'comments': 'total_comments',
+    'rating_sum': 'rating_sum',
+    'rating_count': 'rating_count'
+}
+
+def get_trend_bucket(day, granularity):
+    """일자가 속한 구간의 시작일 (주: 월요일, 월: 1일)"""
+    if granularity == 'week':
+        return day - timedelta(days=day.weekday())
+    if granularity == 'month':
+        return day.replace(day=1)
+    return day
+
+def rollup_category_trends(settle_seconds=60):
+    """신규 공연 등록/조회/좋아요/댓글을 카테고리 × 일 CategoryTrend 행에 증분 반영
+    
+    같은 증분을 주/월 구간 행에도 더해 상위 구간을 다시 계산하지 않고 유지하며,
+    일별 TrendData 행(조회/좋아요/댓글/티켓 클릭 전환)도 함께 갱신한다.
+    """
+    try:
+        job_name = 'category_trends'
+        deltas, advances = collect_new_activity(job_name, settle_seconds)
+        
+        # 공연 id -> 카테고리를 한 번에 조회 (삭제된 공연의 활동은 제외)
+        categories = {}
+        if deltas:
+            performance_ids = {performance_id for performance_id, _ in deltas}
+            categories = dict(db.session.query(Performance.id, Performance.category)
+                              .filter(Performance.id.in_(performance_ids)))
+        
+        day_deltas = defaultdict(lambda: defaultdict(int))
+        for (performance_id, day), counts in deltas.items():
+            if performance_id not in categories:
+                continue
+            bucket = day_deltas[(categories[performance_id] or '기타', day)]
+            for column, count in counts.items():
+                bucket[column] += count
+        
+        # 신규 등록 공연 수 (Performance 워터마크)
+        settle_before = get_db_now() - timedelta(seconds=settle_seconds)
+        watermark = get_rollup_watermark(job_name, 'performance')
+        bounds = get_watermark_window(watermark, Performance, Performance.created_at, settle_before)
+        max_id = db.session.query(func.max(Performance.id)).filter(*bounds).scalar() if bounds else None
+        if bounds:
+            advances.append((watermark, max_id, settle_before))
+        if max_id:
+            day = func.date(Performance.created_at)
+            rows = db.session.query(Performance.category, day, func.count(Performance.id))\
+                .filter(*bounds)\
+                .group_by(Performance.category, day).all()
+            for category, created_day, count in rows:
+                day_deltas[(category or '기타', parse_single_date(created_day))]['performances'] += count
+        
+        # 일 증분을 일/주/월 구간으로 전개
+        cube_deltas = defaultdict(lambda: defaultdict(int))
+        for (category, day), counts in day_deltas.items():
+            for granularity in TREND_GRANULARITIES:
+                bucket = cube_deltas[(category, granularity, get_trend_bucket(day, granularity))]
+                for column, count in counts.items():
+                    bucket[column] += count
+        
+        existing = {}
+        if cube_deltas:
+            for trend in CategoryTrend.query.filter(
+                CategoryTrend.category.in_({category for category, _, _ in cube_deltas}),
+                CategoryTrend.date.in_({bucket_date for _, _, bucket_date in cube_deltas})
+            ):
+                existing[(trend.category, trend.granularity or 'day', trend.date)] = trend
+        
+        inserted = 0
+        for (category, granularity, bucket_date), counts in cube_deltas.items():
+            trend = existing.get((category, granularity, bucket_date))
+            if trend is None:
+                trend = CategoryTrend(category=category, granularity=granularity, date=bucket_date,
+                                      total_performances=0, total_views=0, total_likes=0, total_comments=0,
+                                      rating_sum=0, rating_count=0, avg_rating=0.0)
+                db.session.add(trend)
+                inserted += 1
+            trend.total_performances = (trend.total_performances or 0) + counts.get('performances', 0)
+            for column, trend_column in TREND_ACTIVITY_COLUMNS.items():
+                if counts.get(column):
+                    setattr(trend, trend_column, (getattr(trend, trend_column) or 0) + counts[column])
+            trend.avg_rating = trend.rating_sum / trend.rating_count if trend.rating_count else 0.0
+        
+        # 일별 TrendData
+        trend_data = {}
+        if day_deltas:
+            for row in TrendData.query.filter(
+                TrendData.category.in_({category for category, _ in day_deltas}),
+                TrendData.date.in_({day for _, day in day_deltas})
+            ):
+                trend_data.setdefault((row.category, row.date), row)
+        
+        for (category, day), counts in day_deltas.items():
+            if not any(counts.get(column) for column in STATS_COLUMNS):
+                continue
+            row = trend_data.get((category, day))
+            if row is None:
+                row = TrendData(category=category, date=day, views=0, likes=0, comments=0,
+                                conversions=0, revenue=0.0)
+                db.session.add(row)
+            row.views = (row.views or 0) + counts.get('views', 0)
+            row.likes = (row.likes or 0) + counts.get('likes', 0)
+            row.comments = (row.comments or 0) + counts.get('comments', 0)
+            row.conversions = (row.conversions or 0) + counts.get('ticket_clicks', 0)
+        
+        advance_watermarks(advances)
+        
+        db.session.commit()
+        result = {'updated_rows': len(cube_deltas) - inserted, 'inserted_rows': inserted,
+                  'sources': sum(1 for _, max_id, _ in advances if max_id)}
+        logger.info(f"CategoryTrend 롤업 완료: {result}")
+        return result
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f"CategoryTrend 롤업 실패: {e}")
+        raise
+
 def get_category_trends():
-    """카테고리별 트렌드 분석"""
+    """카테고리별 트렌드 분석 (CategoryTrend 일별 행 기준)"""
     try:
         # 최근 7일간의 카테고리별 트렌드
         end_date = datetime.now().date()
         start_date = end_date - timedelta(days=7)
         
         trends = db.session.query(
-            Performance.category,
-            func.count(Performance.id).label('total_performances'),
-            func.sum(Performance.likes).label('total_likes'),
-            func.avg(Comment.rating).label('avg_rating')
-        ).outerjoin(Comment, Performance.id == Comment.performance_id)\
-         .filter(Performance.created_at >= start_date)\
-         .group_by(Performance.category)\
-         .order_by(func.count(Performance.id).desc())\
+            CategoryTrend.category,
+            func.sum(CategoryTrend.total_performances).label('total_performances'),
+            func.sum(CategoryTrend.total_likes).label('total_likes'),
+            func.sum(CategoryTrend.rating_sum).label('rating_sum'),
+            func.sum(CategoryTrend.rating_count).label('rating_count')
+        ).filter(CategoryTrend.granularity == 'day', CategoryTrend.date >= start_date)\
+         .group_by(CategoryTrend.category)\
+         .order_by(func.sum(CategoryTrend.total_performances).desc())\
          .all()
         
-        return [{
-            'category': trend.category or '기타',
-            'total_performances': trend.total_performances,
-            'total_likes': trend.total_likes or 0,
-            'avg_rating': round(trend.avg_rating, 1) if trend.avg_rating else 0,
-            'popularity_score': (trend.total_performances * 0.4) + ((trend.total_likes or 0) * 0.4) + ((trend.avg_rating or 0) * 0.2)
-        } for trend in trends]
+        results = []
+        for trend in trends:
+            total_performances = trend.total_performances or 0
+            total_likes = trend.total_likes or 0
+            avg_rating = trend.rating_sum / trend.rating_count if trend.rating_count else 0
+            results.append({
+                'category': trend.category or '기타',
+                'total_performances': total_performances,
+                'total_likes': total_likes,
+                'avg_rating': round(avg_rating, 1) if avg_rating else 0,
+                'popularity_score': (total_performances * 0.4) + (total_likes * 0.4) + (avg_rating * 0.2)
+            })
+        return results
     except Exception as e:
         app.logger.error(f"카테고리 트렌드 조회 오류: {e}")
         return []
 
+def get_category_trend_series(granularity='week', periods=12, metric='total_views'):
+    """카테고리별 구간 추이 차트 데이터 (최근 periods개 구간)"""
+    try:
+        # 현재 구간부터 거슬러 올라가며 구간 시작일 목록 생성
+        bucket_date = get_trend_bucket(datetime.now().date(), granularity)
+        buckets = []
+        for _ in range(periods):
+            buckets.append(bucket_date)
+            if granularity == 'month':
+                bucket_date = (bucket_date - timedelta(days=1)).replace(day=1)
+            else:
+                bucket_date -= timedelta(days=7 if granularity == 'week' else 1)
+        buckets.reverse()
+        
+        rows = db.session.query(CategoryTrend.category, CategoryTrend.date, getattr(CategoryTrend, metric))\
+            .filter(CategoryTrend.granularity == granularity, CategoryTrend.date >= buckets[0])\
+            .all()
+        
+        series = defaultdict(dict)
+        for category, bucket, value in rows:
+            series[category][bucket] = value or 0
+        
+        label_format = '%Y-%m' if granularity == 'month' else '%m/%d'
+        return {
+            'labels': [bucket.strftime(label_format) for bucket in buckets],
+            'datasets': [{
+                'label': category,
+                'data': [values.get(bucket, 0) for bucket in buckets]
+            } for category, values in sorted(series.items())]
+        }
+    except Exception as e:
+        logger.error(f"카테고리 추이 차트 데이터 생성 실패: {e}")
+        return {'labels': [], 'datasets': []}
+
 @app.route('/admin/performance-stats')
 @login_required
 def performance_stats():
@@ -2860,6 +4592,31 @@ def performance_stats():
         flash('통계 데이터를 불러오는 중 오류가 발생했습니다.', 'error')
         return redirect(url_for('admin_panel'))
 
+def performance_stats_sheet():
+    """공연별 통계 시트 (title, header, rows)"""
+    rows = ([
+        stat['title'],
+        stat['category'],
+        stat['total_views'],
+        stat['total_likes'],
+        stat['total_comments'],
+        stat['total_ticket_clicks'],
+        stat['avg_rating'],
+        stat['engagement_rate']
+    ] for stat in get_performance_statistics())
+    return '공연별 통계', ['공연명', '카테고리', '조회수', '좋아요', '댓글', '티켓클릭', '평점', '참여율(%)'], rows
+
+def category_trends_sheet():
+    """카테고리 트렌드 시트 (title, header, rows)"""
+    rows = ([
+        trend['category'],
+        trend['total_performances'],
+        trend['total_likes'],
+        trend['avg_rating'],
+        round(trend['popularity_score'], 2)
+    ] for trend in get_category_trends())
+    return '카테고리 트렌드', ['카테고리', '공연 수', '총 좋아요', '평균 평점', '인기도 점수'], rows
+
 @app.route('/admin/export-stats/excel')
 @login_required
 def export_performance_stats_excel():
@@ -2869,49 +4626,10 @@ def export_performance_stats_excel():
         return redirect(url_for('admin_panel'))
     
     try:
-        performance_stats = get_performance_statistics()
-        category_trends = get_category_trends()
+        file = write_xlsx_export([performance_stats_sheet(), category_trends_sheet()])
         
-        # 엑셀 파일 생성
-        wb = Workbook()
-        
-        # 공연별 통계 시트
-        ws1 = wb.active
-        ws1.title = "공연별 통계"
-        ws1.append(['공연명', '카테고리', '조회수', '좋아요', '댓글', '티켓클릭', '평점', '참여율(%)'])
-        
-        for stat in performance_stats:
-            ws1.append([
-                stat['title'],
-                stat['category'],
-                stat['total_views'],
-                stat['total_likes'],
-                stat['total_comments'],
-                stat['total_ticket_clicks'],
-                stat['avg_rating'],
-                stat['engagement_rate']
-            ])
-        
-        # 카테고리 트렌드 시트
-        ws2 = wb.create_sheet("카테고리 트렌드")
-        ws2.append(['카테고리', '공연 수', '총 좋아요', '평균 평점', '인기도 점수'])
-        
-        for trend in category_trends:
-            ws2.append([
-                trend['category'],
-                trend['total_performances'],
-                trend['total_likes'],
-                trend['avg_rating'],
-                round(trend['popularity_score'], 2)
-            ])
-        
-        # 파일 저장
         filename = f"performance_stats_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
-        filepath = os.path.join(app.static_folder, 'exports', filename)
-        os.makedirs(os.path.dirname(filepath), exist_ok=True)
-        wb.save(filepath)
-        
-        return send_file(filepath, as_attachment=True, download_name=filename)
+        return send_xlsx_export(file, filename)
         
     except Exception as e:
         app.logger.error(f"통계 엑셀 내보내기 오류: {e}")
@@ -3223,7 +4941,7 @@ def analyze_performance_data():
         
         # 최근 공연
         recent_performances = Performance.query.filter_by(is_approved=True).\
-            order_by(Performance.date.desc()).limit(5).all()
+            order_by(Performance.start_date.desc()).limit(5).all()
         
         return {
             'total_count': total_performances,
@@ -3239,7 +4957,7 @@ def analyze_performance_data():
 def generate_personalized_recommendations(user_preferences, conditions):
     """개인화된 추천 생성"""
     try:
-        query = Performance.query.filter_by(is_approved=True)
+        query = Performance.query.filter_by(is_approved=True).filter(ACTIVE_PERFORMANCE_CONDITION)
         
         # 사용자 선호도 기반 가중치 적용
         recommendations = []
@@ -3271,7 +4989,7 @@ def generate_personalized_recommendations(user_preferences, conditions):
 def search_performances_by_ai(conditions):
     """AI 조건에 따른 공연 검색 (고도화된 버전)"""
     try:
-        query = Performance.query.filter_by(is_approved=True)
+        query = Performance.query.filter_by(is_approved=True).filter(ACTIVE_PERFORMANCE_CONDITION)
         
         # 지역 필터 (더 정교한 처리)
         if conditions['location']:
@@ -3355,42 +5073,37 @@ def search_performances_by_ai(conditions):
             date_range = conditions['date_range']
             
             if date_range == 'today':
-                query = query.filter(Performance.date == today.strftime('%Y-%m-%d'))
+                query = filter_by_date_range(query, today, today)
             elif date_range == 'tomorrow':
                 tomorrow = today + timedelta(days=1)
-                query = query.filter(Performance.date == tomorrow.strftime('%Y-%m-%d'))
+                query = filter_by_date_range(query, tomorrow, tomorrow)
             elif date_range == 'day_after_tomorrow':
                 day_after = today + timedelta(days=2)
-                query = query.filter(Performance.date == day_after.strftime('%Y-%m-%d'))
+                query = filter_by_date_range(query, day_after, day_after)
             elif date_range == 'this_week':
                 end_of_week = today + timedelta(days=7)
-                query = query.filter(Performance.date >= today.strftime('%Y-%m-%d'))
-                query = query.filter(Performance.date <= end_of_week.strftime('%Y-%m-%d'))
+                query = filter_by_date_range(query, today, end_of_week)
             elif date_range == 'next_week':
                 next_week_start = today + timedelta(days=7)
                 next_week_end = today + timedelta(days=14)
-                query = query.filter(Performance.date >= next_week_start.strftime('%Y-%m-%d'))
-                query = query.filter(Performance.date <= next_week_end.strftime('%Y-%m-%d'))
+                query = filter_by_date_range(query, next_week_start, next_week_end)
             elif date_range == 'this_month':
                 end_of_month = today.replace(day=28) + timedelta(days=4)
                 end_of_month = end_of_month.replace(day=1) - timedelta(days=1)
-                query = query.filter(Performance.date >= today.strftime('%Y-%m-%d'))
-                query = query.filter(Performance.date <= end_of_month.strftime('%Y-%m-%d'))
+                query = filter_by_date_range(query, today, end_of_month)
             elif date_range == 'next_month':
                 next_month_start = today.replace(day=1) + timedelta(days=32)
                 next_month_start = next_month_start.replace(day=1)
                 next_month_end = next_month_start.replace(day=28) + timedelta(days=4)
                 next_month_end = next_month_end.replace(day=1) - timedelta(days=1)
-                query = query.filter(Performance.date >= next_month_start.strftime('%Y-%m-%d'))
-                query = query.filter(Performance.date <= next_month_end.strftime('%Y-%m-%d'))
+                query = filter_by_date_range(query, next_month_start, next_month_end)
             elif date_range == 'weekend':
                 # 주말 필터링 (실제로는 요일 정보가 필요)
                 pass
             elif date_range == 'soon':
                 # 곧 (1주일 이내)
                 end_soon = today + timedelta(days=7)
-                query = query.filter(Performance.date >= today.strftime('%Y-%m-%d'))
-                query = query.filter(Performance.date <= end_soon.strftime('%Y-%m-%d'))
+                query = filter_by_date_range(query, today, end_soon)
         
         # 카테고리 필터
         if conditions['category']:
@@ -3448,10 +5161,10 @@ def search_performances_by_ai(conditions):
             query = query.order_by(Performance.likes.desc())
         elif conditions['date_range'] in ['soon', 'today', 'tomorrow']:
             # 날짜순 정렬 (급한 경우)
-            query = query.order_by(Performance.date.asc())
+            query = query.order_by(Performance.start_date.asc())
         else:
             # 기본 정렬 (좋아요 수 + 날짜)
-            query = query.order_by(Performance.likes.desc(), Performance.date.asc())
+            query = query.order_by(Performance.likes.desc(), Performance.start_date.asc())
         
         # 결과 수 조정 (조건에 따라)
         limit_count = 5
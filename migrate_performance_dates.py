@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+공연 날짜 정규화 마이그레이션 스크립트
+performance 테이블에 start_date/end_date 컬럼과 인덱스를 추가하고,
+기존 date 문자열에서 값을 배치 단위로 채웁니다.
+"""
+
+import os
+import sys
+
+# 프로젝트 루트 디렉토리를 Python 경로에 추가
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from sqlalchemy import text
+from main import app, db, Performance, parse_date_range
+
+BATCH_SIZE = 500
+
+def add_date_columns():
+    """start_date/end_date 컬럼 및 인덱스 추가 (SQLite/PostgreSQL 공통 DDL)"""
+    inspector = db.inspect(db.engine)
+    columns = [column['name'] for column in inspector.get_columns('performance')]
+    
+    for column in ('start_date', 'end_date'):
+        if column not in columns:
+            db.session.execute(text(f"ALTER TABLE performance ADD COLUMN {column} DATE"))
+            print(f"➕ performance.{column} 컬럼 추가")
+    
+    for column in ('start_date', 'end_date'):
+        db.session.execute(text(
+            f"CREATE INDEX IF NOT EXISTS ix_performance_{column} ON performance ({column})"
+        ))
+    db.session.commit()
+
+def backfill_dates(batch_size=BATCH_SIZE):
+    """date 문자열을 파싱해 start_date/end_date 채우기 (id 기준 배치 처리)"""
+    last_id = 0
+    updated = 0
+    skipped = 0
+    
+    while True:
+        rows = db.session.query(Performance.id, Performance.date)\
+            .filter(Performance.id > last_id, Performance.start_date.is_(None))\
+            .order_by(Performance.id)\
+            .limit(batch_size).all()
+        if not rows:
+            break
+        
+        mappings = []
+        for performance_id, date_text in rows:
+            start_date, end_date = parse_date_range(date_text)
+            if start_date:
+                mappings.append({'id': performance_id, 'start_date': start_date, 'end_date': end_date})
+            else:
+                skipped += 1
+        
+        if mappings:
+            db.session.bulk_update_mappings(Performance, mappings)
+        db.session.commit()
+        
+        updated += len(mappings)
+        last_id = rows[-1][0]
+        print(f"🔄 {updated}개 공연 날짜 정규화 완료 (마지막 ID: {last_id})")
+    
+    return updated, skipped
+
+def migrate_performance_dates():
+    """공연 날짜 정규화 마이그레이션"""
+    with app.app_context():
+        try:
+            add_date_columns()
+            updated, skipped = backfill_dates()
+            print(f"✅ 마이그레이션 완료: {updated}개 갱신, {skipped}개는 날짜 형식을 해석할 수 없어 건너뜀")
+        except Exception as e:
+            print(f"❌ 마이그레이션 중 오류 발생: {e}")
+            db.session.rollback()
+            raise
+
+if __name__ == '__main__':
+    migrate_performance_dates()
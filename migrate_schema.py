@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+"""
+스키마 마이그레이션 스크립트
+새 테이블 생성, 기존 테이블에 새로 추가된 컬럼 추가, 모델에 선언된 인덱스(복합/부분 인덱스 포함)
+생성을 한 번에 수행합니다. SQLite와 PostgreSQL 모두에서 동작하며 여러 번 실행해도 안전합니다.
+"""
+
+import os
+import sys
+
+# 프로젝트 루트 디렉토리를 Python 경로에 추가
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from main import app, db, add_missing_columns, create_missing_indexes, normalize_kopis_ids
+
+def migrate_schema():
+    """스키마 마이그레이션 실행"""
+    with app.app_context():
+        try:
+            db.create_all()
+            print("✅ 새 테이블 확인 완료")
+            
+            added = add_missing_columns()
+            for name in added:
+                print(f"➕ 컬럼 추가: {name}")
+            
+            # kopis_id 고유 인덱스 생성 전 빈 값/중복 정리
+            normalized = normalize_kopis_ids()
+            if normalized:
+                print(f"🧹 kopis_id 정리: {normalized}개 공연")
+            
+            created = create_missing_indexes()
+            for name in created:
+                print(f"➕ 인덱스 생성: {name}")
+            
+            if added or created:
+                print(f"✅ 컬럼 {len(added)}개, 인덱스 {len(created)}개를 추가했습니다.")
+            else:
+                print("✅ 스키마가 이미 최신 상태입니다.")
+        except Exception as e:
+            print(f"❌ 스키마 마이그레이션 중 오류 발생: {e}")
+            raise
+
+if __name__ == '__main__':
+    migrate_schema()
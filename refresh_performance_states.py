@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+공연 진행 상태 갱신 스크립트
+저장된 시작/종료일로 보아 상태(공연예정/공연중/공연완료)가 바뀌었을 공연만 골라, KOPIS 공연은 상세 API로
+다시 조회하고(호출 속도 제한) 직접 등록한 공연은 날짜로 계산해 일괄 갱신합니다.
+공연완료가 된 공연은 공개 목록과 부분 인덱스(ix_performance_active_created_at)에서 빠집니다.
+
+사용법:
+    python refresh_performance_states.py                    # 대상 공연 최대 1000개 갱신
+    python refresh_performance_states.py --no-repoll        # KOPIS 조회 없이 날짜로만 계산
+    python refresh_performance_states.py --interval 3600    # 1시간마다 반복 실행
+"""
+
+import os
+import sys
+import time
+import argparse
+import logging
+
+# 프로젝트 루트 디렉토리를 Python 경로에 추가
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from main import app, db, invalidate_home_cache
+from kopis_api_integration import KOPISStateRefresher
+
+logger = logging.getLogger(__name__)
+
+def run_refresh(limit, workers, rate, repoll):
+    """상태 갱신 1회 실행"""
+    with app.app_context():
+        refresher = KOPISStateRefresher(db.session, max_workers=workers, rate_per_second=rate)
+        result = refresher.refresh(limit=limit, repoll=repoll)
+        if result['changed']:
+            invalidate_home_cache('performance_state_refresh')
+        print(f"🗓️ 공연 진행 상태: {result}")
+        return result
+
+def main():
+    """메인 실행 함수"""
+    parser = argparse.ArgumentParser(description='공연 진행 상태 갱신')
+    parser.add_argument('--limit', type=int, default=1000,
+                        help='1회 실행에서 확인할 최대 공연 수')
+    parser.add_argument('--workers', type=int, default=int(os.environ.get('KOPIS_DETAIL_WORKERS', 4)),
+                        help='동시 조회 스레드 수')
+    parser.add_argument('--rate', type=float, default=float(os.environ.get('KOPIS_DETAIL_RATE', 5)),
+                        help='초당 최대 KOPIS 호출 수')
+    parser.add_argument('--no-repoll', action='store_true',
+                        help='KOPIS를 다시 조회하지 않고 날짜로만 상태 계산')
+    parser.add_argument('--interval', type=int, default=0,
+                        help='반복 실행 간격(초). 0이면 1회만 실행')
+    args = parser.parse_args()
+    if args.rate <= 0:
+        parser.error('--rate는 0보다 커야 합니다')
+
+    while True:
+        try:
+            run_refresh(args.limit, args.workers, args.rate, not args.no_repoll)
+        except Exception as e:
+            logger.error(f"공연 진행 상태 갱신 실패: {e}")
+            if not args.interval:
+                sys.exit(1)
+
+        if not args.interval:
+            break
+        time.sleep(args.interval)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+통계 롤업 실행 스크립트
+UserEvent/UserLike/Comment의 새 데이터를 공연별 일별 PerformanceStats와
+카테고리별 일/주/월 CategoryTrend(및 일별 TrendData)에 증분 반영합니다.
+여러 호스트에서 스케줄러가 겹쳐 실행되어도 잠금(stats_rollup)을 얻은 한 곳에서만 실행됩니다.
+
+사용법:
+    python rollup_stats.py                  # 1회 실행 (cron 등 외부 스케줄러용)
+    python rollup_stats.py --interval 300   # 5분마다 반복 실행
+"""
+
+import os
+import sys
+import time
+import argparse
+import logging
+
+# 프로젝트 루트 디렉토리를 Python 경로에 추가
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from main import app, db, rollup_performance_stats, rollup_category_trends, LeaseLock, JobLockBusy
+
+logger = logging.getLogger(__name__)
+
+def run_rollups(settle_seconds):
+    """롤업 작업 1회 실행"""
+    with app.app_context():
+        db.create_all()
+        try:
+            with LeaseLock('stats_rollup', description='rollup_stats.py') as lock:
+                result = rollup_performance_stats(settle_seconds=settle_seconds)
+                print(f"📊 PerformanceStats: {result}")
+                # 첫 롤업이 길어져 잠금이 만료되었으면 다른 프로세스에 맡기고 중단
+                if not lock.renew():
+                    raise JobLockBusy('stats_rollup')
+                result = rollup_category_trends(settle_seconds=settle_seconds)
+                print(f"📈 CategoryTrend: {result}")
+        except JobLockBusy as e:
+            print(f"⏭️ 건너뜀: {e}")
+
+def main():
+    """메인 실행 함수"""
+    parser = argparse.ArgumentParser(description='통계 롤업 실행')
+    parser.add_argument('--interval', type=int, default=0,
+                        help='반복 실행 간격(초). 0이면 1회만 실행')
+    parser.add_argument('--settle', type=int, default=60,
+                        help='최근 N초 이내 데이터는 다음 실행으로 미룸 (커밋 지연 대비, '
+                             '가장 긴 쓰기 트랜잭션과 이벤트 버퍼 저장 간격보다 길게)')
+    args = parser.parse_args()
+    
+    while True:
+        try:
+            run_rollups(args.settle)
+        except Exception as e:
+            logger.error(f"롤업 실행 실패: {e}")
+            if not args.interval:
+                sys.exit(1)
+        
+        if not args.interval:
+            break
+        time.sleep(args.interval)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+KOPIS 동기화 실행 스크립트
+기본은 증분 동기화로, 월 구간별 처리 위치(KopisSyncState) 이후 등록/수정된 공연만 가져옵니다.
+관리자 화면의 동기화 작업과 같은 잠금(kopis_sync)을 쓰므로, 다른 동기화가 실행 중이면 건너뜁니다.
+
+사용법:
+    python sync_kopis.py                          # 오늘 기준 ±30일 증분 동기화 (야간 cron용)
+    python sync_kopis.py --full                   # 지역/장르별로 나누어 증분 동기화
+    python sync_kopis.py --start 20260101 --end 20261231 --no-incremental
+"""
+
+import os
+import sys
+import argparse
+import logging
+
+# 프로젝트 루트 디렉토리를 Python 경로에 추가
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from main import app, db, invalidate_home_cache, KOPIS_SYNC_WORKERS, LeaseLock, JobLockBusy
+from kopis_api_integration import KOPISDataImporter
+
+logger = logging.getLogger(__name__)
+
+def main():
+    """메인 실행 함수"""
+    parser = argparse.ArgumentParser(description='KOPIS 동기화')
+    parser.add_argument('--start', help='조회 시작일 (YYYYMMDD, 기본: 30일 전)')
+    parser.add_argument('--end', help='조회 종료일 (YYYYMMDD, 기본: 30일 후)')
+    parser.add_argument('--full', action='store_true',
+                        help='지역/장르별로 나누어 모든 페이지 조회')
+    parser.add_argument('--no-incremental', action='store_true',
+                        help='저장된 처리 위치를 무시하고 전체 기간 다시 조회 (지역/장르 분할은 --full)')
+    parser.add_argument('--workers', type=int, default=KOPIS_SYNC_WORKERS,
+                        help='동시 조회 스레드 수')
+    args = parser.parse_args()
+    
+    with app.app_context():
+        try:
+            db.create_all()
+            with LeaseLock('kopis_sync', description='sync_kopis.py') as lock:
+                def renew_lock(stats):
+                    # 잠금이 만료되어 다른 프로세스가 가져갔으면 중단
+                    if not lock.renew():
+                        raise JobLockBusy('kopis_sync')
+                
+                importer = KOPISDataImporter(db.session)
+                imported_count = importer.import_performances(
+                    start_date=args.start,
+                    end_date=args.end,
+                    batch_size=500,
+                    full_sync=args.full,
+                    max_workers=args.workers,
+                    incremental=not args.no_incremental,
+                    progress=renew_lock
+                )
+            if imported_count or importer.last_import_stats['updated']:
+                invalidate_home_cache('kopis_sync')
+            print(f"🔄 KOPIS 동기화: {importer.last_import_stats}")
+        except JobLockBusy as e:
+            print(f"⏭️ 건너뜀: {e}")
+        except Exception as e:
+            logger.error(f"KOPIS 동기화 실패: {e}")
+            sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+KOPIS 공연장 동기화 스크립트
+/prfplc 공연장 목록을 Venue 테이블에 반영하고, 주소/좌표가 없는 공연장은 상세 API(호출 속도 제한)와
+지오코딩 캐시로 채운 뒤 공연을 공연장에 연결합니다. 여러 번 실행해도 남은 공연장부터 이어서 처리합니다.
+
+사용법:
+    python sync_venues.py                               # 목록 + 상세 최대 500개 + 공연 연결
+    python sync_venues.py --detail-limit 5000 --rate 3
+    python sync_venues.py --link-only                   # 공연 연결만 다시 실행
+"""
+
+import os
+import sys
+import argparse
+import logging
+
+# 프로젝트 루트 디렉토리를 Python 경로에 추가
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from main import app, db
+from kopis_api_integration import KOPISVenueSyncer
+
+logger = logging.getLogger(__name__)
+
+def main():
+    """메인 실행 함수"""
+    parser = argparse.ArgumentParser(description='KOPIS 공연장 동기화')
+    parser.add_argument('--detail-limit', type=int, default=500,
+                        help='1회 실행에서 상세 정보를 조회할 최대 공연장 수')
+    parser.add_argument('--geocode-limit', type=int, default=200,
+                        help='1회 실행에서 지오코딩할 최대 공연장 수 (KOPIS 좌표가 없는 공연장)')
+    parser.add_argument('--workers', type=int, default=int(os.environ.get('KOPIS_DETAIL_WORKERS', 4)),
+                        help='동시 조회 스레드 수')
+    parser.add_argument('--rate', type=float, default=float(os.environ.get('KOPIS_DETAIL_RATE', 5)),
+                        help='초당 최대 상세/지오코딩 호출 수')
+    parser.add_argument('--link-only', action='store_true', help='공연-공연장 연결만 실행')
+    args = parser.parse_args()
+    if args.rate <= 0:
+        parser.error('--rate는 0보다 커야 합니다')
+
+    with app.app_context():
+        try:
+            db.create_all()
+            syncer = KOPISVenueSyncer(db.session, max_workers=args.workers, rate_per_second=args.rate)
+            if args.link_only:
+                result = {'linked': syncer.link_performances()}
+            else:
+                result = syncer.sync(detail_limit=args.detail_limit, geocode_limit=args.geocode_limit)
+            print(f"🏛️ KOPIS 공연장 동기화: {result}")
+        except Exception as e:
+            logger.error(f"KOPIS 공연장 동기화 실패: {e}")
+            sys.exit(1)
+
+if __name__ == '__main__':
+    main()